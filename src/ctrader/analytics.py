@@ -1,20 +1,94 @@
 from __future__ import annotations
 
+import json
+import os
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from ctrader.indicators import rolling_moments, simple_returns
+from ctrader.risk.rebalancer import RebalancePlan
+from ctrader.utils.dataset import dataset
+from ctrader.utils.ledger import CsvLedger
 
-def append_trades(pool: str, plan: pd.DataFrame, data_base: Path) -> None:
-    fp = data_base / f"trades_{pool}.csv"
-    plan = plan.copy()
-    plan["ts"] = datetime.now(timezone.utc).isoformat()
-    if fp.exists():
-        old = pd.read_csv(fp)
-        pd.concat([old, plan], ignore_index=True).to_csv(fp, index=False)
-    else:
-        plan.to_csv(fp, index=False)
+
+def append_trades(pool: str, plan: RebalancePlan, data_base: Path) -> None:
+    """
+    Append this run's plan rows to data/trades_{pool}.csv (append-only) and
+    record them in the last-trade-time sidecar.
+    """
+    ts = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {"ticker": t, "side": s, "qty": q, "est_value": v, "price": p, "ts": ts}
+        for t, s, q, v, p in plan.rows()
+    ]
+    if not rows:
+        return
+    state = _load_last_trades(pool, data_base)  # in sync before the append
+    CsvLedger(data_base / f"trades_{pool}.csv").append(rows)
+    for r in rows:
+        state["tickers"][str(r["ticker"]).upper()] = ts
+    state["last_ts"] = ts
+    _save_json(_last_trades_path(pool, data_base), state)
+
+
+def _save_json(fp: Path, obj: dict) -> None:
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    tmp = fp.with_name(fp.name + ".tmp")
+    tmp.write_text(json.dumps(obj), encoding="utf-8")
+    os.replace(tmp, fp)
+
+
+def _parse_ts(v: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _last_trades_path(pool: str, data_base: Path) -> Path:
+    return data_base / "state" / f"last_trades_{pool}.json"
+
+
+def _load_last_trades(pool: str, data_base: Path) -> dict:
+    """
+    {"last_ts", "tickers": {TICKER: ts}} for `pool`. Rebuilt from
+    trades_{pool}.csv and saved when missing or when `last_ts` is not the ts
+    of the ledger's last row (written by an older version, or a crash
+    between the append and the save).
+    """
+    fp = _last_trades_path(pool, data_base)
+    ledger = CsvLedger(data_base / f"trades_{pool}.csv")
+    last = (ledger.last_row() or {}).get("ts", "")
+    try:
+        state = json.loads(fp.read_text(encoding="utf-8"))
+        if state.get("last_ts") == last and isinstance(state.get("tickers"), dict):
+            return state
+    except Exception:
+        pass
+    latest: dict[str, datetime] = {}
+    for r in ledger.read_rows():
+        dt = _parse_ts(r.get("ts", ""))
+        tck = str(r.get("ticker", "")).upper()
+        if dt is not None and tck and (tck not in latest or dt > latest[tck]):
+            latest[tck] = dt
+    state = {"last_ts": last, "tickers": {t: d.isoformat() for t, d in latest.items()}}
+    if ledger.path.exists():
+        _save_json(fp, state)
+    return state
+
+
+def load_last_trade_times(pool: str, data_base: Path) -> dict[str, datetime]:
+    """
+    Last trade time per ticker in trades_{pool}.csv, read from the sidecar
+    `append_trades` keeps (the ledger itself is only read to rebuild it).
+    """
+    tickers = _load_last_trades(pool, data_base)["tickers"]
+    out = {t: _parse_ts(v) for t, v in tickers.items()}
+    return {t: d for t, d in out.items() if d is not None}
 
 
 def update_equity_and_pnl(
@@ -23,40 +97,212 @@ def update_equity_and_pnl(
     equity = sum(
         float(holdings.get(t, 0.0)) * float(prices.get(t, 0.0)) for t in holdings
     )
-    fp = data_base / f"equity_{pool}.csv"
     row = {"ts": datetime.now(timezone.utc).isoformat(), "equity": equity}
-    if fp.exists():
-        df = pd.read_csv(fp)
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        df.to_csv(fp, index=False)
-    else:
-        pd.DataFrame([row]).to_csv(fp, index=False)
-
-
-def equity_stats(equity_series: pd.Series) -> dict:
-    if equity_series.empty or equity_series.max() <= 0:
-        return {"max_drawdown": 0.0, "vol_daily": 0.0, "sharpe_daily": 0.0}
-    eq = equity_series.astype(float).values
-    peaks = eq.cummax()
-    dd = (eq / peaks) - 1.0
-    max_dd = float(dd.min())
-    rets = []
-    for i in range(1, len(eq)):
-        if eq[i - 1] > 0:
-            rets.append(eq[i] / eq[i - 1] - 1.0)
-    if len(rets) < 2:
-        vol = 0.0
-        sharpe = 0.0
-    else:
-        mu = sum(rets) / len(rets)
-        var = sum((r - mu) ** 2 for r in rets) / (len(rets) - 1)
-        vol = var**0.5
-        sharpe = mu / vol if vol > 0 else 0.0
-    return {
-        "max_drawdown": max_dd,
-        "vol_daily": float(vol),
-        "sharpe_daily": float(sharpe),
+    state = load_running_stats(pool, data_base)  # in sync before the append
+    CsvLedger(data_base / f"equity_{pool}.csv").append([row])
+    state.update(equity, row["ts"])
+    state.save(_running_stats_path(pool, data_base))
+
+
+@dataclass
+class RunningEquityStats:
+    """
+    O(1)-per-point summary of an equity curve: Welford mean/variance of
+    period returns (periods whose starting equity is not positive are
+    skipped, as in equity_stats), running peak and drawdowns. `last_ts` is
+    the ts of the last ledger row folded in, to detect a stale state file.
+    """
+
+    n: int = 0
+    last: float = 0.0
+    n_ret: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    peak: float = 0.0
+    current_drawdown: float = 0.0
+    max_drawdown: float = 0.0
+    last_ts: str = ""
+
+    def update(self, equity: float, ts: str = "") -> None:
+        self.last_ts = str(ts)
+        x = float(equity)
+        if np.isnan(x):
+            return
+        if self.n > 0 and self.last > 0:
+            r = x / self.last - 1.0
+            self.n_ret += 1
+            delta = r - self.mean
+            self.mean += delta / self.n_ret
+            self.m2 += delta * (r - self.mean)
+        self.n += 1
+        self.last = x
+        self.peak = max(self.peak, x)
+        self.current_drawdown = x / self.peak - 1.0 if self.peak > 0 else 0.0
+        self.max_drawdown = min(self.max_drawdown, self.current_drawdown)
+
+    @property
+    def vol(self) -> float:
+        return float(np.sqrt(self.m2 / (self.n_ret - 1))) if self.n_ret > 1 else 0.0
+
+    def snapshot(self) -> dict:
+        vol = self.vol
+        return {
+            "points": self.n,
+            "max_drawdown": self.max_drawdown,
+            "current_drawdown": self.current_drawdown,
+            "vol_daily": vol,
+            "sharpe_daily": self.mean / vol if vol > 0 else 0.0,
+        }
+
+    def save(self, fp: Path) -> None:
+        _save_json(fp, asdict(self))
+
+
+def _running_stats_path(pool: str, data_base: Path) -> Path:
+    return data_base / "state" / f"equity_stats_{pool}.json"
+
+
+def load_running_stats(pool: str, data_base: Path) -> RunningEquityStats:
+    """
+    Persisted running stats for `pool`. When there is no state file, or its
+    `last_ts` is not the ts of the last row of equity_{pool}.csv (e.g. a
+    crash between the append and the save), the CSV is replayed once and
+    the result saved.
+    """
+    fp = _running_stats_path(pool, data_base)
+    ledger = CsvLedger(data_base / f"equity_{pool}.csv")
+    last = ledger.last_row() or {}
+    try:
+        state = RunningEquityStats(**json.loads(fp.read_text(encoding="utf-8")))
+        if state.last_ts == last.get("ts", ""):
+            return state
+    except Exception:
+        pass
+    state = RunningEquityStats()
+    for r in ledger.read_rows():
+        try:
+            x = float(r.get("equity", "nan"))
+        except ValueError:
+            x = float("nan")
+        state.update(x, r.get("ts", ""))
+    state.save(fp)
+    return state
+
+
+def _as_equity(equity) -> np.ndarray:
+    arr = np.asarray(
+        equity.to_numpy() if isinstance(equity, pd.Series) else equity, dtype=float
+    )
+    return arr[~np.isnan(arr)]
+
+
+def _simple_returns(eq: np.ndarray) -> np.ndarray:
+    """Period returns, skipping periods whose starting equity is not positive."""
+    prev, cur = eq[:-1], eq[1:]
+    ok = prev > 0
+    return cur[ok] / prev[ok] - 1.0
+
+
+def rolling_stats(equity, window: int) -> dict[str, np.ndarray]:
+    """
+    Trailing-window vol, Sharpe and drawdown for every point (NaN until the
+    window is full). Return moments come from `indicators.rolling_moments`;
+    the drawdown uses a sliding-window peak.
+    """
+    eq = _as_equity(equity)
+    n, w = len(eq), max(2, int(window))
+    out = {k: np.full(n, np.nan) for k in ("vol", "sharpe", "drawdown")}
+    if n < 2:
+        return out
+    if n - 1 >= w:
+        k, mu, var = rolling_moments(simple_returns(eq), w)
+        vol = np.sqrt(var[w:])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(vol > 0, mu[w:] / vol, 0.0)
+        full = k[w:] >= 2
+        out["vol"][w:] = np.where(full, vol, np.nan)
+        out["sharpe"][w:] = np.where(full, sharpe, np.nan)
+    if n >= w:
+        win = np.lib.stride_tricks.sliding_window_view(eq, w)
+        peak = win.max(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["drawdown"][w - 1 :] = np.where(peak > 0, eq[w - 1 :] / peak - 1.0, 0.0)
+    return out
+
+
+def equity_stats(
+    equity,
+    periods_per_year: int = 365,
+    windows: tuple[int, ...] = (),
+    years: float | None = None,
+) -> dict:
+    """
+    Risk/return summary of an equity curve (pd.Series, ndarray or list),
+    one period per point:
+      max_drawdown, current_drawdown, drawdown_duration (longest run of
+      periods below the prior peak), vol_daily, sharpe_daily,
+      sortino_daily, cagr and calmar (cagr / |max_drawdown|).
+    cagr assumes points `1 / periods_per_year` apart unless `years`, the
+    time the curve actually spans, is given (see elapsed_years).
+    For each w in `windows`, vol_{w}d / sharpe_{w}d / drawdown_{w}d give the
+    latest trailing-window values (see rolling_stats).
+    """
+    eq = _as_equity(equity)
+    out = {
+        "max_drawdown": 0.0,
+        "vol_daily": 0.0,
+        "sharpe_daily": 0.0,
+        "current_drawdown": 0.0,
+        "drawdown_duration": 0,
+        "sortino_daily": 0.0,
+        "cagr": 0.0,
+        "calmar": 0.0,
     }
+    for w in windows:
+        out.update({f"vol_{w}d": 0.0, f"sharpe_{w}d": 0.0, f"drawdown_{w}d": 0.0})
+    if eq.size == 0 or eq.max() <= 0:
+        return out
+
+    peaks = np.maximum.accumulate(eq)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dd = np.where(peaks > 0, eq / peaks - 1.0, 0.0)
+    idx = np.arange(len(eq))
+    last_peak = np.maximum.accumulate(np.where(dd >= 0, idx, 0))
+    out["max_drawdown"] = float(dd.min())
+    out["current_drawdown"] = float(dd[-1])
+    out["drawdown_duration"] = int((idx - last_peak).max())
+
+    rets = _simple_returns(eq)
+    if len(rets) >= 2:
+        mu = float(rets.mean())
+        vol = float(rets.std(ddof=1))
+        downside = float(np.sqrt(np.mean(np.minimum(rets, 0.0) ** 2)))
+        out["vol_daily"] = vol
+        out["sharpe_daily"] = mu / vol if vol > 0 else 0.0
+        out["sortino_daily"] = mu / downside if downside > 0 else 0.0
+
+    first = eq[eq > 0][0]
+    if years is None:
+        years = (len(eq) - 1) / periods_per_year
+    if len(eq) > 1 and eq[-1] > 0 and years > 0:
+        out["cagr"] = float((eq[-1] / first) ** (1.0 / years) - 1)
+    if out["max_drawdown"] < 0:
+        out["calmar"] = out["cagr"] / abs(out["max_drawdown"])
+
+    for w in windows:
+        roll = rolling_stats(eq, w)
+        for k, arr in roll.items():
+            v = arr[-1] if len(arr) else np.nan
+            out[f"{k}_{w}d"] = float(v) if np.isfinite(v) else 0.0
+    return out
+
+
+def elapsed_years(ts) -> float | None:
+    """Years between the first and last parseable timestamp in `ts`."""
+    t = pd.to_datetime(pd.Series(ts), utc=True, errors="coerce").dropna()
+    if len(t) < 2:
+        return None
+    return (t.max() - t.min()).total_seconds() / (365.0 * 86400.0)
 
 
 def bucket_weights(
@@ -69,45 +315,62 @@ def bucket_weights(
     return out
 
 
-def risk_report(pool: str, categories: dict[str, str], base_dir: Path) -> Path:
-    eq_fp = base_dir / f"equity_{pool}.csv"
-    rs_dir = base_dir / "run_summaries"
-    eq_stats = {}
-    if eq_fp.exists():
-        df = pd.read_csv(eq_fp)
-    else:
-        df = None
-    if df is not None and not df.empty:
-        eq_stats = equity_stats(df["equity"])
-    latest = None
-    if rs_dir.exists():
-        runs = sorted(rs_dir.glob(f"run_{pool}_*_trades.csv"))
-        if runs:
-            import pandas as pd
-
-            latest = pd.read_csv(runs[-1])
+def risk_metrics(
+    pool: str,
+    categories: dict[str, str],
+    base_dir: Path,
+    equity=None,
+    latest: pd.DataFrame | None = None,
+    ts=None,
+) -> dict:
+    """
+    The risk report row for `pool`, computed in memory. `equity` (values of
+    the equity curve), `ts` (their timestamps) and `latest` (the latest run
+    summary) are read from `base_dir` unless passed in.
+    """
+    if equity is None:
+        eq_fp = base_dir / f"equity_{pool}.csv"
+        if eq_fp.exists():
+            df_eq = pd.read_csv(eq_fp)
+            if "equity" in df_eq.columns:
+                equity = df_eq["equity"]
+                ts = df_eq["ts"] if "ts" in df_eq.columns else None
+    # the equity log gets a row per run, not per day: annualise by elapsed
+    # time, and report no calmar when the timestamps are unknown
+    years = elapsed_years(ts) if ts is not None else None
+    eq_stats = equity_stats(equity, years=years) if equity is not None else {}
+    if latest is None:
+        latest = dataset("run_summaries", base_dir).latest(pool)
+    bw = {"core": 0.0, "ai": 0.0, "meme": 0.0, "other": 0.0}
     if latest is not None and not latest.empty:
-        alloc = latest.groupby("ticker")["est_value"].sum().reset_index()
-        total = alloc["est_value"].sum()
+        alloc = latest.groupby("ticker")["est_value"].sum()
+        total = float(alloc.sum())
         if total > 0:
-            alloc["weight"] = alloc["est_value"] / total
-            bw = bucket_weights(dict(zip(alloc["ticker"], alloc["weight"])), categories)
-        else:
-            bw = {"core": 0.0, "ai": 0.0, "meme": 0.0, "other": 0.0}
-    else:
-        bw = {"core": 0.0, "ai": 0.0, "meme": 0.0, "other": 0.0}
-    out = {
+            bw = bucket_weights((alloc / total).to_dict(), categories)
+    return {
         "pool": pool,
         "max_drawdown": eq_stats.get("max_drawdown", 0.0),
         "vol_daily": eq_stats.get("vol_daily", 0.0),
         "sharpe_daily": eq_stats.get("sharpe_daily", 0.0),
+        "sortino_daily": eq_stats.get("sortino_daily", 0.0),
+        "calmar": eq_stats.get("calmar", 0.0) if years else 0.0,
+        "drawdown_duration": eq_stats.get("drawdown_duration", 0),
         "bucket_core": bw.get("core", 0.0),
         "bucket_ai": bw.get("ai", 0.0),
         "bucket_meme": bw.get("meme", 0.0),
         "bucket_other": bw.get("other", 0.0),
     }
-    out_fp = base_dir / f"risk_report_{pool}.csv"
-    import pandas as pd
 
+
+def risk_report(
+    pool: str,
+    categories: dict[str, str],
+    base_dir: Path,
+    equity=None,
+    latest: pd.DataFrame | None = None,
+    ts=None,
+) -> Path:
+    out = risk_metrics(pool, categories, base_dir, equity=equity, latest=latest, ts=ts)
+    out_fp = base_dir / f"risk_report_{pool}.csv"
     pd.DataFrame([out]).to_csv(out_fp, index=False)
     return out_fp
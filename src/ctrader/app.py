@@ -1,18 +1,23 @@
 from __future__ import annotations
 
-import json
 import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, cast
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
-from ctrader.analytics import risk_report
-from ctrader.data_providers.coinspot_v2 import CoinSpotV2
+from ctrader.app_data import (
+    balance_feed,
+    load_csv_tail,
+    load_equity,
+    load_latest,
+    load_risk,
+    load_runs,
+)
+from ctrader.indicators import breadth
 
 # --- make sure "src" is on sys.path so `ctrader` imports work anywhere ---
 
@@ -38,18 +43,11 @@ pool = st.selectbox("Pool", ["conservative", "aggressive"])
 
 # ------------------- Run status (from runs.jsonl) -------------------
 st.subheader("Run status")
-runlog_fp = BASE / "logs" / "runs.jsonl"
 latest = None
-if runlog_fp.exists():
-    try:
-        with open(runlog_fp, "r", encoding="utf-8") as f:
-            raw_lines = [line.strip() for line in f if line.strip()]
-            recs = [json.loads(x) for x in raw_lines[-500:]]  # tail only
-        df_runs = pd.DataFrame(recs)
-        if not df_runs.empty and "pool" in df_runs.columns:
-            latest = df_runs[df_runs["pool"] == pool].tail(1)
-    except Exception:
-        latest = None
+try:
+    latest = load_runs(BASE, pool, 1)
+except Exception:
+    latest = None
 
 cols = st.columns(5)
 if latest is not None and len(latest) == 1:
@@ -68,36 +66,25 @@ else:
 # ------------------- Equity -------------------
 st.subheader("Equity")
 eq_fp = BASE / f"equity_{pool}.csv"
-if eq_fp.exists():
-    df_eq = pd.read_csv(eq_fp)
-    if not df_eq.empty and {"ts", "equity"} <= set(df_eq.columns):
-        st.line_chart(df_eq.set_index("ts")["equity"])
-    else:
-        st.info("Equity file is empty.")
+df_eq = load_equity(eq_fp)
+if not df_eq.empty:
+    st.line_chart(df_eq["equity"])
+elif eq_fp.exists():
+    st.info("Equity file is empty.")
 else:
     st.info("No equity yet. Run a trade pass to generate it.")
 
 # ------------------- Drawdown -------------------
 st.subheader("Drawdown")
-if eq_fp.exists():
-    df_eq = pd.read_csv(eq_fp)
-    if not df_eq.empty and {"ts", "equity"} <= set(df_eq.columns):
-        eq = df_eq["equity"].astype(float).to_numpy()
-        peaks = np.maximum.accumulate(eq)
-        dd = (eq / np.where(peaks == 0, np.nan, peaks)) - 1.0
-        st.line_chart(
-            pd.DataFrame({"ts": df_eq["ts"], "drawdown": dd}).set_index("ts")[
-                "drawdown"
-            ]
-        )
+if not df_eq.empty:
+    st.line_chart(df_eq["drawdown"])
 
 # ------------------- Trades -------------------
 st.subheader("Trades (last 200)")
 tr_fp = BASE / f"trades_{pool}.csv"
 if tr_fp.exists():
     try:
-        df_tr = pd.read_csv(tr_fp)
-        st.dataframe(df_tr.tail(200))
+        st.dataframe(load_csv_tail(tr_fp, 200))
     except Exception as e:
         st.warning(f"Could not read trades: {e}")
 else:
@@ -106,9 +93,8 @@ else:
 # ------------------- Allocation from last run -------------------
 st.subheader("Allocation (latest run est_value)")
 try:
-    rs = sorted((BASE / "run_summaries").glob(f"run_{pool}_*_trades.csv"))
-    if rs:
-        last = pd.read_csv(rs[-1])
+    last = load_latest(BASE, "run_summaries", pool)
+    if last is not None:
         if not last.empty and {"ticker", "est_value"} <= set(last.columns):
             alloc = last.groupby("ticker", as_index=False)["est_value"].sum()
             total = alloc["est_value"].sum()
@@ -127,20 +113,23 @@ st.subheader("Balances (Read-Only)")
 ak = os.getenv("COINSPOT_API_KEY", "").strip()
 sk = os.getenv("COINSPOT_API_SECRET", "").strip()
 if ak and sk:
-    try:
-        cs = CoinSpotV2(ak, sk)
-        ro = cs.ro_balances()
-        bals = (ro or {}).get("balances", {})
-        if isinstance(bals, dict) and bals:
-            rows = cast(
-                list[dict[str, Any]],
-                [{"coin": k.upper(), "balance": v} for k, v in bals.items()],
+    feed = balance_feed(ak, sk)
+    if st.button("Refresh balances"):
+        feed.refresh()
+    if feed.error:
+        st.warning(f"RO balances error: {feed.error}")
+    if feed.rows:
+        st.dataframe(pd.DataFrame(feed.rows).sort_values("coin"))
+        st.caption(
+            "Updated "
+            + datetime.fromtimestamp(feed.updated_at or 0, timezone.utc).strftime(
+                "%H:%M:%S UTC"
             )
-            st.dataframe(pd.DataFrame(rows).sort_values("coin"))
-        else:
-            st.info("No balances returned (check RO access for your API key).")
-    except Exception as e:
-        st.warning(f"RO balances error: {e}")
+        )
+    elif feed.rows is None and not feed.error:
+        st.caption("Fetching balances...")
+    elif not feed.error:
+        st.info("No balances returned (check RO access for your API key).")
 else:
     st.caption(
         "Set COINSPOT_API_KEY / COINSPOT_API_SECRET in your .env to show balances."
@@ -160,31 +149,23 @@ try:
         "DOGE": "meme",
         "SHIB": "meme",
     }
-    rr_fp = risk_report(pool, cats, BASE)
-    st.dataframe(pd.read_csv(rr_fp))
+    st.dataframe(pd.DataFrame([load_risk(BASE, pool, cats)]))
 except Exception as e:
     st.caption(f"Risk report unavailable: {e}")
 
 # ------------------- Signals (last run) -------------------
 st.subheader("Signals (last run)")
-sig_dir = BASE / "signals"
-if sig_dir.exists():
-    files = sorted(sig_dir.glob(f"signals_{pool}_*.csv"))
-    if files:
-        last_sig = files[-1]
-        try:
-            sdf = pd.read_csv(last_sig)
-            st.dataframe(sdf)
-            if all(c in sdf.columns for c in ("price_usd", "sma200")) and len(sdf) > 0:
-                breadth = (
-                    float((sdf["price_usd"] > sdf["sma200"]).sum())
-                    * 100.0
-                    / max(1, len(sdf))
-                )
-                st.metric("Breadth (% above SMA200)", f"{breadth:.1f}%")
-        except Exception as e:
-            st.warning(f"Could not read signals: {e}")
-    else:
-        st.info("No signals yet")
+sdf = load_latest(BASE, "signals", pool)
+if sdf is not None:
+    try:
+        st.dataframe(sdf)
+        if all(c in sdf.columns for c in ("price_usd", "sma200")) and len(sdf) > 0:
+            pct = breadth(
+                pd.to_numeric(sdf["price_usd"], errors="coerce").to_numpy(),
+                pd.to_numeric(sdf["sma200"], errors="coerce").to_numpy(),
+            )
+            st.metric("Breadth (% above SMA200)", f"{pct:.1f}%")
+    except Exception as e:
+        st.warning(f"Could not read signals: {e}")
 else:
-    st.info("No signals directory yet.")
+    st.info("No signals yet")
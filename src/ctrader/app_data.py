@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ctrader.analytics import risk_metrics
+from ctrader.data_providers.coinspot_v2 import CoinSpotV2, parse_balances
+from ctrader.runlog import run_log
+from ctrader.utils.dataset import dataset
+
+BALANCE_REFRESH_SEC = float(os.getenv("DASH_BALANCE_REFRESH_SEC", "60"))
+
+
+def file_key(fp: Path) -> tuple[int, int]:
+    """(mtime_ns, size) of `fp`, or (0, 0) if missing; used as a cache key."""
+    try:
+        st_ = os.stat(fp)
+        return st_.st_mtime_ns, st_.st_size
+    except OSError:
+        return 0, 0
+
+
+def tail_lines(fp: Path, n: int, block: int = 64 * 1024) -> list[bytes]:
+    """
+    Last `n` non-empty lines of `fp`, read backwards from the end, without
+    their line endings (LF or CRLF).
+    """
+    with open(fp, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [ln.rstrip(b"\r") for ln in buf.split(b"\n") if ln.strip()]
+    if pos > 0:
+        lines = lines[1:]  # first piece may be a partial line
+    return lines[-n:]
+
+
+# ---- cached readers (keyed on file mtime/size) ----
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _runs_tail(base: str, pool: str | None, n: int, key: tuple) -> pd.DataFrame:
+    return pd.DataFrame(run_log(Path(base)).tail(pool, n))
+
+
+def load_runs(base: Path, pool: str | None = None, n: int = 500) -> pd.DataFrame:
+    """Last `n` run-log records (optionally for one pool) via the offset index."""
+    logs = Path(base) / "logs"
+    key = file_key(logs / "runs.jsonl") + file_key(logs / "runs.index.json")
+    return _runs_tail(str(base), pool, n, key)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _equity(path: str, key: tuple[int, int]) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    if df.empty or not {"ts", "equity"} <= set(df.columns):
+        return pd.DataFrame()
+    eq = df["equity"].astype(float).to_numpy()
+    peaks = np.maximum.accumulate(eq)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dd = (eq / np.where(peaks == 0, np.nan, peaks)) - 1.0
+    return pd.DataFrame({"ts": df["ts"], "equity": eq, "drawdown": dd}).set_index("ts")
+
+
+def load_equity(fp: Path) -> pd.DataFrame:
+    """Equity and drawdown indexed by ts (empty if missing)."""
+    if not fp.exists():
+        return pd.DataFrame()
+    return _equity(str(fp), file_key(fp))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _csv_tail(path: str, key: tuple[int, int], n: int) -> pd.DataFrame:
+    with open(path, "rb") as f:
+        header = f.readline()
+    body = tail_lines(Path(path), n + 1)
+    header = header.rstrip(b"\r\n")
+    if body and body[0] == header:
+        body = body[1:]
+    data = b"\n".join([header] + body[-n:]) + b"\n"
+    return pd.read_csv(io.BytesIO(data))
+
+
+def load_csv_tail(fp: Path, n: int = 200) -> pd.DataFrame:
+    """Header plus the last `n` rows of a CSV, without reading the rest."""
+    if not fp.exists():
+        return pd.DataFrame()
+    return _csv_tail(str(fp), file_key(fp), n)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _latest(base: str, name: str, pool: str, key: tuple[int, int]) -> Any:
+    return dataset(name, Path(base)).latest(pool)
+
+
+def load_latest(base: Path, name: str, pool: str) -> pd.DataFrame | None:
+    """Latest run of dataset `name` for `pool` (cached on its manifest)."""
+    manifest = Path(base) / "datasets" / name / "_manifest.json"
+    return _latest(str(base), name, pool, file_key(manifest))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _risk(
+    base: str, pool: str, categories: tuple, eq_key: tuple, rs_key: tuple
+) -> dict:
+    df_eq = load_equity(Path(base) / f"equity_{pool}.csv")
+    return risk_metrics(
+        pool,
+        dict(categories),
+        Path(base),
+        equity=df_eq["equity"].to_numpy() if not df_eq.empty else None,
+        latest=load_latest(Path(base), "run_summaries", pool),
+        ts=df_eq.index.to_numpy() if not df_eq.empty else None,
+    )
+
+
+def load_risk(base: Path, pool: str, categories: dict[str, str]) -> dict:
+    """Risk report row computed in memory; recomputed only when inputs change."""
+    return _risk(
+        str(base),
+        pool,
+        tuple(sorted(categories.items())),
+        file_key(Path(base) / f"equity_{pool}.csv"),
+        file_key(Path(base) / "datasets" / "run_summaries" / "_manifest.json"),
+    )
+
+
+# ---- balances (background refresh) ----
+
+
+class BalanceFeed:
+    """
+    Polls CoinSpot RO balances on a daemon thread every `interval` seconds,
+    so page reruns read the last snapshot instead of calling the API.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, interval: float) -> None:
+        self.client = CoinSpotV2(api_key, api_secret)
+        self.interval = max(5.0, float(interval))
+        self.rows: list[dict[str, Any]] | None = None
+        self.error: str | None = None
+        self.updated_at: float | None = None
+        self._wake = threading.Event()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _fetch(self) -> None:
+        try:
+            bals = parse_balances(self.client.ro_balances())
+            rows = [{"coin": k, "balance": v} for k, v in bals.items()]
+            self.rows, self.error = rows, None
+        except Exception as e:
+            self.error = str(e)
+        self.updated_at = time.time()
+
+    def _loop(self) -> None:
+        while True:
+            self._fetch()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self) -> None:
+        self._wake.set()
+
+
+@st.cache_resource(show_spinner=False)
+def balance_feed(
+    api_key: str, api_secret: str, interval: float = BALANCE_REFRESH_SEC
+) -> BalanceFeed:
+    return BalanceFeed(api_key, api_secret, interval)
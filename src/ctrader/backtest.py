@@ -3,15 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from ctrader.config_loader import load_pools_config
-from ctrader.data_providers.marketdata import fetch_fx_usd_to_aud, fetch_history_daily
-from ctrader.risk.rebalancer import create_rebalance_plan
-from ctrader.risk.risk_manager import RiskRules, enforce_caps
-from ctrader.strategies.inverse_vol import inverse_vol_weights
-from ctrader.strategies.momentum import boost_top_k, momentum_12_1
-from ctrader.strategies.trend_filter import apply_trend_filter
+from ctrader.risk.rebalancer import BUY, HOLD, capped_order, plan_orders
+from ctrader.strategies.panel import PricePanel, load_price_panel
+from ctrader.strategies.pipeline import Pipeline
 
 
 @dataclass
@@ -23,122 +21,90 @@ class BtConfig:
     min_order_value: float = 5.0
 
 
-def _to_aud(series: list[float], fx: float | None, quote: str) -> list[float]:
-    if (quote or "").upper() == "AUD" and fx:
-        return [p * fx for p in series]
-    return series
+def signal_weights(
+    cfg: dict, pool: str, assets: list[str], prices: np.ndarray
+) -> np.ndarray:
+    """
+    Target weights for every day at once (rows = days, cols = `assets`, the
+    pool's assets as columns of `prices`), using only prices up to and
+    including each day.
+    """
+    pipe = Pipeline.from_config(cfg, pool)
+    w = pipe.run(PricePanel(list(assets), np.arange(len(prices)), prices))
+    return w[:, [pipe.assets.index(a) for a in assets]]
 
 
-def run_backtest(cfg_path: str | Path, pool: str, bt_days: int = 365) -> pd.DataFrame:
-    cfg = load_pools_config(cfg_path)
+# --------------------------- simulation ---------------------------
+
+
+def run_backtest_panel(
+    cfg: dict, pool: str, panel: PricePanel, bt_days: int = 365
+) -> pd.DataFrame:
+    """Run the daily rebalance simulation for `pool` over the last `bt_days` of `panel`."""
     g = cfg.get("global", {})
     pcfg = cfg["pools"][pool]
-    quote = g.get("quote_currency", "AUD").upper()
-    fee_bps = float(g.get("fee_bps", 10))
-    slip_bps = float(g.get("slippage_bps", 5))
+    fees = float(g.get("fee_bps", 10)) / 10000.0
+    slip = float(g.get("slippage_bps", 5)) / 10000.0
     thresh = float(cfg.get("rebalance", {}).get("threshold_pct", 0.0))
-    assets = list(pcfg["assets"].keys())
-    fx = fetch_fx_usd_to_aud() if quote == "AUD" else None
-    hist_map = {
-        a: _to_aud(
-            [
-                p
-                for _, p in fetch_history_daily(
-                    a, vs="usd", days=max(bt_days + 400, 800)
-                )
-            ],
-            fx,
-            quote,
-        )
-        for a in assets
-    }
+    # optional gross turnover cap (sell_first), as % of pre-trade equity
+    cap_pct = float(cfg.get("backtest", {}).get("turnover_cap_pct", 0.0))
+    min_order_value = 5.0
+    qty_precision = 6
+
+    pipe = Pipeline.from_config(cfg, pool)
+    assets = pipe.assets
+    prices = panel.select(assets)
+    weights = pipe.run(panel)
+    n = min(int(bt_days), len(prices))
+    px_bt = np.nan_to_num(prices[len(prices) - n :], nan=0.0)
+    w_bt = weights[len(weights) - n :]
+
+    # trades execute in ticker order, like create_rebalance_plan
+    order = np.argsort(np.array(assets, dtype=object), kind="stable")
     cash = float(pcfg.get("initial_equity", 10000))
-    holdings = {a: 0.0 for a in assets}
-    rows = []
-    for i in range(-bt_days, 0):
-        prices = {
-            a: (hist_map[a][i] if len(hist_map[a]) >= -i else 0.0) for a in assets
-        }
-        w = dict(pcfg["assets"])
-        w = apply_trend_filter(
-            w,
-            "binance",
-            quote,
-            int(g.get("trend_filter_sma_days", 200)),
-            float(g.get("trend_min_weight", 0.25)),
-        )
-        if cfg.get("sizing", {}).get("risk_parity", True):
-            szz = cfg["sizing"]
-            w = inverse_vol_weights(
-                w,
-                "binance",
-                quote,
-                int(szz.get("vol_lookback_days", 30)),
-                float(szz.get("vol_floor", 0.0005)),
-                float(szz.get("risk_parity_strength", 1.0)),
-            )
-        if cfg.get("momentum", {}).get("enabled", True):
-            mom = cfg["momentum"]
-            scores = momentum_12_1(
-                list(w.keys()),
-                "binance",
-                quote,
-                int(mom.get("lookback_months", 12)),
-                int(mom.get("skip_recent_months", 1)),
-            )
-            w = boost_top_k(
-                w,
-                scores,
-                int(mom.get("top_k", 6)),
-                float(mom.get("momentum_boost_pct", 0.04)),
-            )
-        rules = RiskRules(
-            float(pcfg.get("max_per_asset_pct", 100)),
-            float(pcfg.get("max_meme_bucket_pct", 100)),
-            float(pcfg.get("max_ai_bucket_pct", 100)),
-            pcfg.get("per_asset_caps", {}),
+    holdings = np.zeros(len(assets))
+    eq_out = np.empty(n)
+    cash_out = np.empty(n)
+    qty_out = np.empty((n, len(assets)))
+    for d in range(n):
+        px = px_bt[d]
+        equity = cash + float(holdings @ px)
+        live = px > 0
+        targets = np.where(live, equity * w_bt[d] / np.where(live, px, 1.0), 0.0)
+        side, qty, value = plan_orders(
+            holdings, targets, px, thresh, min_order_value, qty_precision
         )
-        w = enforce_caps(w, pcfg.get("categories", {}), rules)
-        equity = cash + sum(holdings[a] * prices.get(a, 0.0) for a in assets)
-        targets = {
-            a: ((equity * float(w.get(a, 0.0))) / prices[a]) if prices[a] > 0 else 0.0
-            for a in assets
-        }
-        plan = create_rebalance_plan(
-            holdings,
-            targets,
-            prices,
-            threshold_pct=thresh,
-            min_order_value=5.0,
-            qty_precision={a: 6 for a in assets},
-        )
-        fees = fee_bps / 10000.0
-        slip = slip_bps / 10000.0
-        for _, r in plan.iterrows():
-            if r["side"] == "HOLD" or float(r["qty"]) <= 0:
-                continue
-            a = r["ticker"]
-            q = float(r["qty"])
-            px = float(prices.get(a, 0.0))
-            trade_px = px * (1.0 + slip if r["side"] == "BUY" else 1.0 - slip)
-            if r["side"] == "BUY":
-                cost = q * trade_px * (1.0 + fees)
+        todo = order[side[order] != HOLD]
+        if cap_pct > 0 and len(todo):
+            # same greedy sell-first cap as the live run
+            todo = todo[capped_order(side[todo], value[todo], equity * cap_pct / 100.0)]
+        for j in todo:
+            buy = side[j] == BUY
+            trade_px = px[j] * (1.0 + slip if buy else 1.0 - slip)
+            if buy:
+                cost = qty[j] * trade_px * (1.0 + fees)
                 if cash >= cost - 1e-9:
                     cash -= cost
-                    holdings[a] = holdings.get(a, 0.0) + q
+                    holdings[j] += qty[j]
             else:
-                have = holdings.get(a, 0.0)
-                sell_q = min(q, have)
-                proceeds = sell_q * trade_px * (1.0 - fees)
-                cash += proceeds
-                holdings[a] = max(0.0, have - sell_q)
-        equity = cash + sum(holdings[a] * prices.get(a, 0.0) for a in assets)
-        rows.append(
-            {
-                "day_index": i,
-                "equity": equity,
-                "cash": cash,
-                **{f"qty_{a}": holdings[a] for a in assets},
-            }
-        )
-    return pd.DataFrame(rows)
+                sell_q = min(qty[j], holdings[j])
+                cash += sell_q * trade_px * (1.0 - fees)
+                holdings[j] = max(0.0, holdings[j] - sell_q)
+        eq_out[d] = cash + float(holdings @ px)
+        cash_out[d] = cash
+        qty_out[d] = holdings
+
+    out = pd.DataFrame(
+        {"day_index": np.arange(-n, 0), "equity": eq_out, "cash": cash_out}
+    )
+    for j, a in enumerate(assets):
+        out[f"qty_{a}"] = qty_out[:, j]
+    return out
+
+
+def run_backtest(cfg_path: str | Path, pool: str, bt_days: int = 365) -> pd.DataFrame:
+    cfg = load_pools_config(cfg_path)
+    quote = cfg.get("global", {}).get("quote_currency", "AUD").upper()
+    assets = list(cfg["pools"][pool]["assets"].keys())
+    panel = load_price_panel(assets, max(bt_days + 400, 800), quote)
+    return run_backtest_panel(cfg, pool, panel, bt_days)
@@ -7,6 +7,31 @@ from ctrader.analytics import equity_stats
 from ctrader.backtest import run_backtest
 
 
+def _run_sweep(args: argparse.Namespace, outdir: Path, stamp: str) -> None:
+    from ctrader.backtest import load_price_panel
+    from ctrader.config_loader import load_pools_config
+    from ctrader.sweep import grid_configs, parse_param_specs, random_configs, run_sweep
+
+    axes = parse_param_specs(args.param or [])
+    if not axes:
+        raise SystemExit("--sweep needs at least one --param NAME=v1,v2,...")
+    configs = (
+        grid_configs(axes)
+        if args.sweep == "grid"
+        else random_configs(axes, int(args.samples), args.seed)
+    )
+    cfg = load_pools_config(args.config)
+    quote = cfg.get("global", {}).get("quote_currency", "AUD").upper()
+    assets = list(cfg["pools"][args.pool]["assets"].keys())
+    panel = load_price_panel(assets, max(args.days + 400, 800), quote)
+    print(f"Running {len(configs)} configurations ({args.sweep}) ...")
+    res = run_sweep(cfg, args.pool, panel, int(args.days), configs, args.workers)
+    outfp = outdir / f"sweep_{args.pool}_{stamp}.csv"
+    res.to_csv(outfp, index=False)
+    print(f"Saved sweep results to: {outfp}")
+    print(res.head(10).to_string(index=False))
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument(
@@ -15,17 +40,36 @@ def main():
     )
     ap.add_argument("--pool", choices=["conservative", "aggressive"], required=True)
     ap.add_argument("--days", type=int, default=365)
+
+    # parameter sweeps
+    ap.add_argument("--sweep", choices=["grid", "random"], default=None)
+    ap.add_argument(
+        "--param",
+        action="append",
+        help="Sweep axis NAME=v1,v2,... (short name like top_k or a config path "
+        "like sizing.vol_floor). Repeatable.",
+    )
+    ap.add_argument(
+        "--samples", type=int, default=100, help="Configs to draw for --sweep random."
+    )
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)."
+    )
     args = ap.parse_args()
-    df = run_backtest(args.config, args.pool, bt_days=int(args.days))
+
     outdir = Path(__file__).resolve().parents[3] / "data" / "backtests"
     outdir.mkdir(parents=True, exist_ok=True)
-    outfp = (
-        outdir
-        / f"bt_{args.pool}_{__import__('datetime').datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.csv"
-    )
+    stamp = __import__("datetime").datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    if args.sweep:
+        _run_sweep(args, outdir, stamp)
+        return
+
+    df = run_backtest(args.config, args.pool, bt_days=int(args.days))
+    outfp = outdir / f"bt_{args.pool}_{stamp}.csv"
     df.to_csv(outfp, index=False)
     print(f"Saved backtest to: {outfp}")
-    stats = equity_stats(df["equity"])
+    stats = equity_stats(df["equity"], windows=(30, 90))
     print("Backtest stats:", stats)
 
 
@@ -1,10 +1,38 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
+import urllib.request
 
-from ctrader.data_providers.coinspot import _get as _pub_get
-from ctrader.data_providers.coinspot_v2 import CoinSpotV2
+# Only the standard library is imported up front: the default "pub" probe
+# pings /latest with urllib (tenacity, for its retries, is imported when it
+# runs). The authenticated checks import the CoinSpot client (and requests)
+# only when asked for.
+
+PUB_LATEST = "https://www.coinspot.com.au/pubapi/v2/latest"
+
+
+def _pub_latest(timeout: float = 15.0) -> dict:
+    """GET /latest, retried like `coinspot._get` (3 attempts, exponential wait)."""
+    from tenacity import (
+        retry,
+        retry_if_exception_type,
+        stop_after_attempt,
+        wait_exponential,
+    )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        retry=retry_if_exception_type((OSError,)),  # URLError, timeouts
+    )
+    def _get() -> dict:
+        req = urllib.request.Request(PUB_LATEST, headers={"Accept": "application/json"})
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return json.loads(r.read().decode("utf-8"))
+
+    return _get()
 
 
 def main():
@@ -13,9 +41,11 @@ def main():
     args = ap.parse_args()
     try:
         if args.check == "pub":
-            d = _pub_get("/latest")
+            d = _pub_latest()
             print("Public OK:", bool(d))
         else:
+            from ctrader.data_providers.coinspot_v2 import CoinSpotV2
+
             ak = os.getenv("COINSPOT_API_KEY", "").strip()
             sk = os.getenv("COINSPOT_API_SECRET", "").strip()
             cs = CoinSpotV2(ak, sk)
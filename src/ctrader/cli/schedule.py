@@ -13,11 +13,81 @@ SRC_DIR = Path(__file__).resolve().parents[3]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+DEFAULT_CONFIG = str(Path(__file__).resolve().parents[3] / "config" / "pools.yaml")
+
+
+def _run_subprocess(args: argparse.Namespace, run: int) -> None:
+    for pool in args.pool:
+        cmd = [args.python, "-m", "ctrader.cli.trade", "--pool", pool]
+        cmd += ["--config", args.config] + shlex.split(args.extra)
+        print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Run {run}: {shlex.join(cmd)}")
+        rc = subprocess.call(cmd)
+        print(f"[run {run}] {pool} exit code: {rc}")
+
+
+def _daemon(args: argparse.Namespace) -> None:
+    """
+    Run trade cycles in this process. Imports, the parsed config, the price
+    history store, SQLite cache and pooled HTTP sessions stay warm between
+    cycles; the config is re-parsed only when the file changes.
+    """
+    from ctrader.cli import trade
+    from ctrader.config_loader import ConfigCache
+
+    parser = trade.build_parser()
+    config = ConfigCache(args.config)
+    extra = shlex.split(args.extra)
+    interval = max(5, int(args.interval_sec))
+
+    run = 0
+    next_at = time.monotonic()
+    while True:
+        run += 1
+        if config.changed() and run > 1:
+            print("Config changed on disk; reloading.")
+        cfg = config.get()
+        started = time.monotonic()
+        print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Run {run}: {args.pool}")
+        try:
+            # fresh Namespace per cycle: trade.run applies config defaults to it
+            if len(args.pool) > 1:
+                # shared market data, pools executed in parallel
+                trade.run_pools(
+                    parser.parse_args(["--config", args.config] + extra),
+                    args.pool,
+                    cfg=cfg,
+                )
+            else:
+                trade.run(
+                    parser.parse_args(
+                        ["--pool", args.pool[0], "--config", args.config] + extra
+                    ),
+                    cfg=cfg,
+                )
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            print(f"[run {run}] error: {e}")
+        print(f"[run {run}] took {time.monotonic() - started:.2f}s")
+
+        if args.max_runs and run >= args.max_runs:
+            print("Reached max_runs. Exiting.")
+            return
+        next_at += interval
+        time.sleep(max(0.0, next_at - time.monotonic()))
+
 
 def main():
     ap = argparse.ArgumentParser(description="Simple scheduler for ctrader.cli.trade")
     ap.add_argument("--interval-sec", type=int, default=1800, help="How often to run.")
-    ap.add_argument("--pool", choices=["conservative", "aggressive"], required=True)
+    ap.add_argument(
+        "--pool",
+        choices=["conservative", "aggressive"],
+        action="append",
+        required=True,
+        help="Pool to run; repeat for several pools.",
+    )
+    ap.add_argument("--config", default=DEFAULT_CONFIG)
     ap.add_argument(
         "--max-runs", type=int, default=0, help="Stop after N runs (0 = infinite)."
     )
@@ -30,17 +100,26 @@ def main():
         default="",
         help='Extra args for trade, e.g. "--turnover-adaptive --notify"',
     )
+    ap.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run trade cycles in-process (warm caches/HTTP pools) instead of a subprocess per run.",
+    )
     args = ap.parse_args()
+    args.pool = list(dict.fromkeys(args.pool))
 
-    cmd_base = f"{shlex.quote(args.python)} -m ctrader.cli.trade --pool {args.pool} {args.extra}".strip()
+    if args.daemon:
+        try:
+            _daemon(args)
+        except KeyboardInterrupt:
+            print("Scheduler interrupted. Exiting.")
+        return
 
     run = 0
     while True:
         run += 1
-        print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Run {run}: {cmd_base}")
         try:
-            rc = subprocess.call(cmd_base, shell=True)
-            print(f"[run {run}] exit code: {rc}")
+            _run_subprocess(args, run)
         except KeyboardInterrupt:
             print("Scheduler interrupted. Exiting.")
             break
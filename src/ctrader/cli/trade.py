@@ -13,40 +13,56 @@ except Exception:
         sys.path.insert(0, str(SRC_DIR))
 
 import argparse
-import csv
-import json
+import copy
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
-import pandas as pd
-from dotenv import load_dotenv
-
-from ctrader.analytics import append_trades, update_equity_and_pnl
-from ctrader.config_loader import load_pools_config
-from ctrader.data_providers.coinspot import fetch_buy_price, fetch_prices_coinspot
-from ctrader.data_providers.marketdata import fetch_history_daily
-from ctrader.execution.coinspot_execution import place_plan_coinspot
-from ctrader.execution.paper import PaperLedger, simulate_exec
-from ctrader.notify import post_discord_embed
-from ctrader.portfolio import (
-    compute_drift,
-    compute_targets,
-    load_holdings,
-    save_holdings,
-)
-from ctrader.risk.rebalancer import any_drift_exceeds_threshold, create_rebalance_plan
-from ctrader.risk.risk_manager import RiskRules, enforce_caps
-from ctrader.strategies.inverse_vol import inverse_vol_weights
-from ctrader.strategies.momentum import boost_top_k, momentum_12_1
-from ctrader.strategies.trend_filter import apply_trend_filter
+if TYPE_CHECKING:
+    from ctrader.strategies.panel import PricePanel
+
+# Heavy imports (pandas, numpy, requests, strategies, exchange clients) are
+# deferred to the functions that need them, so --help, argument errors, a
+# held run lock and health probes do not pay for them at startup.
+
+# Pools planned in parallel (run_pools) still execute live orders one pool at
+# a time: they share the account's balances and the API key's nonce order.
+_LIVE_EXECUTION = threading.Lock()
 
 # --------------------------- helpers ---------------------------
 
 
 def _sma(series, window: int) -> float:
-    if not series or window <= 0 or len(series) < window:
+    """Latest `window`-day SMA of `series` (NaN if it is shorter than the window)."""
+    if window <= 0 or len(series) < window:
         return float("nan")
-    return float(sum(series[-window:]) / float(window))
+    from ctrader.indicators import sma
+
+    return float(sma(series[-window:], window)[-1])
+
+
+def _history_days(cfg: dict) -> int:
+    """
+    Longest daily window any signal in this run asks the history store for,
+    so each symbol is fetched once up front.
+    """
+    g = cfg.get("global", {})
+    szz = cfg.get("sizing", {})
+    mom = cfg.get("momentum", {})
+    ro = cfg.get("risk_off", {}).get("absolute_momentum", {})
+    mom_days = (
+        int(mom.get("lookback_months", 12)) + int(mom.get("skip_recent_months", 1))
+    ) * 30
+    return max(
+        430,
+        int(g.get("trend_filter_sma_days", 200)) + 30,
+        int(szz.get("vol_lookback_days", 30)) + 30,
+        mom_days + 30,
+        int(ro.get("sma_days", 200)) + 30,
+    )
 
 
 def _risk_off_trigger(cfg: dict, quote: str) -> bool:
@@ -57,41 +73,126 @@ def _risk_off_trigger(cfg: dict, quote: str) -> bool:
     ro = cfg.get("risk_off", {}).get("absolute_momentum", {})
     if not ro or not bool(ro.get("enabled", False)):
         return False
+    from ctrader.data_providers.marketdata import history_store
+
     sym = str(ro.get("ref_symbol", "BTC")).upper()
     days = int(ro.get("sma_days", 200))
-    hist = fetch_history_daily(sym, vs="usd", days=max(365, days + 30))
-    px = [p for _, p in hist]
+    px = history_store().prices(sym, max(365, days + 30))
     if len(px) < days:
         return False
     sma = _sma(px, days)
-    return px[-1] < sma
+    return bool(px[-1] < sma)
+
+
+def _fetch_prices(
+    symbols: list[str], quote: str, fallback_coingecko: bool
+) -> dict[str, float]:
+    """
+    CoinSpot latest prices, then CoinSpot buy quotes (and optionally
+    CoinGecko, planning only) for any missing/zero price.
+    """
+    from ctrader.data_providers.coinspot import fetch_prices_coinspot, quote_service
+
+    prices = fetch_prices_coinspot(symbols, market=quote)
+
+    # Fallback for any missing/zero prices from /pubapi/v2/latest -> buyprice
+    missing_syms = [t for t in symbols if float(prices.get(t, 0.0) or 0.0) <= 0.0]
+    quotes = quote_service()
+    quotes.prefetch(missing_syms, quote, sides=("BUY",))
+    for t in missing_syms:
+        try:
+            bp = quotes.buy(t, quote)
+            if bp:
+                prices[t] = float(bp)
+        except Exception:
+            pass
+
+    # Optional: CoinGecko fallback for stubborn missers (planning only)
+    if fallback_coingecko and missing_syms:
+        gecko = _coingecko_simple_price(missing_syms, quote)
+        for t, v in gecko.items():
+            if float(prices.get(t, 0.0)) <= 0.0 and v > 0.0:
+                prices[t] = float(v)
+    return prices
+
+
+def _signal_rows(
+    symbols: list[str], quote: str, panel: PricePanel | None = None
+) -> dict[str, dict]:
+    """Audit row (price, SMA200, 12-1 momentum) per symbol."""
+    from ctrader.data_providers.marketdata import history_store
+    from ctrader.strategies.momentum import momentum_12_1
+
+    scores = momentum_12_1(
+        symbols, quote=quote, lookback_months=12, skip_recent_months=1, panel=panel
+    )
+    rows = {}
+    for t in symbols:
+        series = history_store().prices(t, 430)
+        rows[t] = {
+            "ticker": t,
+            "price_usd": float(series[-1]) if len(series) else 0.0,
+            "sma200": _sma(series, 200),
+            "mom_12_1": scores.get(t, 0.0),
+        }
+    return rows
+
+
+@dataclass
+class SharedMarket:
+    """
+    Market data and pool-independent signals for the union of assets of
+    several pools, computed once and handed to each pool's run.
+    """
+
+    prices: dict[str, float]
+    panel: PricePanel
+    signals: dict[str, dict]
+    risk_off: bool
+
+
+def build_shared_market(
+    cfg: dict, pools: list[str], fallback_coingecko: bool = False
+) -> SharedMarket:
+    from ctrader.data_providers.marketdata import prefetch_histories
+    from ctrader.strategies.panel import load_price_panel
+
+    g = cfg.get("global", {})
+    quote = g.get("quote_currency", "AUD").upper()
+    symbols = list(
+        dict.fromkeys(s for p in pools for s in cfg["pools"][p].get("assets", {}))
+    )
+    ref_sym = str(
+        cfg.get("risk_off", {}).get("absolute_momentum", {}).get("ref_symbol", "BTC")
+    ).upper()
+    prefetch_histories(symbols + [ref_sym], _history_days(cfg))
+    panel = load_price_panel(symbols, _history_days(cfg), quote)
+    return SharedMarket(
+        prices=_fetch_prices(symbols, quote, fallback_coingecko),
+        panel=panel,
+        signals=_signal_rows(symbols, quote, panel),
+        risk_off=_risk_off_trigger(cfg, quote),
+    )
 
 
 def _read_eq_stats(pool: str) -> dict:
     """
-    Lightweight equity stats from data/equity_{pool}.csv:
+    Equity stats for the adaptive cap, from the running state that
+    update_equity_and_pnl maintains (data/state/equity_stats_{pool}.json):
       - max_drawdown (negative number)
       - vol_daily (std dev of daily pct change)
-    Safe if file missing/empty.
+    Zero until there are at least 3 equity points.
     """
-    eq_fp = Path(__file__).resolve().parents[3] / "data" / f"equity_{pool}.csv"
-    if not eq_fp.exists():
-        return {"max_drawdown": 0.0, "vol_daily": 0.0}
+    from ctrader.analytics import load_running_stats
+
+    base = Path(__file__).resolve().parents[3] / "data"
     try:
-        df = pd.read_csv(eq_fp)
-        if "equity" not in df or len(df) < 3:
-            return {"max_drawdown": 0.0, "vol_daily": 0.0}
-        eq = pd.to_numeric(df["equity"], errors="coerce").dropna()
-        if eq.empty:
-            return {"max_drawdown": 0.0, "vol_daily": 0.0}
-        r = eq.pct_change().dropna()
-        vol_daily = float(r.std()) if not r.empty else 0.0
-        cummax = eq.cummax()
-        dd = eq / cummax - 1.0
-        max_dd = float(dd.min()) if not dd.empty else 0.0
-        return {"max_drawdown": max_dd, "vol_daily": vol_daily}
+        snap = load_running_stats(pool, base).snapshot()
     except Exception:
         return {"max_drawdown": 0.0, "vol_daily": 0.0}
+    if snap["points"] < 3:
+        return {"max_drawdown": 0.0, "vol_daily": 0.0}
+    return {"max_drawdown": snap["max_drawdown"], "vol_daily": snap["vol_daily"]}
 
 
 def _adaptive_cap_pct(
@@ -158,32 +259,6 @@ class RunLock:
             pass
 
 
-def _load_last_trade_times(pool: str) -> dict[str, datetime]:
-    """
-    Read the trade log and return last trade timestamp per ticker.
-    """
-    base = Path(__file__).resolve().parents[3] / "data"
-    fp = base / f"trades_{pool}.csv"
-    out: dict[str, datetime] = {}
-    if not fp.exists():
-        return out
-    try:
-        df = pd.read_csv(fp)
-        if "ts" not in df or "ticker" not in df:
-            return out
-        for _, row in df[["ticker", "ts"]].dropna().iterrows():
-            try:
-                dt = datetime.fromisoformat(str(row["ts"]).replace("Z", "+00:00"))
-            except Exception:
-                continue
-            tck = str(row["ticker"]).upper()
-            old = out.get(tck)
-            out[tck] = dt if (old is None or dt > old) else old
-    except Exception:
-        pass
-    return out
-
-
 def _coingecko_ids() -> dict[str, str]:
     # minimal map; extend as needed
     return {
@@ -205,7 +280,7 @@ def _coingecko_simple_price(symbols: list[str], vs: str) -> dict[str, float]:
     Returns mapping TICKER -> price_in_vs (float), skips unknowns.
     Planning-only safety: never used to place live orders.
     """
-    import requests
+    from ctrader.utils import http
 
     ids_map = _coingecko_ids()
     ids = [ids_map[s] for s in symbols if s in ids_map]
@@ -213,7 +288,7 @@ def _coingecko_simple_price(symbols: list[str], vs: str) -> dict[str, float]:
         return {}
     url = "https://api.coingecko.com/api/v3/simple/price"
     try:
-        r = requests.get(
+        r = http.get(
             url, params={"ids": ",".join(ids), "vs_currencies": vs.lower()}, timeout=6
         )
         r.raise_for_status()
@@ -255,6 +330,12 @@ def _validate_pool_config(cfg: dict, pool: str) -> list[str]:
             issues.append(
                 f"categories reference unknown assets: {sorted(list(unknown))}"
             )
+        from ctrader.strategies.pipeline import Pipeline
+
+        try:
+            Pipeline.from_config(cfg, pool)
+        except ValueError as e:
+            issues.append(str(e))
     except Exception as e:
         issues.append(f"config parse error: {e}")
     return issues
@@ -263,13 +344,18 @@ def _validate_pool_config(cfg: dict, pool: str) -> list[str]:
 # --------------------------- main ---------------------------
 
 
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser()
     ap.add_argument(
         "--config",
         default=str(Path(__file__).resolve().parents[3] / "config" / "pools.yaml"),
     )
-    ap.add_argument("--pool", choices=["conservative", "aggressive"], required=True)
+    ap.add_argument("--pool", choices=["conservative", "aggressive"])
+    ap.add_argument(
+        "--pools",
+        default=None,
+        help="'all' or a comma list of pools: shared market data, plans run in parallel.",
+    )
 
     # modes & safety
     ap.add_argument("--paper", action="store_true")
@@ -331,13 +417,13 @@ def main() -> None:
         "--max-notional-pct-hard",
         type=float,
         default=80.0,
-        help="Abort if gross notional exceeds this % of equity (post cap).",
+        help="Abort if gross notional exceeds this %% of equity (post cap).",
     )
     ap.add_argument(
         "--missing-price-pct-hard",
         type=float,
         default=50.0,
-        help="Abort if more than this % of assets have missing/zero prices.",
+        help="Abort if more than this %% of assets have missing/zero prices.",
     )
     ap.add_argument(
         "--cooldown-minutes",
@@ -349,7 +435,7 @@ def main() -> None:
         "--cooldown-bypass-drift-pct",
         type=float,
         default=3.0,
-        help="If absolute position drift exceeds this %, bypass cooldown for that ticker.",
+        help="If absolute position drift exceeds this %%, bypass cooldown for that ticker.",
     )
 
     # price fallback
@@ -361,13 +447,40 @@ def main() -> None:
 
     # polling (live)
     ap.add_argument("--order-timeout-sec", type=int, default=30)
-    ap.add_argument("--poll-interval-sec", type=int, default=2)
+    ap.add_argument("--poll-interval-sec", type=float, default=2.0)
+    ap.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="Max live orders submitted/awaiting fill at the same time.",
+    )
+    ap.add_argument(
+        "--balance-max-age-sec",
+        type=float,
+        default=60.0,
+        help="Refetch the live balance snapshot once it is older than this.",
+    )
 
     # run-time quality-of-life
     ap.add_argument("--offline", action="store_true")
     ap.add_argument("--cache-ttl", type=int, default=None)
 
-    args = ap.parse_args()
+    return ap
+
+
+def run(
+    args: argparse.Namespace,
+    cfg: dict | None = None,
+    shared: SharedMarket | None = None,
+) -> None:
+    """
+    One trade cycle for `args.pool`. `cfg` is the parsed pools config; it is
+    loaded from `args.config` when not given (the daemon passes its cached
+    copy). With `shared` (see run_pools), prices, the price panel, risk-off
+    state and audit signals come from it instead of being fetched/computed
+    for this pool alone.
+    """
+    from dotenv import load_dotenv
 
     # env
     load_dotenv()
@@ -388,6 +501,36 @@ def main() -> None:
         print(f"Another run appears to be in progress (lock: {lock_file}). Exiting.")
         return
 
+    import numpy as np
+    import pandas as pd
+
+    from ctrader.analytics import (
+        append_trades,
+        load_last_trade_times,
+        update_equity_and_pnl,
+    )
+    from ctrader.config_loader import load_pools_config
+    from ctrader.data_providers.marketdata import prefetch_histories
+    from ctrader.execution.coinspot_execution import place_plan_coinspot
+    from ctrader.execution.paper import PaperLedger, simulate_exec
+    from ctrader.notify import post_discord_embed
+    from ctrader.portfolio import (
+        compute_drift,
+        compute_targets,
+        load_holdings,
+        save_holdings,
+    )
+    from ctrader.risk.rebalancer import (
+        HOLD,
+        any_drift_exceeds_threshold,
+        create_rebalance_plan,
+    )
+    from ctrader.runlog import run_log
+    from ctrader.strategies.panel import load_price_panel
+    from ctrader.strategies.pipeline import Pipeline
+    from ctrader.utils.dataset import dataset
+    from ctrader.utils.http import latency_stats as http_latency_stats
+
     # Optional Slack webhook (if present)
     SLACK_WEBHOOK = os.getenv("SLACK_WEBHOOK", "").strip()
 
@@ -397,7 +540,7 @@ def main() -> None:
         if not SLACK_WEBHOOK:
             return
         try:
-            import requests
+            from ctrader.utils import http
 
             blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
             if fields:
@@ -405,13 +548,14 @@ def main() -> None:
                 blocks.append(
                     {"type": "section", "text": {"type": "mrkdwn", "text": items}}
                 )
-            requests.post(SLACK_WEBHOOK, json={"blocks": blocks}, timeout=5)
+            http.post(SLACK_WEBHOOK, json={"blocks": blocks}, timeout=5)
         except Exception:
             pass
 
     try:
         # config
-        cfg = load_pools_config(args.config)
+        if cfg is None:
+            cfg = load_pools_config(args.config)
         issues = _validate_pool_config(cfg, args.pool)
         if issues:
             msg = "Config issues: " + "; ".join(issues)
@@ -456,72 +600,26 @@ def main() -> None:
             except Exception:
                 pass
 
-        # === BASE WEIGHTS + ADJUSTMENTS ===
-        w = dict(pcfg["assets"])
-        w = apply_trend_filter(
-            w,
-            os.getenv("EXCHANGE_ID", "binance"),
-            quote,
-            int(g.get("trend_filter_sma_days", 200)),
-            float(g.get("trend_min_weight", 0.25)),
-        )
-        if cfg.get("sizing", {}).get("risk_parity", True):
-            szz = cfg["sizing"]
-            w = inverse_vol_weights(
-                w,
-                os.getenv("EXCHANGE_ID", "binance"),
-                quote,
-                int(szz.get("vol_lookback_days", 30)),
-                float(szz.get("vol_floor", 0.0005)),
-                float(szz.get("risk_parity_strength", 1.0)),
-            )
-        if cfg.get("momentum", {}).get("enabled", True):
-            mom = cfg["momentum"]
-            scores = momentum_12_1(
-                list(w.keys()),
-                os.getenv("EXCHANGE_ID", "binance"),
-                quote,
-                int(mom.get("lookback_months", 12)),
-                int(mom.get("skip_recent_months", 1)),
-            )
-            w = boost_top_k(
-                w,
-                scores,
-                int(mom.get("top_k", 6)),
-                float(mom.get("momentum_boost_pct", 0.04)),
-            )
-
-        # === RISK CAPS ===
-        rules = RiskRules(
-            float(pcfg.get("max_per_asset_pct", 100)),
-            float(pcfg.get("max_meme_bucket_pct", 100)),
-            float(pcfg.get("max_ai_bucket_pct", 100)),
-            pcfg.get("per_asset_caps", {}),
-        )
-        w = enforce_caps(w, pcfg.get("categories", {}), rules)
+        # === BASE WEIGHTS -> PIPELINE (trend, inverse vol, momentum, caps) ===
+        pipeline = Pipeline.from_config(cfg, args.pool)
+        ref_sym = str(
+            cfg.get("risk_off", {})
+            .get("absolute_momentum", {})
+            .get("ref_symbol", "BTC")
+        ).upper()
+        if shared is None:
+            prefetch_histories(pipeline.assets + [ref_sym], _history_days(cfg))
+            panel = load_price_panel(pipeline.assets, _history_days(cfg), quote)
+        else:
+            panel = shared.panel
+        w = pipeline.last(panel)
 
         # === PRICES ===
         symbols = list(w.keys())
-        prices = fetch_prices_coinspot(symbols, market=quote)
-
-        # Fallback for any missing/zero prices from /pubapi/v2/latest -> buyprice
-        missing_syms = []
-        for t in symbols:
-            try:
-                if float(prices.get(t, 0.0)) <= 0.0:
-                    missing_syms.append(t)
-                    bp = fetch_buy_price(t, quote)
-                    if bp:
-                        prices[t] = float(bp)
-            except Exception:
-                missing_syms.append(t)
-
-        # Optional: CoinGecko fallback for stubborn missers (planning only)
-        if args.fallback_coingecko and missing_syms:
-            gecko = _coingecko_simple_price(missing_syms, quote)
-            for t, v in gecko.items():
-                if float(prices.get(t, 0.0)) <= 0.0 and v > 0.0:
-                    prices[t] = float(v)
+        if shared is None:
+            prices = _fetch_prices(symbols, quote, args.fallback_coingecko)
+        else:
+            prices = {t: float(shared.prices.get(t, 0.0)) for t in symbols}
 
         # Missing-price circuit breaker (HOTFIX: keep on one line)
         miss_after = sum(1 for t in symbols if float(prices.get(t, 0.0)) <= 0.0)
@@ -546,7 +644,7 @@ def main() -> None:
         equity = float(pcfg.get("initial_equity", 10000))
 
         # risk-off cash buffer
-        risk_off = _risk_off_trigger(cfg, quote)
+        risk_off = shared.risk_off if shared else _risk_off_trigger(cfg, quote)
         extra = (
             float(
                 cfg.get("risk_off", {})
@@ -587,7 +685,7 @@ def main() -> None:
         # === REPORTS ===
         drift = compute_drift(current, prices, targets)
         print("\n=== DRIFT REPORT ===")
-        print(drift.to_string(index=False))
+        print(drift.to_frame().to_string(index=False))
 
         # Drift alert to Discord if threshold breached
         thresh_cfg = float(cfg.get("rebalance", {}).get("threshold_pct", 0.0))
@@ -611,36 +709,32 @@ def main() -> None:
 
         # Per-asset cooldown filter (HOTFIX: keep line unwrapped)
         if args.cooldown_minutes > 0:
-            last_ts = _load_last_trade_times(args.pool)
+            last_ts = load_last_trade_times(
+                args.pool, Path(__file__).resolve().parents[3] / "data"
+            )
             cutoff = datetime.now(timezone.utc) - timedelta(
                 minutes=int(args.cooldown_minutes)
             )
-            kept_rows = []
-            for _, r in plan.iterrows():
-                t = str(r["ticker"]).upper()
-                side = str(r["side"]).upper()
-                if side == "HOLD":
-                    kept_rows.append(r)
-                    continue
-                lt = last_ts.get(t)
-                if lt and lt > cutoff:
-                    # allow bypass if drift is large (compare notional drift vs equity)
-                    try:
-                        row = drift.loc[drift["ticker"] == t].iloc[0]
-                        if abs(float(row.get("est_value", 0.0))) / max(
-                            1.0, equity
-                        ) * 100.0 >= float(args.cooldown_bypass_drift_pct):
-                            kept_rows.append(r)
-                            continue
-                    except Exception:
-                        pass
-                    # skip due to cooldown
-                    continue
-                kept_rows.append(r)
-            plan = pd.DataFrame(kept_rows) if kept_rows else plan.iloc[0:0]
+            drift_value = drift.value_by_ticker()
+            bypass_pct = float(args.cooldown_bypass_drift_pct)
+            tickers = [str(t).upper() for t in plan.ticker.tolist()]
+            cooling = np.array(
+                [bool(last_ts.get(t)) and last_ts[t] > cutoff for t in tickers],
+                dtype=bool,
+            )
+            # allow bypass if drift is large (compare notional drift vs equity)
+            bypass = np.array(
+                [
+                    t in drift_value
+                    and abs(drift_value[t]) / max(1.0, equity) * 100.0 >= bypass_pct
+                    for t in tickers
+                ],
+                dtype=bool,
+            )
+            plan = plan.take((plan.side == HOLD) | ~cooling | bypass)
 
         print("\n=== PLAN ===")
-        print(plan.to_string(index=False))
+        print(plan.to_frame().to_string(index=False))
 
         # ---------------- Turnover Cap (smart & optional) ----------------
         base_cap_pct = float(exec_cfg.get("turnover_cap_pct", 20.0))
@@ -681,48 +775,9 @@ def main() -> None:
                     webhook, "Turnover cap applied", f"Pool: {args.pool}", fields=fields
                 )
 
-            rows = plan.to_dict("records")
-            # Priority ordering
-            if cap_priority == "sell_first":
-                rows_sorted = sorted(
-                    rows,
-                    key=lambda r: (
-                        0 if r["side"] == "SELL" else 1,
-                        -float(r["est_value"]),
-                    ),
-                )
-            elif cap_priority == "largest_first":
-                rows_sorted = sorted(rows, key=lambda r: -float(r["est_value"]))
-            else:  # drift_first ~= largest_notional
-                rows_sorted = sorted(rows, key=lambda r: -float(r["est_value"]))
-
-            kept = []
-            gross_spent = 0.0
-
-            if cap_mode == "net":
-                net_spent = 0.0
-                for r in rows_sorted:
-                    v = float(r["est_value"])
-                    if v <= 0.0 or r["side"] == "HOLD":
-                        continue
-                    delta = (-v) if r["side"] == "SELL" else v
-                    new_net = net_spent + delta
-                    new_gross = gross_spent + v
-                    # Keep gross within 2x cap as a sanity brake; allow net within cap
-                    if (abs(new_net) <= cap_value) and (new_gross <= 2.0 * cap_value):
-                        kept.append(r)
-                        net_spent = new_net
-                        gross_spent = new_gross
-            else:  # gross mode
-                for r in rows_sorted:
-                    v = float(r["est_value"])
-                    if v <= 0.0 or r["side"] == "HOLD":
-                        continue
-                    if (gross_spent + v) <= cap_value:
-                        kept.append(r)
-                        gross_spent += v
-
-            plan = pd.DataFrame(kept) if kept else plan.iloc[0:0]
+            # Priority ordering, then greedy selection (net mode keeps gross
+            # within 2x cap as a sanity brake)
+            plan = plan.cap_turnover(cap_value, cap_mode, cap_priority)
             print(
                 f"Applied turnover cap {cap_pct:.1f}% ({'net' if cap_mode=='net' else 'gross'}) "
                 f"-> notional cap {cap_value:.2f}, selected {len(plan)} trades"
@@ -730,7 +785,7 @@ def main() -> None:
         # ------------------------------------------------------------------
 
         # Circuit breakers (post-cap)
-        gross_notional = float(plan["est_value"].sum()) if len(plan) else 0.0
+        gross_notional = float(plan.est_value.sum())
         if args.max_trades_hard is not None and len(plan) > int(args.max_trades_hard):
             msg = f"Hard break: trades={len(plan)} > max_trades_hard={args.max_trades_hard}. Aborting."
             print(msg)
@@ -759,57 +814,34 @@ def main() -> None:
                 )
                 return
 
-        # Per-run CSV (plan snapshot)
-        summaries = Path(__file__).resolve().parents[3] / "data" / "run_summaries"
-        summaries.mkdir(parents=True, exist_ok=True)
-        run_ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-        run_file = summaries / f"run_{args.pool}_{run_ts}_trades.csv"
-        with open(run_file, "w", newline="", encoding="utf-8") as f:
-            wcsv = csv.writer(f)
-            wcsv.writerow(["ticker", "side", "qty", "est_value", "price_used"])
-            for _, r in plan.iterrows():
-                wcsv.writerow(
-                    [
-                        r["ticker"],
-                        r["side"],
-                        float(r["qty"]),
-                        float(r["est_value"]),
-                        float(prices.get(r["ticker"], 0.0)),
-                    ]
-                )
+        # Per-run plan snapshot (data/datasets/run_summaries, partitioned by pool/date)
+        base_dir = Path(__file__).resolve().parents[3] / "data"
+        run_at = datetime.now(timezone.utc)
+        run_ts = run_at.strftime("%Y%m%dT%H%M%SZ")
+        run_file = dataset("run_summaries", base_dir).write(
+            args.pool,
+            plan.to_frame().rename(columns={"price": "price_used"}),
+            run_at,
+        )
         print(f"\nSaved run summary: {run_file}")
 
         # Signals log (audit)
-        import csv as _csv
-
-        from ctrader.data_providers.marketdata import fetch_history_daily as _hist
-        from ctrader.strategies.momentum import momentum_12_1 as _mom_12_1
-
-        sig_dir = Path(__file__).resolve().parents[3] / "data" / "signals"
-        sig_dir.mkdir(parents=True, exist_ok=True)
-        sig_file = sig_dir / f"signals_{args.pool}_{run_ts}.csv"
-        with open(sig_file, "w", newline="", encoding="utf-8") as sf:
-            wcsv = _csv.writer(sf)
-            wcsv.writerow(["ticker", "price_usd", "sma200", "mom_12_1"])
-            for t in symbols:
-                h = _hist(t, vs="usd", days=430)
-                series = [p for _, p in h]
-                px = series[-1] if series else 0.0
-                sma200 = _sma(series, 200)
-                scores = _mom_12_1(
-                    [t], os.getenv("EXCHANGE_ID", "binance"), quote, 12, 1
-                )
-                wcsv.writerow([t, px, sma200, scores.get(t, 0.0)])
+        signals = shared.signals if shared else _signal_rows(symbols, quote, panel)
+        sig_rows = [signals[t] for t in symbols if t in signals]
+        sig_file = dataset("signals", base_dir).write(
+            args.pool,
+            pd.DataFrame(
+                sig_rows, columns=["ticker", "price_usd", "sma200", "mom_12_1"]
+            ),
+            run_at,
+        )
         print(f"Saved signals: {sig_file}")
 
         # === GUARD PREVIEW (no live orders) ===
         thresh = args.guard if args.guard is not None else args.coinspot_threshold
         if args.preview_guards and (args.coinspot_use_quote or thresh is not None):
             print("\n=== GUARD PREVIEW ===")
-            for _, r in plan.iterrows():
-                t = r["ticker"]
-                side = r["side"]
-                q = float(r["qty"])
+            for t, side, q, _, _ in plan.rows():
                 if side == "HOLD" or abs(q) < 1e-9:
                     print(f"{t}: HOLD")
                     continue
@@ -864,29 +896,28 @@ def main() -> None:
             _slack("Paper run complete", {"trades": len(plan)})
         else:
             # Live (CoinSpot V2)
-            res = place_plan_coinspot(
-                plan,
-                prices,
-                quote,
-                use_quote=args.coinspot_use_quote,
-                threshold_pct=thresh,
-                direction=args.coinspot_direction,
-                mode=args.mode,
-                max_trades=args.max_trades,
-                notify=notify_embed if args.notify and webhook else None,
-                order_timeout_sec=int(args.order_timeout_sec),
-                poll_interval_sec=int(args.poll_interval_sec),
-            )
+            with _LIVE_EXECUTION:
+                res = place_plan_coinspot(
+                    plan,
+                    prices,
+                    quote,
+                    use_quote=args.coinspot_use_quote,
+                    threshold_pct=thresh,
+                    direction=args.coinspot_direction,
+                    mode=args.mode,
+                    max_trades=args.max_trades,
+                    notify=notify_embed if args.notify and webhook else None,
+                    order_timeout_sec=int(args.order_timeout_sec),
+                    poll_interval_sec=float(args.poll_interval_sec),
+                    max_in_flight=int(args.max_in_flight),
+                    balance_max_age_sec=float(args.balance_max_age_sec),
+                )
             updated = current.copy()
-            for _, r in plan.iterrows():
-                if r["side"] == "BUY":
-                    updated[r["ticker"]] = updated.get(r["ticker"], 0.0) + float(
-                        r["qty"]
-                    )
-                elif r["side"] == "SELL":
-                    updated[r["ticker"]] = max(
-                        0.0, updated.get(r["ticker"], 0.0) - abs(float(r["qty"]))
-                    )
+            for t, side, q, _, _ in plan.rows():
+                if side == "BUY":
+                    updated[t] = updated.get(t, 0.0) + q
+                elif side == "SELL":
+                    updated[t] = max(0.0, updated.get(t, 0.0) - abs(q))
             print("\n=== LIVE RESULTS ===")
             for x in res:
                 print(x)
@@ -907,8 +938,6 @@ def main() -> None:
         print("\nSaved holdings and updated equity/PnL/trade logs.")
 
         # Run-level JSONL log (for BI/audit)
-        logs_dir = base_data / "logs"
-        logs_dir.mkdir(parents=True, exist_ok=True)
         runlog = {
             "ts": run_ts,
             "pool": args.pool,
@@ -923,15 +952,70 @@ def main() -> None:
             "trades_selected": int(len(plan)),
             "missing_price_pct": miss_pct,
             "paper": bool(args.paper),
+            "http": http_latency_stats(),
         }
-        with open(logs_dir / "runs.jsonl", "a", encoding="utf-8") as jf:
-            jf.write(json.dumps(runlog) + "\n")
+        run_log(base_data).append(runlog)
 
     finally:
         # always release the run lock
         run_lock.release()
 
 
+def run_pools(
+    args: argparse.Namespace, pools: list[str], cfg: dict | None = None
+) -> None:
+    """
+    Run several pools in one invocation: market data and shared signals are
+    built once for the union of their assets, then each pool's plan is
+    built on its own thread (each with its own RunLock, holdings and
+    ledgers). Live order execution is serialised across the pools.
+    """
+    from dotenv import load_dotenv
+
+    from ctrader.config_loader import load_pools_config
+
+    load_dotenv()
+    if args.offline:
+        os.environ["OFFLINE_MODE"] = "true"
+    if args.cache_ttl is not None:
+        os.environ["CACHE_TTL_SEC"] = str(args.cache_ttl)
+    if cfg is None:
+        cfg = load_pools_config(args.config)
+    shared = build_shared_market(cfg, pools, args.fallback_coingecko)
+
+    def _one(pool: str) -> None:
+        pargs = copy.copy(args)
+        pargs.pool = pool
+        try:
+            run(pargs, cfg=cfg, shared=shared)
+        except Exception as e:
+            print(f"[{pool}] run failed: {e}")
+
+    with ThreadPoolExecutor(max_workers=len(pools)) as ex:
+        list(ex.map(_one, pools))
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.pools:
+        from ctrader.config_loader import load_pools_config
+
+        cfg = load_pools_config(args.config)
+        known = list(cfg.get("pools", {}))
+        if args.pools.strip().lower() == "all":
+            pools = known
+        else:
+            pools = [p.strip() for p in args.pools.split(",") if p.strip()]
+        unknown = [p for p in pools if p not in known]
+        if unknown or not pools:
+            ap.error(f"--pools: unknown pool(s) {unknown}; choose from {known}")
+        run_pools(args, pools, cfg)
+        return
+    if not args.pool:
+        ap.error("one of --pool or --pools is required")
+    run(args)
+
+
 if __name__ == "__main__":
     main()
-
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import threading
 from pathlib import Path
 
 import yaml
@@ -11,3 +13,35 @@ def load_pools_config(path: str | Path) -> dict:
         raise FileNotFoundError(f"Config not found: {p}")
     with open(p, "r", encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
+
+
+class ConfigCache:
+    """
+    Parsed pools config that is re-read only when the file's mtime or size
+    changes. `get` returns the same dict object until then.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._key: tuple[int, int] | None = None
+        self._cfg: dict | None = None
+        self._lock = threading.Lock()
+
+    def _stat_key(self) -> tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> dict:
+        with self._lock:
+            key = self._stat_key()
+            if self._cfg is None or key != self._key:
+                self._cfg = load_pools_config(self.path)
+                self._key = key
+            return self._cfg
+
+    def changed(self) -> bool:
+        """True if the file differs from the last loaded version."""
+        try:
+            return self._stat_key() != self._key
+        except OSError:
+            return True
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, cast
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, cast
 
 import requests
 from tenacity import (
@@ -10,6 +14,8 @@ from tenacity import (
     wait_exponential,
 )
 
+from ctrader.utils import http
+
 PUB_BASE = "https://www.coinspot.com.au/pubapi/v2"
 
 
@@ -20,7 +26,7 @@ PUB_BASE = "https://www.coinspot.com.au/pubapi/v2"
 )
 def _get(path: str) -> dict:
     url = PUB_BASE + path
-    r = requests.get(url, timeout=15)
+    r = http.get(url, timeout=15)
     r.raise_for_status()
     return cast(dict[Any, Any], r.json())
 
@@ -67,3 +73,74 @@ def fetch_sell_price(symbol: str, market: str = "AUD") -> float | None:
         return float(data.get("rate", 0.0)) or None
     except Exception:
         return None
+
+
+class QuoteService:
+    """
+    Short-lived in-memory cache of CoinSpot buy/sell quotes.
+
+    `prefetch` pulls every (symbol, side) pair it is given in one concurrent
+    batch; `quote` serves from the cache while an entry is younger than
+    `ttl_sec` and falls back to a single fetch otherwise.
+    """
+
+    def __init__(self, ttl_sec: float = 5.0, max_workers: int = 8) -> None:
+        self.ttl_sec = float(ttl_sec)
+        self.max_workers = max(1, int(max_workers))
+        self._quotes: dict[tuple[str, str, str], tuple[float, float | None]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(symbol: str, side: str, market: str) -> tuple[str, str, str]:
+        return symbol.upper(), side.upper(), (market or "AUD").upper()
+
+    def _fetch(self, symbol: str, side: str, market: str) -> float | None:
+        if side.upper() == "BUY":
+            rate = fetch_buy_price(symbol, market)
+        else:
+            rate = fetch_sell_price(symbol, market)
+        with self._lock:
+            self._quotes[self._key(symbol, side, market)] = (time.monotonic(), rate)
+        return rate
+
+    def _cached(self, symbol: str, side: str, market: str) -> tuple[bool, float | None]:
+        with self._lock:
+            hit = self._quotes.get(self._key(symbol, side, market))
+        if hit is None or time.monotonic() - hit[0] > self.ttl_sec:
+            return False, None
+        return True, hit[1]
+
+    def prefetch(
+        self,
+        symbols: Iterable[str],
+        market: str = "AUD",
+        sides: Iterable[str] = ("BUY", "SELL"),
+    ) -> None:
+        todo = [
+            (s, side)
+            for s in dict.fromkeys(symbols)
+            for side in sides
+            if not self._cached(s, side, market)[0]
+        ]
+        if not todo:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(todo))) as ex:
+            list(ex.map(lambda t: self._fetch(t[0], t[1], market), todo))
+
+    def quote(self, symbol: str, side: str, market: str = "AUD") -> float | None:
+        fresh, rate = self._cached(symbol, side, market)
+        return rate if fresh else self._fetch(symbol, side, market)
+
+    def buy(self, symbol: str, market: str = "AUD") -> float | None:
+        return self.quote(symbol, "BUY", market)
+
+    def sell(self, symbol: str, market: str = "AUD") -> float | None:
+        return self.quote(symbol, "SELL", market)
+
+
+_QUOTES = QuoteService(ttl_sec=float(os.getenv("COINSPOT_QUOTE_TTL_SEC", "5")))
+
+
+def quote_service() -> QuoteService:
+    """Process-wide quote cache shared by price fallback and execution guards."""
+    return _QUOTES
@@ -3,20 +3,59 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
+import threading
 import time
 from typing import Any, Dict
 
 try:
-    import requests
+    from ctrader.utils import http
 except ImportError:  # pragma: no cover
-    requests = None  # type: ignore[assignment]
+    http = None  # type: ignore[assignment]
 
 API_BASE = "https://www.coinspot.com.au/api"
 RO_BASE = "https://www.coinspot.com.au/api/ro"
 
 
+_NONCE_LOCK = threading.Lock()
+_LAST_NONCE = 0
+
+# CoinSpot rejects a nonce lower than the last one it saw for the key, so
+# signed requests for one key go out one at a time across every client
+# instance in the process (e.g. several pools trading on the same account).
+_LANES: dict[str, threading.Lock] = {}
+_LANES_LOCK = threading.Lock()
+
+
+def _lane_for(api_key: str) -> threading.Lock:
+    with _LANES_LOCK:
+        return _LANES.setdefault(api_key, threading.Lock())
+
+
+def parse_balances(ro: dict) -> dict[str, float]:
+    """{SYM: balance} from an RO balances response."""
+    raw = (ro or {}).get("balances", {}) or {}
+    # v2 returns a list of {SYM: {...}} items; older responses a flat dict
+    items = (
+        [kv for d in raw if isinstance(d, dict) for kv in d.items()]
+        if isinstance(raw, list)
+        else list(raw.items())
+    )
+    out: dict[str, float] = {}
+    for k, v in items:
+        try:
+            val = v.get("balance") if isinstance(v, dict) else v
+            out[str(k).strip().upper()] = float(val)
+        except Exception:
+            continue
+    return out
+
+
 def _nonce() -> str:
-    return str(int(time.time() * 1000))
+    """Millisecond nonce, strictly increasing within the process."""
+    global _LAST_NONCE
+    with _NONCE_LOCK:
+        _LAST_NONCE = max(int(time.time() * 1000), _LAST_NONCE + 1)
+        return str(_LAST_NONCE)
 
 
 def _headers(api_key: str, api_secret: str, payload: Dict[str, Any]) -> Dict[str, str]:
@@ -26,9 +65,9 @@ def _headers(api_key: str, api_secret: str, payload: Dict[str, Any]) -> Dict[str
 
 
 def _post(url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
-    if requests is None:
+    if http is None:
         return {"success": False, "error": "requests not available", "url": url}
-    r = requests.post(url, headers=headers, data=json.dumps(payload))
+    r = http.post(url, headers=headers, data=json.dumps(payload))
     try:
         data = r.json()
     except Exception:
@@ -49,24 +88,23 @@ class CoinSpotV2:
     def __init__(self, api_key: str, api_secret: str) -> None:
         self.api_key = api_key
         self.api_secret = api_secret
+        self._lane = _lane_for(api_key)
+
+    def _signed_post(self, url: str, payload: Dict[str, Any] | None) -> Dict[str, Any]:
+        data: Dict[str, Any] = dict(payload or {})
+        with self._lane:
+            data.setdefault("nonce", _nonce())
+            return _post(url, _headers(self.api_key, self.api_secret, data), data)
 
     def _auth_post(
         self, path: str, payload: Dict[str, Any] | None = None
     ) -> Dict[str, Any]:
-        data: Dict[str, Any] = dict(payload or {})
-        data.setdefault("nonce", _nonce())
-        return _post(
-            API_BASE + path, _headers(self.api_key, self.api_secret, data), data
-        )
+        return self._signed_post(API_BASE + path, payload)
 
     def _ro_post(
         self, path: str, payload: Dict[str, Any] | None = None
     ) -> Dict[str, Any]:
-        data: Dict[str, Any] = dict(payload or {})
-        data.setdefault("nonce", _nonce())
-        return _post(
-            RO_BASE + path, _headers(self.api_key, self.api_secret, data), data
-        )
+        return self._signed_post(RO_BASE + path, payload)
 
     # -------- Authenticated --------
     def status(self) -> Dict[str, Any]:
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Iterable, cast
 
+import numpy as np
 import requests
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from tenacity import RetryCallState, retry, stop_after_attempt, wait_exponential
 
-from ctrader.utils.cache import JsonDiskCache
+from ctrader.utils import http
+from ctrader.utils.cache import SeriesCache
+from ctrader.utils.ratelimit import RetryBudget, TokenBucket
 
 COINGECKO_IDS = {
     "BTC": "bitcoin",
@@ -33,49 +35,287 @@ COINGECKO_IDS = {
 }
 
 
-def _cache() -> JsonDiskCache:
+_CACHES: dict[tuple[str, int], SeriesCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def _cache() -> SeriesCache:
     ttl = int(os.getenv("CACHE_TTL_SEC", "86400"))
-    base = Path(__file__).resolve().parents[3] / "data" / "cache"
-    return JsonDiskCache(base, ttl_sec=ttl)
+    max_mb = int(os.getenv("CACHE_MAX_MB", "256"))
+    fp = Path(__file__).resolve().parents[3] / "data" / "cache" / "cache.sqlite3"
+    with _CACHES_LOCK:
+        cache = _CACHES.get((str(fp), ttl))
+        if cache is None:
+            cache = SeriesCache(fp, ttl_sec=ttl, max_bytes=max_mb * 1024 * 1024)
+            # stale series are kept (and extended incrementally) for a while
+            retention = int(os.getenv("CACHE_RETENTION_SEC", str(30 * 86400)))
+            cache.evict_expired(max(ttl, retention))
+            _CACHES[(str(fp), ttl)] = cache
+    return cache
+
+
+def close_caches() -> None:
+    """
+    Close and forget the open series caches; the next `_cache()` reopens
+    them. Call before forking workers: a SQLite connection must not be
+    inherited across fork.
+    """
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+        _CACHES.clear()
+    for cache in caches:
+        cache.close()
 
 
 def _offline() -> bool:
     return str(os.getenv("OFFLINE_MODE", "false")).lower() == "true"
 
 
+# CoinGecko's public tier allows roughly 30 calls/min; every attempt (retries
+# included) takes a token, across all threads.
+_LIMITER = TokenBucket(
+    float(os.getenv("COINGECKO_RATE_PER_SEC", "0.5")),
+    burst=int(os.getenv("COINGECKO_BURST", "5")),
+)
+# Set by prefetch_histories so a batch of fetches shares one retry allowance.
+_RETRY_BUDGET: ContextVar[RetryBudget | None] = ContextVar(
+    "_RETRY_BUDGET", default=None
+)
+
+
+def _should_retry(rs: RetryCallState) -> bool:
+    if rs.outcome is None or not rs.outcome.failed:
+        return False
+    if not isinstance(rs.outcome.exception(), requests.RequestException):
+        return False
+    budget = _RETRY_BUDGET.get()
+    return budget is None or budget.take()
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(min=1, max=8),
-    retry=retry_if_exception_type(requests.RequestException),
+    retry=_should_retry,
+    reraise=True,
 )
 def _http_json(url: str) -> dict:
-    r = requests.get(url, timeout=20)
+    _LIMITER.acquire()
+    r = http.get(url, timeout=20)
     r.raise_for_status()
     return cast(dict[Any, Any], r.json())
 
 
-def fetch_history_daily(
-    symbol: str, vs: str = "usd", days: int = 730
-) -> list[tuple[int, float]]:
+_DAY_MS = 86_400_000
+
+
+def _empty_history() -> tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+def _market_chart(cid: str, vs: str, days: int) -> np.ndarray:
+    url = f"https://api.coingecko.com/api/v3/coins/{cid}/market_chart?vs_currency={vs}&days={days}&interval=daily"
+    data = _http_json(url)
+    return np.asarray(data.get("prices", []), dtype=np.float64).reshape(-1, 2)
+
+
+def _merge_history(old: np.ndarray | None, new: np.ndarray) -> np.ndarray:
+    """
+    Splice freshly fetched rows onto the cached series: cached days before the
+    first new day are kept, everything after is replaced, one point per day.
+    """
+    if old is None or not len(old):
+        arr = new
+    elif not len(new):
+        arr = old
+    else:
+        first_new_day = new[:, 0].min() // _DAY_MS
+        arr = np.vstack([old[old[:, 0] // _DAY_MS < first_new_day], new])
+    if not len(arr):
+        return arr
+    day = arr[:, 0] // _DAY_MS
+    return arr[np.r_[day[1:] != day[:-1], True]]  # last point of each day wins
+
+
+def _tail(arr: np.ndarray | None, days: int) -> tuple[np.ndarray, np.ndarray]:
+    if arr is None or not len(arr):
+        return _empty_history()
+    arr = arr[-(int(days) + 1) :]  # days + 1 points, like market_chart
+    return arr[:, 0].astype(np.int64), arr[:, 1]
+
+
+def fetch_history_array(
+    symbol: str, vs: str = "usd", days: int = 730, max_age_sec: float | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Daily history as (timestamps_ms int64, prices float64) arrays.
+
+    All windows for a coin are served from one cached, growing series. When
+    the series is older than CACHE_TTL_SEC (or `max_age_sec`, if smaller)
+    only the days after its last point are downloaded; the full window is
+    fetched only if the cache does not reach back far enough.
+    """
     if symbol not in COINGECKO_IDS:
-        return []
+        return _empty_history()
     cid = COINGECKO_IDS[symbol]
-    key = f"cg:hist:{cid}:{vs}:{days}:daily"
+    key = f"cg:series:{cid}:{vs}:daily"
     cache = _cache()
-    hit = cache.get(key)
-    if hit is not None:
-        return [(int(t), float(p)) for t, p in hit]
-    if _offline():
-        return hit or []
-    url = f"https://api.coingecko.com/api/v3/coins/{cid}/market_chart?vs_currency={vs}&days={days}&interval=daily"
+    entry = cache.get_entry(key)
+    cached, stored_at = entry if entry is not None else (None, 0.0)
+    meta = cache.get_entry(f"{key}:meta")
+    complete = bool(meta and meta[0].get("complete"))
+
+    now_ms = time.time() * 1000.0
+    want_from = now_ms - int(days) * _DAY_MS
+    covered = cached is not None and len(cached) > 0
+    covered = covered and (complete or cached[0, 0] <= want_from + 2 * _DAY_MS)
+    ttl = cache.ttl_sec if max_age_sec is None else min(cache.ttl_sec, max_age_sec)
+    fresh = time.time() - stored_at <= ttl
+    if (covered and fresh) or _offline():
+        return _tail(cached, days)
+
     try:
-        data = _http_json(url)
-        prices = data.get("prices", [])
-        out = [(int(t), float(p)) for t, p in prices]
-        cache.set(key, out)
-        return out
+        if covered:
+            missing = int(np.ceil((now_ms - cached[-1, 0]) / _DAY_MS)) + 1
+            new = _market_chart(cid, vs, min(int(days), max(1, missing)))
+        else:
+            # over-fetch a month so the head stays covered while the tail grows
+            full_days = int(days) + 30
+            new = _market_chart(cid, vs, full_days)
+            # fewer days than asked for: the coin's full history is cached now
+            if len(new) and new[0, 0] > now_ms - (full_days - 2) * _DAY_MS:
+                cache.set(f"{key}:meta", {"complete": True})
+        merged = _merge_history(cached, new)
+        cache.set(key, merged)
+        return _tail(merged, days)
     except Exception:
-        return hit or []
+        return _tail(cached, days)
+
+
+def fetch_history_daily(
+    symbol: str, vs: str = "usd", days: int = 730
+) -> list[tuple[int, float]]:
+    ts, px = fetch_history_array(symbol, vs=vs, days=days)
+    return list(zip(ts.tolist(), px.tolist()))
+
+
+class HistoryStore:
+    """
+    In-process daily price history, one NumPy array per symbol.
+
+    Each symbol is fetched once with the longest window requested so far;
+    callers asking for a shorter window get a slice of the same array.
+    Symbols loaded more than `max_age_sec` ago are refreshed on the next
+    request (long-lived processes; one-shot runs never hit this). A refresh
+    bypasses SQLite cache entries older than `max_age_sec`, so it picks up
+    new prices rather than re-reading a series cached up to CACHE_TTL_SEC ago.
+    """
+
+    def __init__(
+        self, vs: str = "usd", min_days: int = 430, max_age_sec: float | None = None
+    ) -> None:
+        self.vs = vs
+        self.min_days = int(min_days)
+        if max_age_sec is None:
+            max_age_sec = float(os.getenv("HISTORY_MAX_AGE_SEC", "900"))
+        self.max_age_sec = float(max_age_sec)
+        self._ts: dict[str, np.ndarray] = {}
+        self._px: dict[str, np.ndarray] = {}
+        self._days: dict[str, int] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, symbol: str, days: int) -> bool:
+        if self._days.get(symbol, 0) < days:
+            return False
+        age = time.monotonic() - self._loaded_at.get(symbol, 0.0)
+        return self.max_age_sec <= 0 or age <= self.max_age_sec
+
+    def require(self, symbols: Iterable[str], days: int) -> None:
+        """Make sure every symbol is loaded with at least `days` of history."""
+        self.prefetch(symbols, days)
+
+    def prefetch(
+        self,
+        symbols: Iterable[str],
+        days: int,
+        max_workers: int | None = None,
+        retries: int | None = None,
+    ) -> None:
+        """
+        Load every symbol that is missing or too short, concurrently.
+
+        Fetches run on a bounded thread pool behind the shared CoinGecko rate
+        limiter and draw on one retry budget for the whole batch.
+        """
+        want = max(int(days), self.min_days)
+        todo = list(dict.fromkeys(s for s in symbols if not self._fresh(s, want)))
+        if not todo:
+            return
+        workers = int(max_workers or os.getenv("PREFETCH_WORKERS", "4"))
+        budget = RetryBudget(len(todo) if retries is None else retries)
+
+        def _one(sym: str) -> None:
+            token = _RETRY_BUDGET.set(budget)
+            try:
+                self._load(sym, want)
+            finally:
+                _RETRY_BUDGET.reset(token)
+
+        if len(todo) == 1 or workers <= 1:
+            for sym in todo:
+                _one(sym)
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as ex:
+            list(ex.map(_one, todo))
+
+    def _load(self, symbol: str, days: int) -> None:
+        refresh = symbol in self._loaded_at and self.max_age_sec > 0
+        ts, px = fetch_history_array(
+            symbol,
+            vs=self.vs,
+            days=days,
+            max_age_sec=self.max_age_sec if refresh else None,
+        )
+        with self._lock:
+            self._ts[symbol] = ts
+            self._px[symbol] = px
+            self._days[symbol] = days
+            self._loaded_at[symbol] = time.monotonic()
+
+    def history(self, symbol: str, days: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps_ms, prices) for roughly the last `days` days."""
+        self.require([symbol], days)
+        ts = self._ts.get(symbol)
+        px = self._px.get(symbol)
+        if ts is None or px is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        n = int(days) + 1  # CoinGecko returns days + 1 points (incl. today)
+        return ts[-n:], px[-n:]
+
+    def prices(self, symbol: str, days: int) -> np.ndarray:
+        return self.history(symbol, days)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ts.clear()
+            self._px.clear()
+            self._days.clear()
+            self._loaded_at.clear()
+
+
+_STORE = HistoryStore()
+
+
+def history_store() -> HistoryStore:
+    """Process-wide history store shared by strategies, backtests and the CLI."""
+    return _STORE
+
+
+def prefetch_histories(
+    symbols: Iterable[str], days: int, max_workers: int | None = None
+) -> None:
+    """Warm the shared history store for all `symbols` in one concurrent batch."""
+    _STORE.prefetch(symbols, days, max_workers=max_workers)
 
 
 def fetch_fx_usd_to_aud() -> float | None:
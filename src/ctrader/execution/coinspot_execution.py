@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 import time
 from typing import Callable, Dict, Optional
 
-import pandas as pd
-
-from ctrader.data_providers.coinspot import fetch_buy_price, fetch_sell_price
-from ctrader.data_providers.coinspot_v2 import CoinSpotV2
+from ctrader.data_providers.coinspot import quote_service
+from ctrader.data_providers.coinspot_v2 import CoinSpotV2, parse_balances
+from ctrader.execution.fill_tracker import FillTracker, order_id_from
+from ctrader.risk.rebalancer import BUY, SELL, RebalancePlan
 
 
 def _bool_env(name: str, default: bool = False) -> bool:
@@ -28,32 +30,250 @@ def _classify_error(ex: Exception) -> str:
     return "unknown"
 
 
-def _balance_safeguard(client: CoinSpotV2, sym: str, side: str, qty: float) -> float:
+class BalanceSnapshot:
+    """
+    Account balances for one execution batch.
+
+    Fetched once up front, adjusted locally as fills are confirmed, and only
+    refetched after a reject (`invalidate`) or once older than `max_age_sec`.
+    """
+
+    def __init__(self, client: CoinSpotV2, max_age_sec: float = 60.0) -> None:
+        self.client = client
+        self.max_age_sec = float(max_age_sec)
+        self._bal: dict[str, float] = {}
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        try:
+            ro = self.client.ro_balances()
+        except Exception:
+            return False
+        with self._lock:
+            self._bal = parse_balances(ro)
+            self._fetched_at = time.monotonic()
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = None
+
+    def get(self, sym: str) -> float | None:
+        """Balance for `sym` (0.0 if not held); None if balances are unavailable."""
+        fetched = self._fetched_at
+        if fetched is None or time.monotonic() - fetched > self.max_age_sec:
+            if not self.refresh():
+                return None
+        with self._lock:
+            return self._bal.get(sym.upper(), 0.0)
+
+    def apply_fill(self, sym: str, side: str, qty: float) -> None:
+        key = sym.upper()
+        with self._lock:
+            have = self._bal.get(key, 0.0)
+            delta = float(qty) if side.upper() == "BUY" else -float(qty)
+            self._bal[key] = max(0.0, have + delta)
+
+
+def _balance_safeguard(
+    balances: BalanceSnapshot, sym: str, side: str, qty: float
+) -> float:
     """
     Clip SELL quantity to available balance to avoid rejects.
     BUY is left unchanged (AUD availability varies by account settings).
     """
-    try:
-        ro = client.ro_balances()
-    except Exception:
+    if side.upper() != "SELL":
+        return qty
+    bal = balances.get(sym)
+    if bal is None:
         return qty
+    return max(0.0, min(qty, bal))
+
 
-    bal = 0.0
-    for k, v in (ro.get("balances", {}) or {}).items():
-        if str(k).strip().upper() == sym.upper():
-            try:
-                bal = float(v)
-            except Exception:
-                pass
-            break
+def _tradeable_rows(
+    plan: RebalancePlan, mode: str, max_trades: int | None
+) -> list[tuple[str, str, float]]:
+    keep = plan.is_trade
+    if mode == "buy":
+        keep &= plan.side == BUY
+    elif mode == "sell":
+        keep &= plan.side == SELL
+    trades = plan.take(keep)
+    if max_trades is not None:
+        trades = trades.take(slice(0, max(0, int(max_trades))))
+    return [(str(t), side, qty) for t, side, qty, _, _ in trades.rows()]
 
-    if side.upper() == "SELL":
-        return max(0.0, min(qty, bal))
-    return qty
+
+def _submit_order(
+    client: CoinSpotV2,
+    balances: BalanceSnapshot,
+    sym: str,
+    side: str,
+    qty: float,
+    prices: Dict[str, float],
+    mkt: str,
+    use_quote: bool,
+    threshold_pct: float | None,
+    direction: str | None,
+) -> dict:
+    """Balance check, reference quote and order POST for one plan row (blocking)."""
+    # Balance safeguard (SELLs)
+    qty = _balance_safeguard(balances, sym, side, qty)
+
+    # Determine reference rate for guards / market
+    rate: float | None = None
+    if use_quote:
+        try:
+            rate = quote_service().quote(sym, side, mkt)
+        except Exception:
+            rate = None
+
+    # Place order
+    try:
+        if side == "BUY":
+            if use_quote and rate is not None and threshold_pct is not None:
+                resp = client.place_buy_now(
+                    sym,
+                    amount=qty,
+                    amounttype="coin",
+                    rate=rate,
+                    threshold=float(threshold_pct),
+                    direction=(direction or "UP"),
+                )
+            else:
+                used_rate = rate if rate is not None else float(prices.get(sym, 0.0))
+                resp = client.place_market_buy(
+                    sym, amount=qty, rate=used_rate, markettype=mkt
+                )
+        else:  # SELL
+            if use_quote and rate is not None and threshold_pct is not None:
+                resp = client.place_sell_now(
+                    sym,
+                    amount=qty,
+                    amounttype="coin",
+                    rate=rate,
+                    threshold=float(threshold_pct),
+                    direction=(direction or "DOWN"),
+                )
+            else:
+                used_rate = rate if rate is not None else float(prices.get(sym, 0.0))
+                resp = client.place_market_sell(
+                    sym, amount=qty, rate=used_rate, markettype=mkt
+                )
+
+        ok = bool(resp.get("status", "") == "ok")
+        return {
+            "ticker": sym,
+            "side": side,
+            "qty": qty,
+            "status": "ok" if ok else "error",
+            "rate": rate,
+            "market": mkt,
+            "resp": resp,
+        }
+    except Exception as e:
+        return {
+            "ticker": sym,
+            "side": side,
+            "qty": qty,
+            "status": "error",
+            "error": str(e),
+            "error_type": _classify_error(e),
+        }
+
+
+async def place_plan_coinspot_async(
+    client: CoinSpotV2,
+    plan: RebalancePlan,
+    prices: Dict[str, float],
+    quote: str,
+    use_quote: bool,
+    threshold_pct: float | None,
+    direction: str | None,
+    mode: str,
+    max_trades: int | None,
+    notify: Optional[Callable[[dict], None]] = None,
+    order_timeout_sec: int = 30,
+    poll_interval_sec: float = 2.0,
+    max_in_flight: int = 4,
+    balance_max_age_sec: float = 60.0,
+) -> list[dict]:
+    """
+    Submit independent orders concurrently (at most `max_in_flight` open at
+    once) and track fills for all of them with one FillTracker. SELLs go
+    first and every SELL fill is resolved before any BUY is submitted, so
+    BUYs spend proceeds that have already settled. Orders that were
+    rejected or errored are not tracked.
+
+    Blocking client calls run in worker threads; CoinSpotV2 serialises its
+    signed requests so nonces still reach the exchange in order. Balances
+    are fetched once for the whole batch (see BalanceSnapshot).
+    """
+    mkt = (quote or "AUD").upper()
+    balances = BalanceSnapshot(client, max_age_sec=balance_max_age_sec)
+    tracker = FillTracker(client, mkt, max_interval=poll_interval_sec)
+    sem = asyncio.Semaphore(max(1, int(max_in_flight)))
+
+    async def _one(sym: str, side: str, qty: float) -> dict:
+        async with sem:
+            evt = await asyncio.to_thread(
+                _submit_order,
+                client,
+                balances,
+                sym,
+                side,
+                qty,
+                prices,
+                mkt,
+                use_quote,
+                threshold_pct,
+                direction,
+            )
+            if evt["status"] != "ok":
+                balances.invalidate()
+            else:
+                try:
+                    evt["fill_status"] = await tracker.track(
+                        sym,
+                        side,
+                        order_timeout_sec,
+                        qty=float(evt["qty"]),
+                        order_id=order_id_from(evt.get("resp")),
+                    )
+                except Exception:
+                    evt["fill_status"] = {"filled": None, "open": None}
+                evt["fill_latency_sec"] = evt["fill_status"].get("latency_sec")
+                if evt["fill_status"].get("filled"):
+                    balances.apply_fill(sym, side, float(evt["qty"]))
+        if notify:
+            notify(evt)
+        return evt
+
+    try:
+        rows = _tradeable_rows(plan, mode, max_trades)
+        if use_quote:
+            # one concurrent batch of guard quotes instead of one per order
+            for side in ("BUY", "SELL"):
+                syms = [sym for sym, sd, _ in rows if sd == side]
+                if syms:
+                    await asyncio.to_thread(
+                        quote_service().prefetch, syms, mkt, (side,)
+                    )
+        if any(side == "SELL" for _, side, _ in rows):
+            await asyncio.to_thread(balances.refresh)
+        # SELLs fund the BUYs: wait for their fills before buying
+        sells = [r for r in rows if r[1] == "SELL"]
+        buys = [r for r in rows if r[1] != "SELL"]
+        out = list(await asyncio.gather(*(_one(*r) for r in sells)))
+        out.extend(await asyncio.gather(*(_one(*r) for r in buys)))
+        return out
+    finally:
+        await tracker.close()
 
 
 def place_plan_coinspot(
-    plan: pd.DataFrame,
+    plan: RebalancePlan,
     prices: Dict[str, float],
     quote: str,
     use_quote: bool,
@@ -63,7 +283,9 @@ def place_plan_coinspot(
     max_trades: int | None,
     notify: Optional[Callable[[dict], None]] = None,
     order_timeout_sec: int = 30,
-    poll_interval_sec: int = 2,
+    poll_interval_sec: float = 2.0,
+    max_in_flight: int = 4,
+    balance_max_age_sec: float = 60.0,
 ):
     """
     Execute a rebalance plan using CoinSpot V2 endpoints.
@@ -71,7 +293,9 @@ def place_plan_coinspot(
     - If COINSPOT_LIVE_DANGEROUS is not true or keys are missing, all trades are skipped safely.
     - If use_quote & threshold_pct are provided, uses BUY/SELL NOW with rate+threshold+direction guards.
     - Otherwise uses market buy/sell with a reference rate (public buy/sell or plan price).
-    - After each order, polls read-only open orders briefly to detect fill/partial.
+    - SELLs are submitted concurrently (up to `max_in_flight`) and their fills
+      resolved before the BUYs are submitted the same way; fills are tracked by
+      one shared FillTracker (bulk read-only queries, adaptive backoff).
     """
     api_key = os.getenv("COINSPOT_API_KEY", "").strip()
     api_secret = os.getenv("COINSPOT_API_SECRET", "").strip()
@@ -80,16 +304,9 @@ def place_plan_coinspot(
     # Safety: skip live orders unless explicitly enabled
     if not (client.live_enabled and api_key and api_secret):
         out = []
-        count = 0
-        for _, r in plan.iterrows():
-            if max_trades is not None and count >= max_trades:
-                break
-            side = r["side"]
-            qty = float(r["qty"])
-            if side == "HOLD" or qty <= 0:
-                continue
+        for sym, side, qty in _tradeable_rows(plan, "both", max_trades):
             evt = {
-                "ticker": r["ticker"],
+                "ticker": sym,
                 "side": side,
                 "qty": qty,
                 "status": "skipped (safety guard OFF)",
@@ -97,133 +314,23 @@ def place_plan_coinspot(
             out.append(evt)
             if notify:
                 notify(evt)
-            count += 1
         return out
 
-    def _poll_fill(sym: str, client: CoinSpotV2, timeout: int, interval: int) -> dict:
-        """Poll RO open orders for symbol up to `timeout` seconds."""
-        deadline = time.time() + max(1, int(timeout))
-        open_left = None
-        while time.time() < deadline:
-            try:
-                ro = client.ro_open_market_orders(
-                    cointype=sym, markettype=(quote or "AUD")
-                )
-                orders = (
-                    ro.get("orders", [])
-                    or ro.get("buyorders", [])
-                    or ro.get("sellorders", [])
-                )
-                open_left = len(orders) if isinstance(orders, list) else 0
-                if open_left == 0:
-                    return {"filled": True, "open": 0}
-            except Exception:
-                pass
-            time.sleep(max(1, int(interval)))
-        return {"filled": False, "open": open_left or 0}
-
-    mkt = (quote or "AUD").upper()
-    out = []
-    count = 0
-
-    for _, r in plan.iterrows():
-        if max_trades is not None and count >= max_trades:
-            break
-
-        side = r["side"]
-        qty = float(r["qty"])
-        sym = r["ticker"]
-
-        if side == "HOLD" or qty <= 0:
-            continue
-        if mode == "buy" and side != "BUY":
-            continue
-        if mode == "sell" and side != "SELL":
-            continue
-
-        # Balance safeguard (SELLs)
-        qty = _balance_safeguard(client, sym, side, qty)
-
-        # Determine reference rate for guards / market
-        rate: float | None = None
-        if use_quote:
-            try:
-                rate = (
-                    fetch_buy_price(sym, mkt)
-                    if side == "BUY"
-                    else fetch_sell_price(sym, mkt)
-                )
-            except Exception:
-                rate = None
-
-        # Place order
-        try:
-            if side == "BUY":
-                if use_quote and rate is not None and threshold_pct is not None:
-                    resp = client.place_buy_now(
-                        sym,
-                        amount=qty,
-                        amounttype="coin",
-                        rate=rate,
-                        threshold=float(threshold_pct),
-                        direction=(direction or "UP"),
-                    )
-                else:
-                    used_rate = (
-                        rate if rate is not None else float(prices.get(sym, 0.0))
-                    )
-                    resp = client.place_market_buy(
-                        sym, amount=qty, rate=used_rate, markettype=mkt
-                    )
-            else:  # SELL
-                if use_quote and rate is not None and threshold_pct is not None:
-                    resp = client.place_sell_now(
-                        sym,
-                        amount=qty,
-                        amounttype="coin",
-                        rate=rate,
-                        threshold=float(threshold_pct),
-                        direction=(direction or "DOWN"),
-                    )
-                else:
-                    used_rate = (
-                        rate if rate is not None else float(prices.get(sym, 0.0))
-                    )
-                    resp = client.place_market_sell(
-                        sym, amount=qty, rate=used_rate, markettype=mkt
-                    )
-
-            ok = bool(resp.get("status", "") == "ok")
-            evt = {
-                "ticker": sym,
-                "side": side,
-                "qty": qty,
-                "status": "ok" if ok else "error",
-                "rate": rate,
-                "market": mkt,
-                "resp": resp,
-            }
-        except Exception as e:
-            evt = {
-                "ticker": sym,
-                "side": side,
-                "qty": qty,
-                "status": "error",
-                "error": str(e),
-                "error_type": _classify_error(e),
-            }
-
-        # Poll for fill status
-        try:
-            poll = _poll_fill(sym, client, order_timeout_sec, poll_interval_sec)
-            evt["fill_status"] = poll
-        except Exception:
-            evt["fill_status"] = {"filled": None, "open": None}
-
-        out.append(evt)
-        if notify:
-            notify(evt)
-
-        count += 1
-
-    return out
+    return asyncio.run(
+        place_plan_coinspot_async(
+            client,
+            plan,
+            prices,
+            quote,
+            use_quote,
+            threshold_pct,
+            direction,
+            mode,
+            max_trades,
+            notify=notify,
+            order_timeout_sec=order_timeout_sec,
+            poll_interval_sec=poll_interval_sec,
+            max_in_flight=max_in_flight,
+            balance_max_age_sec=balance_max_age_sec,
+        )
+    )
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from ctrader.data_providers.coinspot_v2 import CoinSpotV2
+
+# history entries may be stamped slightly before our submit time (clock skew)
+CLOCK_SKEW_SEC = 5.0
+AMOUNT_REL_TOL = 1e-6
+
+
+@dataclass
+class _Tracked:
+    sym: str
+    side: str
+    submitted_at: float  # monotonic, for latency
+    submitted_ts: float  # wall clock, compared with history `solddate`
+    deadline: float
+    qty: float | None = None
+    order_id: str | None = None
+    future: asyncio.Future = field(default=None, repr=False)
+
+
+@dataclass(frozen=True)
+class _Fill:
+    """One completed order from market order history."""
+
+    order_id: str | None
+    coin: str
+    side: str
+    amount: float | None
+    sold_ts: float | None
+
+
+def _orders(ro: Dict[str, Any]) -> list:
+    out: list = []
+    for k in ("orders", "buyorders", "sellorders"):
+        v = (ro or {}).get(k) or []
+        if isinstance(v, list):
+            out.extend(v)
+    return out
+
+
+def order_id_from(o: Any) -> str | None:
+    """Order id from an order or place-order response, if it has one."""
+    if not isinstance(o, dict):
+        return None
+    v = o.get("id", o.get("orderid"))
+    return None if v in (None, "") else str(v)
+
+
+def _timestamp(v: Any) -> float | None:
+    """Epoch seconds from a history `solddate` (epoch s/ms or ISO string)."""
+    if v is None or v == "":
+        return None
+    try:
+        x = float(v)
+        return x / 1000.0 if x > 1e11 else x
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _float(v: Any) -> float | None:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _matches(t: _Tracked, f: _Fill) -> bool:
+    """
+    Whether history entry `f` is the fill of `t`: same order id when both
+    have one, otherwise same coin, side and amount, sold after `t` was
+    submitted.
+    """
+    if t.order_id and f.order_id:
+        return t.order_id == f.order_id
+    if (f.coin, f.side) != (t.sym, t.side):
+        return False
+    if f.sold_ts is None or f.sold_ts < t.submitted_ts - CLOCK_SKEW_SEC:
+        return False
+    if t.qty is not None:
+        if f.amount is None:
+            return False
+        return abs(f.amount - t.qty) <= AMOUNT_REL_TOL * max(abs(t.qty), 1e-12)
+    return True
+
+
+class FillTracker:
+    """
+    Tracks every outstanding order of a batch with one poller.
+
+    Each tick makes one bulk RO open-orders call for the market (per-symbol
+    calls only if the response does not say which coin an order is for).
+    Orders that are no longer open are looked up in one bulk
+    market-order-history call and reported filled only when a history entry
+    matches them (see `_matches`); an order that disappears without a match
+    (cancelled, rejected) resolves `filled: False` at its deadline, and
+    `filled: None` if history could not be read. The tick interval starts
+    sub-second and backs off geometrically up to `max_interval`; it resets
+    when a new order is tracked. Each result carries the order's fill latency.
+    """
+
+    def __init__(
+        self,
+        client: CoinSpotV2,
+        market: str,
+        initial_interval: float = 0.25,
+        max_interval: float = 2.0,
+        backoff: float = 1.6,
+    ) -> None:
+        self.client = client
+        self.market = market
+        self.initial_interval = max(0.05, float(initial_interval))
+        self.max_interval = max(self.initial_interval, float(max_interval))
+        self.backoff = max(1.0, float(backoff))
+        self._interval = self.initial_interval
+        self._pending: list[_Tracked] = []
+        self._task: asyncio.Task | None = None
+        self.ro_calls = 0
+        # history entries already matched to an order, across ticks
+        self._claimed: Counter[_Fill] = Counter()
+
+    async def track(
+        self,
+        sym: str,
+        side: str,
+        timeout: float,
+        qty: float | None = None,
+        order_id: str | None = None,
+    ) -> dict:
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        t = _Tracked(
+            sym.upper(),
+            side.upper(),
+            now,
+            time.time(),
+            now + max(1.0, float(timeout)),
+            None if qty is None else float(qty),
+            None if order_id in (None, "") else str(order_id),
+            loop.create_future(),
+        )
+        self._pending.append(t)
+        self._interval = self.initial_interval
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await t.future
+
+    # ---- blocking RO calls (run in a worker thread) ----
+
+    def _open_counts(self, syms: set[str]) -> tuple[dict[str, int | None], set[str]]:
+        """
+        Open order count per symbol (None where the query failed) and the
+        ids of open orders that carry one.
+        """
+        ids: set[str] = set()
+        try:
+            self.ro_calls += 1
+            orders = _orders(self.client.ro_open_market_orders(markettype=self.market))
+            if all(isinstance(o, dict) and o.get("coin") for o in orders):
+                counts = {s: 0 for s in syms}
+                for o in orders:
+                    c = str(o["coin"]).upper()
+                    if c in counts:
+                        counts[c] += 1
+                ids = {i for i in map(order_id_from, orders) if i}
+                return counts, ids
+        except Exception:
+            pass
+        out: dict[str, int | None] = {}
+        for s in syms:
+            try:
+                self.ro_calls += 1
+                orders = _orders(
+                    self.client.ro_open_market_orders(
+                        cointype=s, markettype=self.market
+                    )
+                )
+                out[s] = len(orders)
+                ids.update(i for i in map(order_id_from, orders) if i)
+            except Exception:
+                out[s] = None
+        return out, ids
+
+    def _history(self) -> list[_Fill] | None:
+        """Completed orders in recent market order history; None if unavailable."""
+        try:
+            self.ro_calls += 1
+            ro = self.client.ro_market_order_history(markettype=self.market)
+        except Exception:
+            return None
+        fills: list[_Fill] = []
+        for side, key in (("BUY", "buyorders"), ("SELL", "sellorders")):
+            for o in (ro or {}).get(key) or []:
+                if isinstance(o, dict) and o.get("coin"):
+                    fills.append(
+                        _Fill(
+                            order_id_from(o),
+                            str(o["coin"]).upper(),
+                            side,
+                            _float(o.get("amount")),
+                            _timestamp(o.get("solddate")),
+                        )
+                    )
+        return fills
+
+    # ---- poll loop ----
+
+    @staticmethod
+    def _resolve(t: _Tracked, status: dict) -> None:
+        if not t.future.done():
+            t.future.set_result(status)
+
+    @staticmethod
+    def _is_open(t: _Tracked, counts: dict[str, int | None], ids: set[str]) -> bool:
+        if t.order_id and ids:
+            return t.order_id in ids
+        return counts.get(t.sym) != 0  # unknown (None) counts as open
+
+    async def _tick(self) -> None:
+        syms = {t.sym for t in self._pending}
+        counts, ids = await asyncio.to_thread(self._open_counts, syms)
+        now = time.monotonic()
+        closed = [t for t in self._pending if not self._is_open(t, counts, ids)]
+        history = await asyncio.to_thread(self._history) if closed else None
+        # each history entry fills at most one order
+        free = Counter(history or []) - self._claimed
+        for t in sorted(closed, key=lambda x: x.submitted_at):
+            for f in list(free):
+                if free[f] > 0 and _matches(t, f):
+                    free[f] -= 1
+                    self._claimed[f] += 1
+                    self._resolve(
+                        t,
+                        {
+                            "filled": True,
+                            "open": 0,
+                            "confirmed": True,
+                            "latency_sec": round(now - t.submitted_at, 3),
+                        },
+                    )
+                    break
+        for t in self._pending:
+            if t.future.done() or now < t.deadline:
+                continue
+            if t in closed:
+                # gone from the book without a matching fill: cancelled or
+                # rejected, or unknown when history could not be read
+                filled = False if history is not None else None
+                self._resolve(
+                    t,
+                    {
+                        "filled": filled,
+                        "open": 0,
+                        "confirmed": False,
+                        "latency_sec": None,
+                    },
+                )
+            else:
+                self._resolve(
+                    t,
+                    {
+                        "filled": False,
+                        "open": counts.get(t.sym) or 0,
+                        "latency_sec": None,
+                    },
+                )
+        self._pending = [t for t in self._pending if not t.future.done()]
+
+    async def _run(self) -> None:
+        while self._pending:
+            await self._tick()
+            if self._pending:
+                await asyncio.sleep(self._interval)
+                self._interval = min(self.max_interval, self._interval * self.backoff)
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-import pandas as pd
+from ctrader.risk.rebalancer import RebalancePlan
 
 
 @dataclass
@@ -13,7 +13,7 @@ class PaperLedger:
 
 def simulate_exec(
     ledger: PaperLedger,
-    plan: pd.DataFrame,
+    plan: RebalancePlan,
     prices: dict[str, float],
     fee_bps: float,
     slip_bps: float,
@@ -22,12 +22,7 @@ def simulate_exec(
     slip = slip_bps / 10000.0
     h = dict(ledger.holdings)
     cash = float(ledger.cash)
-    for _, r in plan.iterrows():
-        t = r["ticker"]
-        side = r["side"]
-        qty = float(r["qty"])
-        if side == "HOLD" or qty <= 0:
-            continue
+    for t, side, qty, _, _ in plan.trades().rows():
         px = float(prices.get(t, 0.0))
         if px <= 0:
             continue
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Rolling-window kernels shared by strategies, backtests, the CLI, the
+# dashboard and tools/. Array functions work along axis 0 of 1-D series or
+# 2-D day x asset panels (NaN = no observation) and return an array of the
+# same shape; each is O(n) regardless of the window.
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over `window` rows (rows before the first full window use what exists)."""
+    c = np.cumsum(x, axis=0)
+    out = c.copy()
+    out[window:] = c[window:] - c[:-window]
+    return out
+
+
+def _shift(x: np.ndarray, ok: np.ndarray) -> np.ndarray:
+    """First observed value per column; subtracted before summing to keep sums small."""
+    first = np.take_along_axis(x, ok.argmax(axis=0)[np.newaxis], axis=0)[0]
+    return np.where(np.isnan(first), 0.0, first)
+
+
+def rolling_moments(
+    x: np.ndarray, window: int, ddof: int = 1
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (count, mean, variance) of the non-NaN values in each trailing window.
+    Mean is NaN with no values, variance with `ddof` or fewer.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    w = max(1, int(window))
+    if not len(x):
+        return np.zeros(x.shape, dtype=np.int64), x.copy(), x.copy()
+    ok = ~np.isnan(x)
+    shift = _shift(x, ok)
+    d = np.where(ok, x - shift, 0.0)
+    n = rolling_sum(ok.astype(np.int64), w)
+    s1 = rolling_sum(d, w)
+    s2 = rolling_sum(d * d, w)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, shift + s1 / n, np.nan)
+        var = (s2 - s1 * s1 / n) / (n - ddof)
+    return n, mean, np.where(n > ddof, np.maximum(var, 0.0), np.nan)
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """SMA over the trailing `window` rows; NaN unless every row in it has a value."""
+    x = np.asarray(x, dtype=np.float64)
+    w = max(1, int(window))
+    if not len(x):
+        return x.copy()
+    ok = ~np.isnan(x)
+    shift = _shift(x, ok)
+    s = rolling_sum(np.where(ok, x - shift, 0.0), w)
+    n = rolling_sum(ok.astype(np.int64), w)
+    return np.where(n == w, shift + s / w, np.nan)
+
+
+def rolling_std(
+    x: np.ndarray, window: int, ddof: int = 1, min_periods: int | None = None
+) -> np.ndarray:
+    """Trailing std of non-NaN values; NaN with fewer than `min_periods` (default: window)."""
+    n, _, var = rolling_moments(x, window, ddof)
+    need = max(int(window) if min_periods is None else int(min_periods), ddof + 1)
+    return np.where(n >= need, np.sqrt(var), np.nan)
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """p[t] / p[t-1] - 1 aligned to `prices` (row 0 NaN; NaN unless p[t-1] > 0)."""
+    p = np.asarray(prices, dtype=np.float64)
+    out = np.full_like(p, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[1:] = np.where(p[:-1] > 0, p[1:] / p[:-1] - 1.0, np.nan)
+    return out
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """log(p[t] / p[t-1]) aligned to `prices` (row 0 NaN; NaN unless both are > 0)."""
+    p = np.asarray(prices, dtype=np.float64)
+    out = np.full_like(p, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok = (p[:-1] > 0) & (p[1:] > 0)
+        out[1:] = np.where(ok, np.log(np.where(ok, p[1:] / p[:-1], 1.0)), np.nan)
+    return out
+
+
+def log_vol(prices: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    """Std of the last `window` log returns; NaN unless all of them exist."""
+    return rolling_std(log_returns(prices), window, ddof, min_periods=window)
+
+
+def momentum(prices: np.ndarray, lookback: int, skip: int = 0) -> np.ndarray:
+    """
+    Lagged momentum p[t - skip] / p[t - skip - lookback] - 1 in rows; NaN
+    where either price is missing or the older one is not positive.
+    """
+    p = np.asarray(prices, dtype=np.float64)
+    out = np.full_like(p, np.nan)
+    lb, sk = int(lookback), max(0, int(skip))
+    far = lb + sk
+    if lb <= 0 or far >= len(p):
+        return out
+    a = p[lb : len(p) - sk]
+    b = p[: len(p) - far]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[far:] = np.where(b > 0, a / b - 1.0, np.nan)
+    return out
+
+
+def breadth(prices: np.ndarray, ref: np.ndarray) -> float:
+    """% of assets priced above `ref` (e.g. their SMA), among those with both values."""
+    p = np.asarray(prices, dtype=np.float64)
+    r = np.asarray(ref, dtype=np.float64)
+    ok = np.isfinite(p) & np.isfinite(r)
+    return float(np.mean(p[ok] > r[ok]) * 100.0) if ok.any() else float("nan")
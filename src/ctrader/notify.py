@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
-import requests
+from ctrader.runlog import RunLog
+from ctrader.utils import http
 
 
 def post_discord_embed(
@@ -28,12 +28,11 @@ def post_discord_embed(
         ]
     }
     try:
-        requests.post(webhook_url, json=payload, timeout=10)
+        http.post(webhook_url, json=payload, timeout=10)
     except Exception:
         pass
 
 
 def append_jsonl(log_path: Path, record: dict) -> None:
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    """Append `record` to a rotating, indexed JSONL log (see RunLog)."""
+    RunLog(log_path.parent, log_path.stem).append(record)
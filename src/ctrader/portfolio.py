@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from ctrader.risk.rebalancer import BUY, HOLD, SELL, SIDE_NAMES
+
 
 def _normalize(weights: dict[str, float]) -> dict[str, float]:
     s = sum(max(0.0, float(v)) for v in weights.values())
@@ -40,29 +43,63 @@ def save_holdings(pool: str, holdings: dict[str, float], base: Path) -> None:
     pd.DataFrame(rows).to_csv(fp, index=False)
 
 
-def compute_drift(
-    current: dict[str, float], prices: dict[str, float], targets: dict[str, float]
-) -> pd.DataFrame:
-    rows = []
-    for t in sorted(targets.keys() | current.keys()):
-        cq = float(current.get(t, 0.0))
-        tq = float(targets.get(t, 0.0))
-        px = float(prices.get(t, 0.0))
-        delta = tq - cq
-        side = "HOLD"
-        if delta > 1e-9:
-            side = "BUY"
-        elif delta < -1e-9:
-            side = "SELL"
-        rows.append(
+class DriftReport:
+    """Current vs target quantities per ticker as parallel arrays (see RebalancePlan)."""
+
+    __slots__ = (
+        "ticker",
+        "price",
+        "current_qty",
+        "target_qty",
+        "delta_qty",
+        "est_value",
+        "side",
+    )
+
+    def __init__(
+        self,
+        ticker: np.ndarray,
+        price: np.ndarray,
+        current_qty: np.ndarray,
+        target_qty: np.ndarray,
+    ) -> None:
+        self.ticker = np.asarray(ticker, dtype=object)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.current_qty = np.asarray(current_qty, dtype=np.float64)
+        self.target_qty = np.asarray(target_qty, dtype=np.float64)
+        self.delta_qty = self.target_qty - self.current_qty
+        self.est_value = np.abs(self.delta_qty) * self.price
+        d = self.delta_qty
+        side = np.where(d > 1e-9, BUY, np.where(d < -1e-9, SELL, HOLD))
+        self.side = side.astype(np.int8)
+
+    def __len__(self) -> int:
+        return len(self.ticker)
+
+    def value_by_ticker(self) -> dict[str, float]:
+        return dict(zip(self.ticker.tolist(), self.est_value.tolist()))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
             {
-                "ticker": t,
-                "price": px,
-                "current_qty": cq,
-                "target_qty": tq,
-                "delta_qty": delta,
-                "est_value": abs(delta) * px,
-                "side": side,
+                "ticker": self.ticker.astype(str),
+                "price": self.price,
+                "current_qty": self.current_qty,
+                "target_qty": self.target_qty,
+                "delta_qty": self.delta_qty,
+                "est_value": self.est_value,
+                "side": SIDE_NAMES[self.side + 1],
             }
         )
-    return pd.DataFrame(rows)
+
+
+def compute_drift(
+    current: dict[str, float], prices: dict[str, float], targets: dict[str, float]
+) -> DriftReport:
+    tickers = sorted(targets.keys() | current.keys())
+    return DriftReport(
+        np.array(tickers, dtype=object),
+        [float(prices.get(t, 0.0)) for t in tickers],
+        [float(current.get(t, 0.0)) for t in tickers],
+        [float(targets.get(t, 0.0)) for t in tickers],
+    )
@@ -1,15 +1,173 @@
 from __future__ import annotations
 
-import math
+from typing import TYPE_CHECKING, Iterator
 
-import pandas as pd
+import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def _round_qty(qty: float, precision: int | None) -> float:
-    if precision is None:
-        return float(qty)
-    factor = 10 ** int(precision)
-    return float(math.floor(qty * factor + 1e-12) / factor)
+# Side codes used by RebalancePlan.side (and DriftReport.side)
+SELL, HOLD, BUY = -1, 0, 1
+SIDE_NAMES = np.array(["SELL", "HOLD", "BUY"])  # indexed by code + 1
+
+
+def round_qty(qty: np.ndarray, precision: np.ndarray | float) -> np.ndarray:
+    """Floor `qty` to `precision` decimals per entry (NaN precision: no rounding)."""
+    prec = np.asarray(precision, dtype=np.float64)
+    factor = 10.0 ** np.nan_to_num(prec)
+    return np.where(np.isnan(prec), qty, np.floor(qty * factor + 1e-12) / factor)
+
+
+def plan_orders(
+    current: np.ndarray,
+    targets: np.ndarray,
+    prices: np.ndarray,
+    threshold_pct: float = 0.0,
+    min_order_value: float | None = None,
+    precision: np.ndarray | float = np.nan,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised rebalance rules on aligned quantity/price arrays; returns
+    (side codes, qty, est_value). Shared by `create_rebalance_plan` and the
+    backtest loop.
+    """
+    delta = targets - current
+    pct = np.abs(delta) / np.maximum(np.abs(targets), 1e-9) * 100.0
+    side = np.where(delta > 1e-9, BUY, np.where(delta < -1e-9, SELL, HOLD))
+    side = side.astype(np.int8)
+    if threshold_pct > 0:
+        side[pct < threshold_pct] = HOLD
+    qty = round_qty(np.where(side != HOLD, np.abs(delta), 0.0), precision)
+    value = qty * prices
+    if min_order_value is not None:
+        small = value < min_order_value
+        side[small] = HOLD
+        qty = np.where(small, 0.0, qty)
+        value = np.where(small, 0.0, value)
+    return side, qty, value
+
+
+def capped_order(
+    side: np.ndarray,
+    est_value: np.ndarray,
+    cap_value: float,
+    mode: str = "gross",
+    priority: str = "sell_first",
+) -> np.ndarray:
+    """
+    Indices of the orders kept under a turnover cap of `cap_value`, in
+    execution order. Orders are ranked (sells first, or largest notional
+    first) and taken greedily while gross notional stays within the cap, or
+    in "net" mode while net notional does and gross stays within twice it.
+    """
+    value = np.asarray(est_value, dtype=np.float64)
+    if priority == "sell_first":
+        idx = np.lexsort((-value, side != SELL))
+    else:  # largest_first, drift_first ~= largest notional
+        idx = np.argsort(-value, kind="stable")
+    idx = idx[(value[idx] > 0.0) & (side[idx] != HOLD)]
+    kept: list[int] = []
+    gross = net = 0.0
+    for j, v, s in zip(idx.tolist(), value[idx].tolist(), side[idx].tolist()):
+        if mode == "net":
+            new_net = net + (-v if s == SELL else v)
+            if abs(new_net) <= cap_value and gross + v <= 2.0 * cap_value:
+                kept.append(j)
+                net, gross = new_net, gross + v
+        elif gross + v <= cap_value:
+            kept.append(j)
+            gross += v
+    return np.array(kept, dtype=np.int64)
+
+
+class RebalancePlan:
+    """
+    One rebalance as parallel arrays, one entry per ticker in execution
+    order. `side` holds SELL/HOLD/BUY codes (`sides` gives the names);
+    `to_frame` is for display.
+    """
+
+    __slots__ = ("ticker", "side", "qty", "est_value", "price")
+
+    def __init__(
+        self,
+        ticker: np.ndarray,
+        side: np.ndarray,
+        qty: np.ndarray,
+        est_value: np.ndarray,
+        price: np.ndarray,
+    ) -> None:
+        self.ticker = np.asarray(ticker, dtype=object)
+        self.side = np.asarray(side, dtype=np.int8)
+        self.qty = np.asarray(qty, dtype=np.float64)
+        self.est_value = np.asarray(est_value, dtype=np.float64)
+        self.price = np.asarray(price, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.ticker)
+
+    def __repr__(self) -> str:
+        return f"RebalancePlan({len(self)} rows, {int(self.is_trade.sum())} trades)"
+
+    @property
+    def sides(self) -> np.ndarray:
+        return SIDE_NAMES[self.side + 1]
+
+    @property
+    def is_trade(self) -> np.ndarray:
+        """Rows that would place an order."""
+        return (self.side != HOLD) & (self.qty > 0)
+
+    def take(self, idx: np.ndarray) -> RebalancePlan:
+        """Rows selected by a boolean mask or index array, in that order."""
+        return RebalancePlan(
+            self.ticker[idx],
+            self.side[idx],
+            self.qty[idx],
+            self.est_value[idx],
+            self.price[idx],
+        )
+
+    def trades(self) -> RebalancePlan:
+        return self.take(self.is_trade)
+
+    def cap_turnover(
+        self, cap_value: float, mode: str = "gross", priority: str = "sell_first"
+    ) -> RebalancePlan:
+        """The orders kept by `capped_order`, in the order they should run."""
+        return self.take(
+            capped_order(self.side, self.est_value, cap_value, mode, priority)
+        )
+
+    def rows(self) -> Iterator[tuple[str, str, float, float, float]]:
+        """(ticker, side, qty, est_value, price) per row as Python scalars."""
+        return zip(
+            self.ticker.tolist(),
+            self.sides.tolist(),
+            self.qty.tolist(),
+            self.est_value.tolist(),
+            self.price.tolist(),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "ticker": self.ticker.astype(str),
+                "side": self.sides,
+                "qty": self.qty,
+                "est_value": self.est_value,
+                "price": self.price,
+            }
+        )
+
+
+def _column(values: dict[str, float], keys: list[str]) -> np.ndarray:
+    return np.fromiter(
+        (float(values.get(k, 0.0)) for k in keys), dtype=np.float64, count=len(keys)
+    )
 
 
 def create_rebalance_plan(
@@ -19,39 +177,23 @@ def create_rebalance_plan(
     threshold_pct: float = 0.0,
     min_order_value: float | None = None,
     qty_precision: dict[str, int] | None = None,
-) -> pd.DataFrame:
-    rows = []
-    for t in sorted(targets.keys() | current.keys()):
-        cq = float(current.get(t, 0.0))
-        tq = float(targets.get(t, 0.0))
-        px = float(prices.get(t, 0.0))
-        delta = tq - cq
-        denom = max(abs(tq), 1e-9)
-        pct = (abs(delta) / denom) * 100.0
-        if threshold_pct > 0 and pct < threshold_pct:
-            side = "HOLD"
-            qty = 0.0
-        else:
-            if delta > 1e-9:
-                side = "BUY"
-                qty = delta
-            elif delta < -1e-9:
-                side = "SELL"
-                qty = -delta
-            else:
-                side = "HOLD"
-                qty = 0.0
-        qprec = (qty_precision or {}).get(t)
-        qty = _round_qty(qty, qprec)
-        notion = qty * px
-        if min_order_value is not None and notion < min_order_value:
-            side = "HOLD"
-            qty = 0.0
-            notion = 0.0
-        rows.append(
-            {"ticker": t, "side": side, "qty": qty, "est_value": notion, "price": px}
-        )
-    return pd.DataFrame(rows)
+) -> RebalancePlan:
+    tickers = sorted(targets.keys() | current.keys())
+    qp = qty_precision or {}
+    prec = np.array(
+        [np.nan if qp.get(t) is None else int(qp[t]) for t in tickers],
+        dtype=np.float64,
+    )
+    px = _column(prices, tickers)
+    side, qty, value = plan_orders(
+        _column(current, tickers),
+        _column(targets, tickers),
+        px,
+        threshold_pct,
+        min_order_value,
+        prec,
+    )
+    return RebalancePlan(np.array(tickers, dtype=object), side, qty, value, px)
 
 
 def any_drift_exceeds_threshold(
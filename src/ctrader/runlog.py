@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+try:  # cross-process lock where available (POSIX)
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: in-process lock only
+    fcntl = None
+
+MAX_BYTES = int(os.getenv("RUNLOG_MAX_BYTES", str(32 * 1024 * 1024)))
+INDEX_KEEP = int(os.getenv("RUNLOG_INDEX_KEEP", "500"))
+READ_ATTEMPTS = 3  # readers retry when a concurrent rotation moved records
+
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _epoch(ts: object) -> float | None:
+    """Seconds since epoch for '20250101T000000Z' or ISO-8601 timestamps."""
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    s = str(ts).strip()
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S"):
+        try:
+            return datetime.strptime(s, fmt).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            pass
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _day(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d")
+
+
+class RunLog:
+    """
+    Append-only JSONL run log with rotation and an offset index.
+
+    Records are appended to `<name>.jsonl`. When that file reaches
+    `max_bytes` or a new UTC day starts, it is renamed to
+    `<name>-<YYYYMMDDTHHMMSS>.jsonl` (its first record's time) and a fresh
+    file is started. `<name>.index.json` keeps, per pool, the (file, offset,
+    length, ts) of its last `index_keep` records plus the time span of every
+    segment, so `tail(pool, n)` reads just those byte ranges and `between`
+    only opens the segments that overlap the requested window.
+
+    Only `append` (and the rotation it triggers) takes the lock and writes.
+    Readers never create files; they check what they read against the index
+    and retry with a fresh one when a rotation moved records underneath them.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        name: str = "runs",
+        max_bytes: int = MAX_BYTES,
+        index_keep: int = INDEX_KEEP,
+    ) -> None:
+        self.dir = Path(log_dir)
+        self.name = name
+        self.active = self.dir / f"{name}.jsonl"
+        self.index_path = self.dir / f"{name}.index.json"
+        self.max_bytes = int(max_bytes)
+        self.index_keep = max(1, int(index_keep))
+        key = str(self.active.resolve())
+        with _LOCKS_GUARD:
+            self._lock = _LOCKS.setdefault(key, threading.Lock())
+
+    # ---- locking / index ----
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with open(self.dir / f".{self.name}.lock", "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _empty_index(self) -> dict:
+        return {"segments": [], "active": {"size": 0}, "pools": {}}
+
+    def _load_index(self) -> dict:
+        try:
+            idx = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if isinstance(idx, dict) and "pools" in idx:
+                return idx
+        except Exception:
+            pass
+        return self._empty_index()
+
+    def _save_index(self, idx: dict) -> None:
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(json.dumps(idx, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def _segments(self) -> list[Path]:
+        return sorted(self.dir.glob(f"{self.name}-*.jsonl"))
+
+    def _note(self, idx: dict, fname: str, off: int, length: int, rec: dict) -> None:
+        ts = _epoch(rec.get("ts"))
+        act = idx["active"]
+        if ts is not None:
+            act.setdefault("first_ts", ts)
+            act["last_ts"] = ts
+        pool = str(rec.get("pool", ""))
+        ent = idx["pools"].setdefault(pool, [])
+        ent.append([fname, off, length, ts])
+        del ent[: -self.index_keep]
+
+    def reindex(self) -> dict:
+        """Rebuild the index by scanning every segment (recovery path)."""
+        idx = self._empty_index()
+        for fp in self._segments() + [self.active]:
+            if not fp.exists():
+                continue
+            idx["active"] = {"size": 0}
+            off = 0
+            with open(fp, "rb") as f:
+                for raw in f:
+                    n = len(raw)
+                    if raw.endswith(b"\n") and raw.strip():
+                        try:
+                            rec = json.loads(raw)
+                        except ValueError:
+                            rec = None
+                        if isinstance(rec, dict):
+                            self._note(idx, fp.name, off, n, rec)
+                    off += n
+            if fp != self.active:
+                act = idx["active"]
+                idx["segments"].append(
+                    {
+                        "file": fp.name,
+                        "first_ts": act.get("first_ts"),
+                        "last_ts": act.get("last_ts"),
+                    }
+                )
+            else:
+                idx["active"]["size"] = off
+        if not self.active.exists():
+            idx["active"] = {"size": 0}
+        return idx
+
+    def _read_index(self) -> tuple[dict, bool]:
+        """
+        The index, rebuilt in memory when it does not match the active file
+        (written by something other than RunLog, or index lost). Returns
+        (index, rebuilt); nothing is written.
+        """
+        idx = self._load_index()
+        size = self.active.stat().st_size if self.active.exists() else 0
+        if idx["active"].get("size", 0) != size:
+            return self.reindex(), True
+        return idx, False
+
+    def _current_index(self) -> dict:
+        """The index for a writer holding the lock, saved if it was rebuilt."""
+        idx, rebuilt = self._read_index()
+        if rebuilt:
+            self._save_index(idx)
+        return idx
+
+    # ---- write ----
+
+    def _rotate(self, idx: dict) -> None:
+        act = idx["active"]
+        first = act.get("first_ts") or self.active.stat().st_mtime
+        stamp = datetime.fromtimestamp(first, timezone.utc).strftime("%Y%m%dT%H%M%S")
+        dest = self.dir / f"{self.name}-{stamp}.jsonl"
+        k = 1
+        while dest.exists():
+            dest = self.dir / f"{self.name}-{stamp}-{k}.jsonl"
+            k += 1
+        os.replace(self.active, dest)
+        for ent in idx["pools"].values():
+            for e in ent:
+                if e[0] == self.active.name:
+                    e[0] = dest.name
+        idx["segments"].append(
+            {"file": dest.name, "first_ts": first, "last_ts": act.get("last_ts")}
+        )
+        idx["active"] = {"size": 0}
+
+    def append(self, record: dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        now = _epoch(record.get("ts")) or datetime.now(timezone.utc).timestamp()
+        with self._locked():
+            self.dir.mkdir(parents=True, exist_ok=True)
+            idx = self._current_index()
+            act = idx["active"]
+            if act.get("size", 0) > 0 and (
+                act["size"] + len(line) > self.max_bytes
+                or _day(act.get("first_ts") or now) != _day(now)
+            ):
+                self._rotate(idx)
+            with open(self.active, "ab") as f:
+                off = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._note(idx, self.active.name, off, len(line), record)
+            idx["active"]["size"] = off + len(line)
+            self._save_index(idx)
+
+    # ---- read ----
+
+    def _read_at(self, ent: list, handles: dict) -> dict | None:
+        """The record at index entry `ent`; None unless it is the one indexed."""
+        fname, off, length, ts = ent
+        f = handles.get(fname)
+        if f is None:
+            try:
+                f = handles[fname] = open(self.dir / fname, "rb")
+            except OSError:
+                return None
+        f.seek(off)
+        try:
+            rec = json.loads(f.read(length))
+        except ValueError:
+            return None
+        if not isinstance(rec, dict) or _epoch(rec.get("ts")) != ts:
+            return None
+        return rec
+
+    def _read_entries(self, ents: list) -> list[dict] | None:
+        """Records for index entries; None if any has moved (rotation)."""
+        handles: dict = {}
+        try:
+            recs = [self._read_at(e, handles) for e in ents]
+        finally:
+            for f in handles.values():
+                f.close()
+        return None if any(r is None for r in recs) else recs
+
+    def _scan_back(self, n: int, pool: str | None) -> list[dict]:
+        """Newest-first scan across segments; used when the index is short."""
+        out: list[dict] = []
+        for fp in [self.active] + self._segments()[::-1]:
+            if not fp.exists():
+                continue
+            with open(fp, "rb") as f:
+                lines = f.read().split(b"\n")
+            for raw in reversed(lines):
+                if not raw.strip():
+                    continue
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if pool is None or str(rec.get("pool", "")) == pool:
+                    out.append(rec)
+                    if len(out) >= n:
+                        return out[::-1]
+        return out[::-1]
+
+    def tail(self, pool: str | None = None, n: int = 1) -> list[dict]:
+        """Last `n` records (oldest first), optionally for one pool."""
+        n = max(0, int(n))
+        if n == 0:
+            return []
+        if n > self.index_keep:
+            # beyond what the index keeps: scan backwards instead
+            return self._scan_back(n, pool)
+        for _ in range(READ_ATTEMPTS):
+            idx, _ = self._read_index()
+            if pool is None:
+                # the overall last n are within each pool's last n
+                ents = sorted(
+                    (e for ent in idx["pools"].values() for e in ent),
+                    key=lambda e: (e[3] or 0.0),
+                )
+            else:
+                ents = idx["pools"].get(str(pool), [])
+            recs = self._read_entries(ents[-n:])
+            if recs is not None:
+                return recs
+        return self._scan_back(n, pool)
+
+    def latest(self, pool: str) -> dict | None:
+        recs = self.tail(pool, 1)
+        return recs[-1] if recs else None
+
+    def between(
+        self,
+        start: datetime | float | str | None = None,
+        end: datetime | float | str | None = None,
+        pool: str | None = None,
+    ) -> list[dict]:
+        """Records with start <= ts <= end, opening only overlapping segments."""
+
+        def _to_epoch(x) -> float | None:
+            if isinstance(x, datetime):
+                return x.timestamp()
+            return _epoch(x)
+
+        lo, hi = _to_epoch(start), _to_epoch(end)
+        for attempt in range(READ_ATTEMPTS):
+            out = self._between(lo, hi, pool, strict=attempt < READ_ATTEMPTS - 1)
+            if out is not None:
+                return out
+        return []
+
+    def _between(
+        self, lo: float | None, hi: float | None, pool: str | None, strict: bool
+    ) -> list[dict] | None:
+        """
+        One `between` pass. When `strict`, None if the log rotated during the
+        pass or a segment it needs is gone; otherwise missing files are skipped.
+        """
+        idx, _ = self._read_index()
+        spans = [
+            (s["file"], s.get("first_ts"), s.get("last_ts")) for s in idx["segments"]
+        ]
+        act = idx["active"]
+        spans.append((self.active.name, act.get("first_ts"), act.get("last_ts")))
+        out: list[dict] = []
+        for fname, first, last in spans:
+            if lo is not None and last is not None and last < lo:
+                continue
+            if hi is not None and first is not None and first > hi:
+                continue
+            try:
+                f = open(self.dir / fname, "rb")
+            except FileNotFoundError:
+                if strict and (fname != self.active.name or act.get("size")):
+                    return None
+                continue
+            with f:
+                for raw in f:
+                    if not raw.strip():
+                        continue
+                    try:
+                        rec = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if pool is not None and str(rec.get("pool", "")) != pool:
+                        continue
+                    ts = _epoch(rec.get("ts"))
+                    if ts is None:
+                        continue
+                    if (lo is None or ts >= lo) and (hi is None or ts <= hi):
+                        out.append(rec)
+        if strict and len(self._load_index()["segments"]) != len(idx["segments"]):
+            return None  # rotated mid-pass: records may have moved
+        return out
+
+
+def run_log(data_base: Path) -> RunLog:
+    """The run log at data/logs/runs.jsonl."""
+    return RunLog(Path(data_base) / "logs", "runs")
@@ -1,60 +1,40 @@
 from __future__ import annotations
 
-import math
 from typing import Dict
 
-from ctrader.data_providers.marketdata import fetch_fx_usd_to_aud, fetch_history_daily
+import numpy as np
 
-
-def _daily_returns(prices: list[float]) -> list[float]:
-    rets = []
-    for i in range(1, len(prices)):
-        a, b = prices[i - 1], prices[i]
-        if a > 0 and b > 0:
-            rets.append((b / a) - 1.0)
-    return rets
+from ctrader.strategies.panel import (
+    PricePanel,
+    fill_tail,
+    inverse_vol,
+    load_price_panel,
+    warn_exchange_arg,
+)
 
 
 def inverse_vol_weights(
     weights: Dict[str, float],
-    exchange: str,
+    *,
     quote: str,
     lookback_days: int,
     vol_floor: float,
     strength: float,
+    panel: PricePanel | None = None,
+    exchange: str | None = None,
 ) -> Dict[str, float]:
-    base = dict(weights)
-    invw = {}
-    fx = fetch_fx_usd_to_aud() if (quote or "").upper() == "AUD" else None
-    for s in base.keys():
-        hist = fetch_history_daily(s, vs="usd", days=max(lookback_days + 30, 120))
-        px = [p * (fx if fx else 1.0) for _, p in hist][-lookback_days:]
-        if len(px) < max(10, int(0.5 * lookback_days)):
-            vol = None
-        else:
-            rets = _daily_returns(px)
-            if len(rets) < 5:
-                vol = None
-            else:
-                mu = sum(rets) / len(rets)
-                var = sum((r - mu) ** 2 for r in rets) / (len(rets) - 1)
-                vol = math.sqrt(var)
-        vol_eff = max(vol or vol_floor, vol_floor)
-        invw[s] = 1.0 / vol_eff
-    ssum = sum(invw.values())
-    invw = (
-        {k: v / ssum for k, v in invw.items()}
-        if ssum
-        else {k: 1.0 / len(base) for k in base}
-    )
-    out = {
-        k: (1.0 - float(strength)) * float(w)
-        + float(strength) * float(invw.get(k, 0.0))
-        for k, w in base.items()
-    }
-    total = float(sum(out.values()))
-    return (
-        {k: v / total for k, v in out.items()}
-        if total
-        else {k: 1.0 / len(base) for k in base}
-    )
+    """
+    Inverse-vol blend for today, via `strategies.panel.inverse_vol`.
+    """
+    warn_exchange_arg("inverse_vol_weights", exchange)
+    syms = list(weights.keys())
+    if not syms:
+        return {}
+    if panel is None:
+        panel = load_price_panel(syms, max(lookback_days + 30, 120), quote)
+    prices = fill_tail(panel.select(syms))
+    if not len(prices):
+        prices = np.full((1, len(syms)), np.nan)  # no history: vol_floor for all
+    base = np.array([float(weights[s]) for s in syms])
+    w = inverse_vol(prices, base, lookback_days, vol_floor, strength)
+    return dict(zip(syms, w[-1].tolist()))
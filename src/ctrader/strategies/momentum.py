@@ -2,34 +2,38 @@ from __future__ import annotations
 
 from typing import Dict, List
 
-from ctrader.data_providers.marketdata import fetch_fx_usd_to_aud, fetch_history_daily
-
-
-def _price_at_offset(series: list[float], offset_days: int) -> float | None:
-    if not series or offset_days <= 0 or offset_days >= len(series):
-        return None
-    return series[-1 - offset_days]
+from ctrader.strategies.panel import (
+    PricePanel,
+    fill_tail,
+    load_price_panel,
+    momentum_scores,
+    warn_exchange_arg,
+)
 
 
 def momentum_12_1(
     symbols: List[str],
-    exchange: str,
+    *,
     quote: str,
     lookback_months: int,
     skip_recent_months: int,
+    panel: PricePanel | None = None,
+    exchange: str | None = None,
 ) -> Dict[str, float]:
-    lb_days = int(lookback_months * 30)
-    skip_days = int(skip_recent_months * 30)
-    use_aud = (quote or "").upper() == "AUD"
-    fx = fetch_fx_usd_to_aud() if use_aud else None
-    scores: Dict[str, float] = {}
-    for s in symbols:
-        hist = fetch_history_daily(s, vs="usd", days=max(400, lb_days + skip_days + 30))
-        px = [p * (fx if fx else 1.0) for _, p in hist]
-        a = _price_at_offset(px, skip_days)
-        b = _price_at_offset(px, lb_days + skip_days)
-        scores[s] = 0.0 if a is None or b is None or b <= 0 else (a / b) - 1.0
-    return scores
+    """
+    Latest 12-1 momentum per symbol, via `strategies.panel.momentum_scores`.
+    """
+    warn_exchange_arg("momentum_12_1", exchange)
+    syms = list(symbols)
+    if panel is None:
+        days = int((lookback_months + skip_recent_months) * 30)
+        panel = load_price_panel(syms, max(400, days + 30), quote)
+    scores = momentum_scores(
+        fill_tail(panel.select(syms)), lookback_months, skip_recent_months
+    )
+    if not len(scores):
+        return {s: 0.0 for s in syms}
+    return dict(zip(syms, scores[-1].tolist()))
 
 
 def boost_top_k(
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ctrader.data_providers.marketdata import fetch_fx_usd_to_aud, history_store
+from ctrader.indicators import momentum, rolling_std, rolling_sum, simple_returns, sma
+
+# Panel strategy API: every function takes a day x asset price array (rows
+# oldest first, NaN where an asset has no price) and returns a result for all
+# assets and all days at once, using only prices up to and including each
+# row. Backtests use every row; live runs take the last one.
+
+_DAY_MS = 86_400_000
+
+
+@dataclass
+class PricePanel:
+    """
+    Daily close matrix: one row per UTC day, one column per symbol.
+    Days a symbol has no price for are NaN.
+    """
+
+    symbols: list[str]
+    days: np.ndarray  # int64 UTC day numbers (days since epoch)
+    prices: np.ndarray  # float64, shape (len(days), len(symbols))
+    _version: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def version(self) -> str:
+        """Content hash; panels are treated as read-only once built."""
+        if self._version is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update("\0".join(self.symbols).encode("utf-8"))
+            for a in (self.days, self.prices):
+                h.update(np.ascontiguousarray(a).tobytes())
+            self._version = h.hexdigest()
+        return self._version
+
+    def select(self, symbols: list[str]) -> np.ndarray:
+        idx = [self.symbols.index(s) for s in symbols]
+        return self.prices[:, idx]
+
+    def filled_tail(self) -> PricePanel:
+        """This panel with every symbol's last price carried to the final row."""
+        filled = fill_tail(self.prices)
+        if np.array_equal(filled, self.prices, equal_nan=True):
+            return self
+        return PricePanel(self.symbols, self.days, filled)
+
+
+def load_price_panel(symbols: list[str], days: int, quote: str) -> PricePanel:
+    """Build a day x asset panel from the history store, converted to `quote`."""
+    store = history_store()
+    store.prefetch(symbols, days)
+    fx = fetch_fx_usd_to_aud() if (quote or "").upper() == "AUD" else None
+    series = {s: store.history(s, days) for s in symbols}
+    all_days = np.unique(
+        np.concatenate([ts // _DAY_MS for ts, _ in series.values()] or [[]])
+    ).astype(np.int64)
+    prices = np.full((len(all_days), len(symbols)), np.nan)
+    for j, s in enumerate(symbols):
+        ts, px = series[s]
+        if not len(ts):
+            continue
+        # later points win for duplicate days (CoinGecko appends a live "now" point)
+        prices[np.searchsorted(all_days, ts // _DAY_MS), j] = px
+    if fx:
+        prices *= fx
+    return PricePanel(list(symbols), all_days, prices)
+
+
+# --------------------------- helpers ---------------------------
+
+
+def warn_exchange_arg(func: str, exchange: str | None) -> None:
+    """
+    The dict wrappers' `exchange` argument is ignored (prices come from the
+    shared history store); it is accepted as a keyword for one release.
+    """
+    if exchange is not None:
+        warnings.warn(
+            f"{func}(): `exchange` is ignored and will be removed",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+
+
+def fill_tail(prices: np.ndarray) -> np.ndarray:
+    """
+    Carry each column's last observation over the NaN rows after it. Series
+    cached on different days end on different rows of a union-of-days
+    panel; live runs read the final row, which must hold every asset's
+    latest price.
+    """
+    p = np.array(prices, dtype=np.float64)
+    if not len(p):
+        return p
+    ok = ~np.isnan(p)
+    last = len(p) - 1 - np.argmax(ok[::-1], axis=0)
+    for j in np.flatnonzero(ok.any(axis=0) & (last < len(p) - 1)):
+        p[last[j] + 1 :, j] = p[last[j], j]
+    return p
+
+
+def rolling_vol(prices: np.ndarray, lookback: int) -> np.ndarray:
+    """
+    Sample std of simple daily returns over the trailing `lookback` prices.
+    NaN with fewer than max(10, lookback / 2) prices or 5 returns.
+    """
+    lb = max(1, int(lookback))
+    with np.errstate(invalid="ignore"):
+        rets = np.where(prices > 0, simple_returns(prices), np.nan)
+    vol = rolling_std(rets, max(1, lb - 1), min_periods=5)
+    n_px = rolling_sum((~np.isnan(prices)).astype(np.int64), lb)
+    return np.where(n_px >= max(10, int(0.5 * lb)), vol, np.nan)
+
+
+def normalize_rows(w: np.ndarray) -> np.ndarray:
+    """Scale each row to sum to 1 over its positive entries (rows summing to 0 are kept)."""
+    s = np.maximum(w, 0.0).sum(axis=1, keepdims=True)
+    return np.divide(w, s, out=w.copy(), where=s > 0)
+
+
+def _as_panel_weights(weights: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Broadcast one weight vector (or a full panel) to the shape of `prices`."""
+    w = np.asarray(weights, dtype=np.float64)
+    return np.array(np.broadcast_to(w, prices.shape), dtype=np.float64)
+
+
+# --------------------------- signals ---------------------------
+
+
+def trend_filter(
+    prices: np.ndarray, weights: np.ndarray, sma_days: int, min_weight: float
+) -> np.ndarray:
+    """Scale assets trading below their `sma_days` SMA by `min_weight`, then renormalise."""
+    w = _as_panel_weights(weights, prices)
+    if sma_days <= 1:
+        return w
+    ma = sma(prices, int(sma_days))
+    with np.errstate(invalid="ignore"):
+        below = prices < ma  # False wherever the SMA is undefined
+    return normalize_rows(np.where(below, w * float(min_weight), w))
+
+
+def inverse_vol(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    lookback_days: int,
+    vol_floor: float,
+    strength: float,
+) -> np.ndarray:
+    """
+    Blend `weights` towards inverse-volatility weights by `strength`.
+    Assets without enough history count as having vol `vol_floor`.
+    """
+    w = _as_panel_weights(weights, prices)
+    inv = inverse_vol_target(rolling_vol(prices, int(lookback_days)), vol_floor)
+    s = float(strength)
+    return normalize_rows((1.0 - s) * w + s * inv)
+
+
+def inverse_vol_target(vol: np.ndarray, vol_floor: float) -> np.ndarray:
+    """Inverse-volatility weights per row; NaN vols count as `vol_floor`."""
+    floor = float(vol_floor)
+    with np.errstate(divide="ignore"):
+        inv = 1.0 / np.maximum(np.nan_to_num(vol, nan=floor), floor)
+    return normalize_rows(inv)
+
+
+def momentum_scores(
+    prices: np.ndarray, lookback_months: int, skip_recent_months: int
+) -> np.ndarray:
+    """
+    Point-in-time 12-1 style momentum, p[t - skip] / p[t - lb - skip] - 1 with
+    30-day months. 0 where either price is missing.
+    """
+    skip_days = int(skip_recent_months * 30)
+    if skip_days <= 0:
+        return np.zeros_like(prices)
+    m = momentum(prices, int(lookback_months * 30), skip_days)
+    return np.nan_to_num(m, nan=0.0)
+
+
+def boost_top_k(
+    weights: np.ndarray, scores: np.ndarray, k: int, boost_pct: float
+) -> np.ndarray:
+    """Boost the `k` highest-scoring assets of each row by `boost_pct`, then renormalise."""
+    scores = np.atleast_2d(scores)
+    w = np.array(np.broadcast_to(weights, scores.shape), dtype=np.float64)
+    k = max(0, int(k))
+    order = np.argsort(-scores, axis=1, kind="stable")  # ties keep column order
+    top = np.zeros(scores.shape, dtype=bool)
+    np.put_along_axis(top, order[:, :k], True, axis=1)
+    return normalize_rows(np.where(top, w * (1.0 + float(boost_pct)), w))
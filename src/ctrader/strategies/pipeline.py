@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from ctrader.indicators import sma
+from ctrader.risk.risk_manager import RiskRules
+from ctrader.strategies.panel import (
+    PricePanel,
+    boost_top_k,
+    inverse_vol_target,
+    momentum_scores,
+    normalize_rows,
+    rolling_vol,
+)
+from ctrader.strategies.risk_parity import MODES as SIZING_MODES
+from ctrader.strategies.risk_parity import covariance_target
+
+# Declarative weight pipeline: base weights -> stage -> stage -> ... for
+# every day of a price panel. The stage list comes from `pipeline:` in
+# pools.yaml (or `pools.<pool>.pipeline`); each stage reads its parameters
+# from the existing config sections, and a mapping entry such as
+# {stage: trend_filter, sma_days: 150} overrides them.
+#
+# Outputs are memoized on (panel version, assets, base weights, parameters
+# of this and every upstream stage), so changing only the caps, or sweeping
+# only momentum_boost_pct, reuses everything computed before that stage.
+
+DEFAULT_STAGES = ["trend_filter", "risk_parity", "momentum_boost", "caps"]
+CACHE_ENTRIES = 256
+
+
+def _freeze(x: Any) -> Hashable:
+    if isinstance(x, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in x.items()))
+    if isinstance(x, (list, tuple)):
+        return tuple(_freeze(v) for v in x)
+    if isinstance(x, np.ndarray):
+        return (x.dtype.str, x.shape, x.tobytes())
+    return x
+
+
+class _LRU:
+    """Thread-safe LRU of read-only arrays (pools may run in parallel threads)."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._d: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            if key in self._d:
+                self._d.move_to_end(key)
+                self.hits += 1
+                return self._d[key]
+            self.misses += 1
+        value = np.asarray(compute())
+        value.setflags(write=False)  # shared between callers
+        with self._lock:
+            self._d[key] = value
+            while len(self._d) > self.size:
+                self._d.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._d.clear()
+            self.hits = self.misses = 0
+
+
+_CACHE = _LRU(CACHE_ENTRIES)
+
+
+def stage_cache() -> _LRU:
+    """Process-wide cache of stage outputs and per-asset indicators."""
+    return _CACHE
+
+
+@dataclass
+class StageContext:
+    """What a stage sees besides its input weights and parameters."""
+
+    panel: PricePanel
+    assets: list[str]
+    prices: np.ndarray  # panel columns for `assets`
+
+    def indicator(self, name: str, fn: Callable[..., np.ndarray], *args) -> np.ndarray:
+        """
+        Per-asset indicator `fn(prices, *args)` for `assets`, computed on the
+        whole panel once per (panel version, name, args) and shared between
+        pools and stages.
+        """
+        full = _CACHE.get(
+            ("indicator", self.panel.version, name, _freeze(args)),
+            lambda: fn(self.panel.prices, *args),
+        )
+        return full[:, [self.panel.symbols.index(a) for a in self.assets]]
+
+    def memo(self, name: str, compute: Callable[[], np.ndarray], *args) -> np.ndarray:
+        """
+        `compute()` for this asset set (e.g. a covariance-based target),
+        cached per (panel version, assets, name, args).
+        """
+        return _CACHE.get(
+            ("memo", self.panel.version, tuple(self.assets), name, _freeze(args)),
+            compute,
+        )
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A pipeline step. `params(cfg, pool)` returns its parameters from the
+    config (None disables it); `apply(weights, params, ctx)` returns the new
+    day x asset weights and must not modify `weights`.
+    """
+
+    name: str
+    params: Callable[[dict, str], dict | None]
+    apply: Callable[[np.ndarray, dict, StageContext], np.ndarray]
+
+
+STAGES: dict[str, Stage] = {}
+
+
+def register_stage(stage: Stage) -> Stage:
+    """Make `stage` available to `pipeline:` entries by its name."""
+    STAGES[stage.name] = stage
+    return stage
+
+
+# --------------------------- built-in stages ---------------------------
+
+
+def _trend_params(cfg: dict, pool: str) -> dict | None:
+    g = cfg.get("global", {})
+    days = int(g.get("trend_filter_sma_days", 200))
+    if days <= 1:
+        return None
+    return {"sma_days": days, "min_weight": float(g.get("trend_min_weight", 0.25))}
+
+
+def _trend_apply(w: np.ndarray, p: dict, ctx: StageContext) -> np.ndarray:
+    ma = ctx.indicator("sma", sma, int(p["sma_days"]))
+    with np.errstate(invalid="ignore"):
+        below = ctx.prices < ma  # False wherever the SMA is undefined
+    return normalize_rows(np.where(below, w * float(p["min_weight"]), w))
+
+
+def _risk_parity_params(cfg: dict, pool: str) -> dict | None:
+    szz = cfg.get("sizing", {})
+    if not szz.get("risk_parity", True):
+        return None
+    mode = str(szz.get("mode", "inverse_vol"))
+    if mode not in SIZING_MODES:
+        raise ValueError(
+            f"Unknown sizing.mode {mode!r} (known: {', '.join(SIZING_MODES)})"
+        )
+    return {
+        "mode": mode,
+        "lookback_days": int(szz.get("vol_lookback_days", 30)),
+        "vol_floor": float(szz.get("vol_floor", 0.0005)),
+        "strength": float(szz.get("risk_parity_strength", 1.0)),
+    }
+
+
+def _risk_parity_apply(w: np.ndarray, p: dict, ctx: StageContext) -> np.ndarray:
+    mode, lb, floor = str(p["mode"]), int(p["lookback_days"]), float(p["vol_floor"])
+    if mode == "inverse_vol":
+        vol = ctx.indicator("vol", rolling_vol, lb)
+        target = inverse_vol_target(vol, floor)
+    else:
+        target = ctx.memo(
+            "covariance_target",
+            lambda: covariance_target(
+                ctx.prices,
+                lb,
+                floor,
+                mode,
+                days=ctx.panel.days,
+                warm_key=(mode, tuple(ctx.assets), lb, floor),
+            ),
+            mode,
+            lb,
+            floor,
+        )
+    s = float(p["strength"])
+    return normalize_rows((1.0 - s) * w + s * target)
+
+
+def _momentum_params(cfg: dict, pool: str) -> dict | None:
+    mom = cfg.get("momentum", {})
+    if not mom.get("enabled", True):
+        return None
+    return {
+        "lookback_months": int(mom.get("lookback_months", 12)),
+        "skip_recent_months": int(mom.get("skip_recent_months", 1)),
+        "top_k": int(mom.get("top_k", 6)),
+        "boost_pct": float(mom.get("momentum_boost_pct", 0.04)),
+    }
+
+
+def _momentum_apply(w: np.ndarray, p: dict, ctx: StageContext) -> np.ndarray:
+    scores = ctx.indicator(
+        "momentum",
+        momentum_scores,
+        int(p["lookback_months"]),
+        int(p["skip_recent_months"]),
+    )
+    return boost_top_k(w, scores, int(p["top_k"]), float(p["boost_pct"]))
+
+
+def _caps_params(cfg: dict, pool: str) -> dict | None:
+    pcfg = cfg["pools"][pool]
+    return {
+        "max_per_asset_pct": float(pcfg.get("max_per_asset_pct", 100)),
+        "max_meme_bucket_pct": float(pcfg.get("max_meme_bucket_pct", 100)),
+        "max_ai_bucket_pct": float(pcfg.get("max_ai_bucket_pct", 100)),
+        "per_asset_caps": pcfg.get("per_asset_caps", {}) or {},
+        "categories": pcfg.get("categories", {}) or {},
+    }
+
+
+def cap_weights(
+    w: np.ndarray, assets: list[str], categories: dict, rules: RiskRules
+) -> np.ndarray:
+    """Row-wise equivalent of `enforce_caps`."""
+    caps = rules.per_asset_caps or {}
+    cap = np.array([float(caps[a]) / 100.0 if a in caps else np.inf for a in assets])
+    if rules.max_per_asset_pct < 100:
+        cap = np.minimum(cap, rules.max_per_asset_pct / 100.0)
+    w = np.minimum(w, cap)
+    for bucket, cap_pct in (
+        ("meme", rules.max_meme_bucket_pct),
+        ("ai", rules.max_ai_bucket_pct),
+    ):
+        members = {t for t, c in categories.items() if c == bucket}
+        mask = np.array([a in members for a in assets])
+        if not mask.any():
+            continue
+        total = w[:, mask].sum(axis=1)
+        limit = cap_pct / 100.0
+        scale = np.where(
+            (total > limit) & (total > 0), limit / np.maximum(total, 1e-300), 1.0
+        )
+        w[:, mask] *= scale[:, None]
+    return normalize_rows(w)
+
+
+def _caps_apply(w: np.ndarray, p: dict, ctx: StageContext) -> np.ndarray:
+    rules = RiskRules(
+        p["max_per_asset_pct"],
+        p["max_meme_bucket_pct"],
+        p["max_ai_bucket_pct"],
+        p["per_asset_caps"],
+    )
+    return cap_weights(w, ctx.assets, p["categories"], rules)
+
+
+register_stage(Stage("trend_filter", _trend_params, _trend_apply))
+register_stage(Stage("risk_parity", _risk_parity_params, _risk_parity_apply))
+# earlier name of the same stage
+register_stage(Stage("inverse_vol", _risk_parity_params, _risk_parity_apply))
+register_stage(Stage("momentum_boost", _momentum_params, _momentum_apply))
+register_stage(Stage("caps", _caps_params, _caps_apply))
+
+
+# --------------------------- pipeline ---------------------------
+
+
+class Pipeline:
+    """
+    Base weights for `assets` run through `steps` (stage, params) in order.
+    Build it with `from_config`; `run` returns day x asset weights for a
+    panel and `last` the final day as a dict.
+    """
+
+    def __init__(
+        self,
+        assets: list[str],
+        base: np.ndarray,
+        steps: list[tuple[Stage, dict]],
+    ) -> None:
+        self.assets = list(assets)
+        self.base = np.asarray(base, dtype=np.float64)
+        self.steps = list(steps)
+
+    @classmethod
+    def from_config(cls, cfg: dict, pool: str) -> Pipeline:
+        pcfg = cfg["pools"][pool]
+        assets = list(pcfg["assets"].keys())
+        base = np.array([float(pcfg["assets"][a]) for a in assets])
+        spec = pcfg.get("pipeline", cfg.get("pipeline")) or DEFAULT_STAGES
+        steps = []
+        for entry in spec:
+            if isinstance(entry, dict):
+                overrides = dict(entry)
+                name = str(overrides.pop("stage", ""))
+            else:
+                name, overrides = str(entry), {}
+            stage = STAGES.get(name)
+            if stage is None:
+                raise ValueError(
+                    f"Unknown pipeline stage {name!r} (known: {', '.join(STAGES)})"
+                )
+            enabled = overrides.pop("enabled", True)
+            params = stage.params(cfg, pool)
+            unknown = sorted(set(overrides) - set(params or {}))
+            if params is not None and unknown:
+                raise ValueError(
+                    f"Unknown parameter(s) {', '.join(map(repr, unknown))} for "
+                    f"pipeline stage {name!r} (known: {', '.join(params)})"
+                )
+            if not enabled or params is None:
+                continue
+            steps.append((stage, {**params, **overrides}))
+        return cls(assets, base, steps)
+
+    @property
+    def names(self) -> list[str]:
+        return [stage.name for stage, _ in self.steps]
+
+    def run(self, panel: PricePanel) -> np.ndarray:
+        prices = panel.select(self.assets)
+        ctx = StageContext(panel, self.assets, prices)
+        key: Hashable = (panel.version, tuple(self.assets), _freeze(self.base))
+        w = np.tile(self.base, (len(prices), 1))
+        for stage, params in self.steps:
+            key = (key, stage.name, _freeze(params))
+            w = _CACHE.get(key, lambda s=stage, w=w, p=params: s.apply(w, p, ctx))
+        return w
+
+    def last(self, panel: PricePanel) -> dict[str, float]:
+        """
+        Weights for the panel's final day, with every asset at its latest
+        price (see `fill_tail`).
+        """
+        w = self.run(panel.filled_tail())
+        row = w[-1] if len(w) else self.base
+        return dict(zip(self.assets, row.tolist()))
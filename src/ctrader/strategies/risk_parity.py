@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+import numpy as np
+
+from ctrader.indicators import simple_returns
+from ctrader.strategies.panel import (
+    PricePanel,
+    fill_tail,
+    inverse_vol_target,
+    load_price_panel,
+    normalize_rows,
+    rolling_vol,
+    warn_exchange_arg,
+)
+
+# Covariance-aware sizing. Every day's covariance is a Ledoit-Wolf
+# shrinkage estimate over the trailing window of daily returns; weights are
+# then either equal risk contribution (ERC) or long-only minimum variance.
+# Both solvers iterate on all days at once (batched linear algebra) and start
+# each day from a warm solution: the stored answer for that day or the day
+# before when this asset set was solved earlier, otherwise the
+# zero-correlation answer (inverse vol).
+
+MODES = ("inverse_vol", "erc", "min_variance")
+
+_WARM: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+_WARM_LOCK = threading.Lock()
+
+
+def ledoit_wolf(windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ledoit-Wolf (2004) shrinkage towards a scaled identity for a batch of
+    return windows shaped (..., n_obs, n_assets). NaN returns count as the
+    window mean. Returns (covariance (..., n, n), shrinkage (...)).
+    """
+    x = np.asarray(windows, dtype=np.float64)
+    n, p = x.shape[-2], x.shape[-1]
+    ok = ~np.isnan(x)
+    mean = np.where(ok, x, 0.0).sum(axis=-2) / np.maximum(ok.sum(axis=-2), 1)
+    x = np.where(ok, x - mean[..., None, :], 0.0)
+    s = np.einsum("...li,...lj->...ij", x, x) / n
+    tr = np.trace(s, axis1=-2, axis2=-1)
+    mu = tr / p
+    x2 = x * x
+    beta_ = np.sum(np.sum(x2, axis=-1) ** 2, axis=-1)
+    delta_ = np.sum(s * s, axis=(-2, -1))
+    beta = (beta_ / n - delta_) / (p * n)
+    delta = (delta_ - 2.0 * mu * tr + p * mu * mu) / p
+    beta = np.minimum(beta, delta)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shrink = np.where(delta > 0, beta / delta, 0.0)
+    shrink = np.clip(shrink, 0.0, 1.0)
+    eye = np.eye(p)
+    cov = (1.0 - shrink)[..., None, None] * s + (shrink * mu)[..., None, None] * eye
+    return cov, shrink
+
+
+def rolling_covariance(
+    prices: np.ndarray, lookback: int, vol_floor: float = 0.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Shrunk covariance of simple daily returns over the trailing `lookback`
+    prices for every day, with variances floored at `vol_floor`**2.
+    Returns (cov (days, n, n), valid (days,)); a day is valid when every
+    asset has enough data by the `rolling_vol` rules.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    t, p = prices.shape
+    lb = max(2, int(lookback))
+    cov = np.zeros((t, p, p))
+    valid = np.zeros(t, dtype=bool)
+    n_ret = lb - 1
+    if t <= n_ret or p == 0:
+        return cov, valid
+    with np.errstate(invalid="ignore"):
+        rets = np.where(prices > 0, simple_returns(prices), np.nan)
+    # windows end on day t and hold returns t - n_ret + 1 .. t
+    win = np.lib.stride_tricks.sliding_window_view(rets, n_ret, axis=0)
+    win = np.swapaxes(win, -1, -2)  # (days - n_ret + 1, n_ret, assets)
+    c, _ = ledoit_wolf(win)
+    floor2 = float(vol_floor) ** 2
+    d = np.arange(p)
+    c[:, d, d] = np.maximum(c[:, d, d], floor2)
+    cov[n_ret - 1 :] = c
+    valid = ~np.isnan(rolling_vol(prices, lb)).any(axis=1)
+    valid[: n_ret - 1] = False
+    return cov, valid
+
+
+# --------------------------- solvers ---------------------------
+
+
+def erc_weights(
+    cov: np.ndarray,
+    init: np.ndarray | None = None,
+    tol: float = 1e-10,
+    max_iter: int = 50,
+) -> np.ndarray:
+    """
+    Equal-risk-contribution weights for a batch of covariances (..., n, n).
+    Damped Newton on Spinu's convex form, min 1/2 y'Sy - sum(log y)/n with
+    w = y / sum(y); `init` (..., n) are starting weights.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    shape, p = cov.shape[:-2], cov.shape[-1]
+    s = cov.reshape(-1, p, p)
+    m = len(s)
+    b = 1.0 / p
+    d = np.arange(p)
+    if init is None:
+        w0 = 1.0 / np.sqrt(s[:, d, d])
+    else:
+        w0 = np.maximum(np.asarray(init, dtype=np.float64).reshape(m, p), 1e-12)
+    # scale the start onto the optimal ray: c**2 * w'Sw = sum(b) = 1
+    y = w0 / np.sqrt(np.einsum("mi,mij,mj->m", w0, s, w0))[:, None]
+    active = np.arange(m)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        sa, ya = s[active], y[active]
+        g = np.einsum("mij,mj->mi", sa, ya) - b / ya
+        h = sa.copy()
+        h[:, d, d] += b / (ya * ya)
+        dy = -np.linalg.solve(h, g[..., None])[..., 0]
+        # Newton decrement of p * objective, which is self-concordant
+        lam = np.sqrt(p * np.maximum(-np.einsum("mi,mi->m", g, dy), 0.0))
+        step = np.where(lam > 0.25, 1.0 / (1.0 + lam), 1.0)
+        y[active] = ya + step[:, None] * dy
+        active = active[lam * lam > tol]
+    w = y / y.sum(axis=1, keepdims=True)
+    return w.reshape(shape + (p,))
+
+
+def _project_simplex(v: np.ndarray) -> np.ndarray:
+    """Row-wise Euclidean projection onto {w >= 0, sum(w) = 1}."""
+    u = -np.sort(-v, axis=1)
+    css = np.cumsum(u, axis=1) - 1.0
+    k = np.arange(1, v.shape[1] + 1)
+    rho = np.sum(u - css / k > 0, axis=1)
+    theta = css[np.arange(len(v)), rho - 1] / rho
+    return np.maximum(v - theta[:, None], 0.0)
+
+
+def min_variance_weights(
+    cov: np.ndarray,
+    init: np.ndarray | None = None,
+    tol: float = 1e-9,
+    max_iter: int = 500,
+) -> np.ndarray:
+    """
+    Long-only minimum-variance weights for a batch of covariances
+    (..., n, n): accelerated projected gradient (FISTA) on the simplex.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    shape, p = cov.shape[:-2], cov.shape[-1]
+    s = cov.reshape(-1, p, p)
+    m = len(s)
+    if init is None:
+        d = np.arange(p)
+        w = normalize_rows(1.0 / s[:, d, d])
+    else:
+        w = _project_simplex(np.asarray(init, dtype=np.float64).reshape(m, p))
+    step = 0.5 / np.maximum(np.linalg.eigvalsh(s)[:, -1], 1e-300)
+    z, t = w.copy(), np.ones(m)
+    active = np.arange(m)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        sa, za, wa, ta = s[active], z[active], w[active], t[active]
+        grad = 2.0 * np.einsum("mij,mj->mi", sa, za)
+        wn = _project_simplex(za - step[active, None] * grad)
+        # adaptive restart: drop the momentum when it stops pointing downhill
+        restart = np.einsum("mi,mi->m", za - wn, wn - wa) > 0
+        ta = np.where(restart, 1.0, ta)
+        tn = (1.0 + np.sqrt(1.0 + 4.0 * ta * ta)) / 2.0
+        z[active] = wn + ((ta - 1.0) / tn)[:, None] * (wn - wa)
+        w[active], t[active] = wn, tn
+        active = active[np.abs(wn - wa).max(axis=1) > tol]
+    return w.reshape(shape + (p,))
+
+
+# --------------------------- panel sizing ---------------------------
+
+
+def _warm_start(key: tuple, days: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    """Per-day starting weights: stored solution for the day, else the day before."""
+    with _WARM_LOCK:
+        prev = _WARM.get(key)
+    init = fallback.copy()
+    if prev is None or not len(days):
+        return init
+    pdays, pw = prev
+    for lag in (1, 0):  # same day last, so it wins
+        idx = np.searchsorted(pdays, days - lag)
+        ok = (idx < len(pdays)) & (pdays[np.minimum(idx, len(pdays) - 1)] == days - lag)
+        init[ok] = pw[idx[ok]]
+    return init
+
+
+def covariance_target(
+    prices: np.ndarray,
+    lookback_days: int,
+    vol_floor: float,
+    mode: str = "erc",
+    days: np.ndarray | None = None,
+    warm_key: tuple | None = None,
+) -> np.ndarray:
+    """
+    Day x asset ERC or minimum-variance weights from the shrunk rolling
+    covariance. Days without a full window for every asset fall back to
+    inverse-vol weights. `days`/`warm_key` enable warm starts across calls.
+    """
+    if mode not in ("erc", "min_variance"):
+        raise ValueError(
+            f"covariance sizing mode must be erc or min_variance, got {mode!r}"
+        )
+    prices = np.asarray(prices, dtype=np.float64)
+    lb = int(lookback_days)
+    out = inverse_vol_target(rolling_vol(prices, lb), vol_floor)
+    cov, valid = rolling_covariance(prices, lb, vol_floor)
+    if not valid.any():
+        return out
+    rows = np.flatnonzero(valid)
+    init = out[rows]
+    if days is not None and warm_key is not None:
+        init = _warm_start(warm_key, np.asarray(days)[rows], init)
+    solve = erc_weights if mode == "erc" else min_variance_weights
+    out[rows] = solve(cov[rows], init)
+    if days is not None and warm_key is not None:
+        with _WARM_LOCK:
+            _WARM[warm_key] = (np.asarray(days)[rows].copy(), out[rows].copy())
+    return out
+
+
+def risk_parity(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    lookback_days: int,
+    vol_floor: float,
+    strength: float,
+    mode: str = "erc",
+) -> np.ndarray:
+    """Blend `weights` towards `mode` sizing by `strength` for every day."""
+    w = np.array(np.broadcast_to(weights, prices.shape), dtype=np.float64)
+    if mode == "inverse_vol":
+        target = inverse_vol_target(rolling_vol(prices, int(lookback_days)), vol_floor)
+    else:
+        target = covariance_target(prices, lookback_days, vol_floor, mode)
+    s = float(strength)
+    return normalize_rows((1.0 - s) * w + s * target)
+
+
+def risk_parity_weights(
+    weights: Dict[str, float],
+    *,
+    quote: str,
+    lookback_days: int,
+    vol_floor: float,
+    strength: float,
+    mode: str = "erc",
+    panel: PricePanel | None = None,
+    exchange: str | None = None,
+) -> Dict[str, float]:
+    """Today's `risk_parity` weights as a dict (see `inverse_vol_weights`)."""
+    warn_exchange_arg("risk_parity_weights", exchange)
+    syms = list(weights.keys())
+    if not syms:
+        return {}
+    if panel is None:
+        panel = load_price_panel(syms, max(lookback_days + 30, 120), quote)
+    prices = fill_tail(panel.select(syms))
+    if not len(prices):
+        prices = np.full((1, len(syms)), np.nan)
+    base = np.array([float(weights[s]) for s in syms])
+    w = risk_parity(prices, base, lookback_days, vol_floor, strength, mode)
+    return dict(zip(syms, w[-1].tolist()))
@@ -1,35 +1,39 @@
 from __future__ import annotations
 
-import math
 from typing import Dict
 
-from ctrader.data_providers.marketdata import fetch_fx_usd_to_aud, fetch_history_daily
+import numpy as np
 
-
-def _sma(prices: list[float], window: int) -> float:
-    if not prices or window <= 0 or len(prices) < window:
-        return float("nan")
-    return sum(prices[-window:]) / float(window)
+from ctrader.strategies.panel import (
+    PricePanel,
+    fill_tail,
+    load_price_panel,
+    trend_filter,
+    warn_exchange_arg,
+)
 
 
 def apply_trend_filter(
     weights: Dict[str, float],
-    exchange: str,
+    *,
     quote: str,
     sma_days: int,
     min_weight: float,
+    panel: PricePanel | None = None,
+    exchange: str | None = None,
 ) -> Dict[str, float]:
+    """
+    Today's row of `strategies.panel.trend_filter` as a dict. Pass `panel`
+    to reuse an already-built price panel.
+    """
+    warn_exchange_arg("apply_trend_filter", exchange)
     if sma_days <= 1:
         return dict(weights)
-    out = dict(weights)
-    fx = fetch_fx_usd_to_aud() if (quote or "").upper() == "AUD" else None
-    for sym, w in list(weights.items()):
-        hist = fetch_history_daily(sym, vs="usd", days=max(365, sma_days + 30))
-        series = [p * (fx if fx else 1.0) for _, p in hist]
-        sma = _sma(series, sma_days)
-        if not series or math.isnan(sma):
-            continue
-        px = series[-1]
-        out[sym] = float(w) * (float(min_weight) if px < sma else float(w))
-    s = sum(max(0.0, v) for v in out.values())
-    return {k: v / s for k, v in out.items()} if s > 0 else out
+    syms = list(weights.keys())
+    if panel is None:
+        panel = load_price_panel(syms, max(365, sma_days + 30), quote)
+    base = np.array([float(weights[s]) for s in syms])
+    w = trend_filter(fill_tail(panel.select(syms)), base, sma_days, min_weight)
+    if not len(w):
+        return dict(weights)
+    return dict(zip(syms, w[-1].tolist()))
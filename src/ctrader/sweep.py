@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import multiprocessing as mp
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import pandas as pd
+
+from ctrader.analytics import equity_stats
+from ctrader.backtest import PricePanel, run_backtest_panel
+from ctrader.data_providers.marketdata import close_caches
+
+# short names accepted by --param, mapped to their pools.yaml paths
+SWEEP_ALIASES = {
+    "risk_parity_strength": "sizing.risk_parity_strength",
+    "vol_lookback_days": "sizing.vol_lookback_days",
+    "vol_floor": "sizing.vol_floor",
+    "sizing_mode": "sizing.mode",
+    "top_k": "momentum.top_k",
+    "momentum_boost_pct": "momentum.momentum_boost_pct",
+    "threshold_pct": "rebalance.threshold_pct",
+    "turnover_cap_pct": "backtest.turnover_cap_pct",
+    "trend_filter_sma_days": "global.trend_filter_sma_days",
+    "trend_min_weight": "global.trend_min_weight",
+}
+
+# Set once per worker process; with the fork start method the panel is
+# inherited copy-on-write instead of being pickled per task.
+_WORKER: dict[str, Any] = {}
+
+
+def _parse_value(raw: str) -> Any:
+    v = raw.strip()
+    if v.lower() in ("true", "false"):
+        return v.lower() == "true"
+    for conv in (int, float):
+        try:
+            return conv(v)
+        except ValueError:
+            pass
+    return v  # e.g. sizing_mode=erc,min_variance
+
+
+def parse_param_specs(specs: list[str]) -> dict[str, list[Any]]:
+    """Parse ["top_k=3,6", "sizing.vol_floor=0.001,0.002"] into {path: [values]}."""
+    axes: dict[str, list[Any]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not name.strip() or not values.strip():
+            raise ValueError(f"Bad --param spec (want NAME=v1,v2,...): {spec!r}")
+        path = SWEEP_ALIASES.get(name.strip(), name.strip())
+        axes[path] = [_parse_value(v) for v in values.split(",") if v.strip()]
+    return axes
+
+
+def grid_configs(axes: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    keys = list(axes)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*axes.values())]
+
+
+def random_configs(
+    axes: dict[str, list[Any]], samples: int, seed: int | None = None
+) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{k: rng.choice(v) for k, v in axes.items()} for _ in range(samples)]
+
+
+def apply_overrides(cfg: dict, overrides: dict[str, Any]) -> dict:
+    out = copy.deepcopy(cfg)
+    for path, value in overrides.items():
+        node = out
+        *parents, leaf = path.split(".")
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = value
+    return out
+
+
+def _init_worker(cfg: dict, pool: str, panel: PricePanel, bt_days: int) -> None:
+    _WORKER.update(cfg=cfg, pool=pool, panel=panel, bt_days=bt_days)
+
+
+def _run_one(overrides: dict[str, Any]) -> dict[str, Any]:
+    cfg = apply_overrides(_WORKER["cfg"], overrides)
+    df = run_backtest_panel(cfg, _WORKER["pool"], _WORKER["panel"], _WORKER["bt_days"])
+    start = float(cfg["pools"][_WORKER["pool"]].get("initial_equity", 10000))
+    final = float(df["equity"].iloc[-1]) if len(df) else start
+    return {
+        **overrides,
+        "final_equity": final,
+        "total_return": (final / start - 1.0) if start > 0 else 0.0,
+        **equity_stats(df["equity"]),
+    }
+
+
+def run_sweep(
+    cfg: dict,
+    pool: str,
+    panel: PricePanel,
+    bt_days: int,
+    configs: list[dict[str, Any]],
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Run one backtest per override dict in `configs` against a shared, read-only
+    price panel and return one row of stats per configuration.
+    """
+    workers = int(workers or os.cpu_count() or 1)
+    if workers <= 1 or len(configs) <= 1:
+        _init_worker(cfg, pool, panel, bt_days)
+        rows = [_run_one(c) for c in configs]
+    else:
+        ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+        # the children must not inherit an open SQLite connection
+        close_caches()
+        chunk = max(1, len(configs) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(cfg, pool, panel, bt_days),
+        ) as ex:
+            rows = list(ex.map(_run_one, configs, chunksize=chunk))
+    df = pd.DataFrame(rows)
+    if "sharpe_daily" in df:
+        df = df.sort_values("sharpe_daily", ascending=False, ignore_index=True)
+    return df
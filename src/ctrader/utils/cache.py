@@ -1,36 +1,119 @@
 from __future__ import annotations
 
-import hashlib
 import json
+import sqlite3
+import threading
 import time
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 
-class JsonDiskCache:
-    def __init__(self, base: Path, ttl_sec: int = 86400):
-        self.base = Path(base)
-        self.base.mkdir(parents=True, exist_ok=True)
+
+class SeriesCache:
+    """
+    Single-file SQLite cache with a primary-key index.
+
+    NumPy arrays are stored as raw float64 blobs and come back via
+    np.frombuffer (no parsing); everything else is stored as JSON. Writes
+    are transactional, entries older than `ttl_sec` are treated as misses
+    and evicted, and the oldest entries are dropped once the store grows
+    past `max_bytes`.
+    """
+
+    def __init__(
+        self, path: Path, ttl_sec: int = 86400, max_bytes: int | None = None
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
         self.ttl_sec = int(ttl_sec)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, ts REAL NOT NULL, kind TEXT NOT NULL,"
+            " shape TEXT, nbytes INTEGER NOT NULL, data BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_ts ON entries(ts)")
 
-    def _path_for(self, key: str) -> Path:
-        h = hashlib.sha256(key.encode("utf-8")).hexdigest()
-        return self.base / f"{h}.json"
+    @staticmethod
+    def _decode(kind: str, shape: str | None, blob: bytes) -> Any:
+        if kind == "f8":
+            dims = tuple(int(x) for x in (shape or "").split(",") if x)
+            return np.frombuffer(blob, dtype=np.float64).reshape(dims)
+        return json.loads(blob)
 
-    def get(self, key: str):
-        fp = self._path_for(key)
-        if not fp.exists():
+    @staticmethod
+    def _encode(data: Any) -> tuple[str, str | None, bytes]:
+        if isinstance(data, np.ndarray):
+            arr = np.ascontiguousarray(data, dtype=np.float64)
+            return "f8", ",".join(str(d) for d in arr.shape), arr.tobytes()
+        return "json", None, json.dumps(data).encode("utf-8")
+
+    def get_entry(self, key: str) -> tuple[Any, float] | None:
+        """Return (data, stored_at) regardless of age, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT ts, kind, shape, data FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
             return None
         try:
-            with open(fp, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            ts = float(payload.get("_ts", 0))
-            if time.time() - ts > self.ttl_sec:
-                return None
-            return payload.get("data")
+            return self._decode(row[1], row[2], row[3]), float(row[0])
         except Exception:
             return None
 
-    def set(self, key: str, data):
-        fp = self._path_for(key)
-        with open(fp, "w", encoding="utf-8") as f:
-            json.dump({"_ts": time.time(), "data": data}, f)
+    def get(self, key: str) -> Any:
+        hit = self.get_entry(key)
+        if hit is None or time.time() - hit[1] > self.ttl_sec:
+            return None
+        return hit[0]
+
+    def set(self, key: str, data: Any) -> None:
+        kind, shape, blob = self._encode(data)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, time.time(), kind, shape, len(blob), sqlite3.Binary(blob)),
+                )
+                self._enforce_size()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _enforce_size(self) -> None:
+        if not self.max_bytes:
+            return
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(nbytes), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, nbytes in self._db.execute(
+            "SELECT key, nbytes FROM entries ORDER BY ts"
+        ).fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= nbytes
+            if total <= self.max_bytes:
+                break
+
+    def evict_expired(self, max_age_sec: int | None = None) -> int:
+        """Delete entries older than `max_age_sec` (default: the TTL)."""
+        age = self.ttl_sec if max_age_sec is None else int(max_age_sec)
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM entries WHERE ts < ?", (time.time() - age,)
+            )
+        return int(cur.rowcount or 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
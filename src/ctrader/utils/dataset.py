@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from ctrader.utils.ledger import CsvLedger
+
+try:  # optional: columnar storage and predicate pushdown
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - CSV fallback
+    pa = None
+    pads = None
+    pq = None
+
+_MANIFEST = "_manifest.json"
+_PART = "part.parquet"
+_LOCK = threading.Lock()
+
+
+def _date_str(d: date | str) -> str:
+    return d.isoformat() if isinstance(d, date) else str(d)
+
+
+class PartitionedDataset:
+    """
+    Hive-partitioned dataset under `root`: pool=<pool>/date=<YYYY-MM-DD>/.
+
+    Each partition holds one part file. With pyarrow it is part.parquet,
+    rewritten with the new rows on every write (a day's runs are small);
+    without it (the default install) rows are appended to a row-oriented
+    part.csv (see CsvLedger). Every row carries the `run_ts` of the run that
+    wrote it. `_manifest.json` records the latest run per pool, so readers
+    of "the last run" open one file instead of scanning directories, and
+    `read` only touches partitions matching the pool/date predicate.
+    """
+
+    def __init__(self, root: Path, use_parquet: bool | None = None) -> None:
+        self.root = Path(root)
+        self.use_parquet = (pq is not None) if use_parquet is None else use_parquet
+        if self.use_parquet and pq is None:
+            raise RuntimeError("pyarrow is required for Parquet datasets")
+
+    # ---- manifest ----
+
+    def manifest(self) -> dict:
+        try:
+            return json.loads((self.root / _MANIFEST).read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def _update_manifest(self, pool: str, entry: dict) -> None:
+        with _LOCK:
+            # drop entries whose part file is gone (partition deleted)
+            man = {
+                p: e
+                for p, e in self.manifest().items()
+                if isinstance(e, dict) and (self.root / e.get("file", "")).is_file()
+            }
+            man[pool] = entry
+            tmp = self.root / (_MANIFEST + ".tmp")
+            tmp.write_text(json.dumps(man, indent=2), encoding="utf-8")
+            os.replace(tmp, self.root / _MANIFEST)
+
+    # ---- write ----
+
+    def partition(self, pool: str, day: date | str) -> Path:
+        return self.root / f"pool={pool}" / f"date={_date_str(day)}"
+
+    def write(
+        self, pool: str, df: pd.DataFrame, run_ts: datetime | None = None
+    ) -> Path:
+        """Store `df` as one run of `pool`; returns the file written to."""
+        run_ts = run_ts or datetime.now(timezone.utc)
+        stamp = run_ts.strftime("%Y%m%dT%H%M%SZ")
+        part = self.partition(pool, run_ts.date())
+        part.mkdir(parents=True, exist_ok=True)
+        out = df.copy()
+        out["run_ts"] = stamp
+        if self.use_parquet:
+            fp = part / _PART
+            with _LOCK:
+                self._rewrite_part(part, out)
+        else:
+            fp = part / "part.csv"
+            CsvLedger(fp).append(out.to_dict("records"))
+        self._update_manifest(
+            pool,
+            {
+                "run_ts": stamp,
+                "date": run_ts.date().isoformat(),
+                "file": fp.relative_to(self.root).as_posix(),
+            },
+        )
+        return fp
+
+    @staticmethod
+    def _rewrite_part(part: Path, new: pd.DataFrame) -> None:
+        """Replace the partition's Parquet files with one part holding `new` too."""
+        old = sorted(part.glob("part*.parquet"))
+        frames = [pq.read_table(fp).to_pandas() for fp in old] + [new]
+        table = pa.Table.from_pandas(
+            pd.concat(frames, ignore_index=True), preserve_index=False
+        )
+        tmp = part / f".{_PART}.tmp"  # dot prefix: skipped by dataset discovery
+        pq.write_table(table, tmp)
+        os.replace(tmp, part / _PART)
+        for fp in old:  # per-run parts written by earlier versions
+            if fp.name != _PART:
+                fp.unlink(missing_ok=True)
+
+    # ---- read ----
+
+    @staticmethod
+    def _read_file(fp: Path) -> pd.DataFrame:
+        if fp.suffix == ".parquet":
+            return pq.read_table(fp).to_pandas()
+        return pd.read_csv(fp)
+
+    def latest(self, pool: str) -> pd.DataFrame | None:
+        """Rows of the most recent run for `pool` (via the manifest)."""
+        entry = self.manifest().get(pool)
+        if not entry:
+            return None
+        fp = self.root / entry["file"]
+        if not fp.exists():
+            return None
+        df = self._read_file(fp)
+        if "run_ts" in df.columns:
+            df = df[df["run_ts"].astype(str) == entry["run_ts"]]
+        return df.drop(columns=["run_ts"], errors="ignore").reset_index(drop=True)
+
+    def read(
+        self,
+        pool: str,
+        start: date | str | None = None,
+        end: date | str | None = None,
+    ) -> pd.DataFrame:
+        """All rows for `pool` with start <= date <= end (inclusive, optional)."""
+        lo = _date_str(start) if start is not None else None
+        hi = _date_str(end) if end is not None else None
+        if self.use_parquet:
+            if not (self.root / f"pool={pool}").exists():
+                return pd.DataFrame()
+            keys = pa.schema([("pool", pa.string()), ("date", pa.string())])
+            ds = pads.dataset(
+                self.root,
+                format="parquet",
+                partitioning=pads.partitioning(keys, flavor="hive"),
+            )
+            expr = pads.field("pool") == pool
+            if lo is not None:
+                expr &= pads.field("date") >= lo
+            if hi is not None:
+                expr &= pads.field("date") <= hi
+            return ds.to_table(filter=expr).to_pandas()
+        frames = []
+        for part in sorted((self.root / f"pool={pool}").glob("date=*")):
+            d = part.name.split("=", 1)[1]
+            if (lo is not None and d < lo) or (hi is not None and d > hi):
+                continue
+            for fp in sorted(part.glob("part*.csv")):
+                frames.append(pd.read_csv(fp).assign(pool=pool, date=d))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+def dataset(name: str, data_base: Path) -> PartitionedDataset:
+    """The named dataset under data/datasets/."""
+    return PartitionedDataset(Path(data_base) / "datasets" / name)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT_SEC", "15"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "5"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+_SESSIONS: dict[str, requests.Session] = {}
+_STATS: dict[str, dict[str, float]] = {}
+_LOCK = threading.Lock()
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _new_session() -> requests.Session:
+    # Only connection failures are retried here: the request never reached the
+    # server, so this is safe for order POSTs too. Read/status retries stay
+    # with the callers (tenacity) that know whether a call is idempotent.
+    retry = Retry(total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.3)
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def session_for(url: str) -> requests.Session:
+    """Keep-alive session shared by every request to the same scheme://host."""
+    host = _host(url)
+    with _LOCK:
+        s = _SESSIONS.get(host)
+        if s is None:
+            s = _SESSIONS[host] = _new_session()
+    return s
+
+
+def _record(host: str, elapsed: float, failed: bool) -> None:
+    with _LOCK:
+        st = _STATS.setdefault(
+            host, {"count": 0, "errors": 0, "total_sec": 0.0, "max_sec": 0.0}
+        )
+        st["count"] += 1
+        st["errors"] += int(failed)
+        st["total_sec"] += elapsed
+        st["max_sec"] = max(st["max_sec"], elapsed)
+
+
+def request(
+    method: str, url: str, timeout: float | None = None, **kwargs: Any
+) -> requests.Response:
+    """requests.request through the pooled session for the URL's host."""
+    read_timeout = DEFAULT_TIMEOUT if timeout is None else float(timeout)
+    t0 = time.perf_counter()
+    failed = True
+    try:
+        r = session_for(url).request(
+            method,
+            url,
+            timeout=(min(CONNECT_TIMEOUT, read_timeout), read_timeout),
+            **kwargs,
+        )
+        failed = r.status_code >= 400
+        return r
+    finally:
+        _record(_host(url), time.perf_counter() - t0, failed)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def latency_stats() -> dict[str, dict[str, float]]:
+    """Per-host request count, error count, and mean/max latency in seconds."""
+    with _LOCK:
+        return {
+            h: {**st, "mean_sec": st["total_sec"] / st["count"] if st["count"] else 0.0}
+            for h, st in _STATS.items()
+        }
+
+
+def close_all() -> None:
+    with _LOCK:
+        for s in _SESSIONS.values():
+            s.close()
+        _SESSIONS.clear()
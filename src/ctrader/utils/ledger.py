@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+COMPACT_INTERVAL_SEC = int(os.getenv("LEDGER_COMPACT_INTERVAL_SEC", str(7 * 86400)))
+
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = str(path.resolve())
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(key, threading.Lock())
+
+
+def _cell(v: Any) -> Any:
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return ""
+    return v
+
+
+class CsvLedger:
+    """
+    Append-only CSV file: the header is written once and each append is a
+    single fsync'd write of the new lines, so the cost of persisting a run
+    does not grow with the history already on disk.
+
+    A torn last line (crash mid-write) is truncated before the next append.
+    Rows with columns the header does not have trigger a one-off rewrite
+    with the widened header. `maybe_compact` rewrites the file atomically
+    (dropping malformed rows) at most once per `compact_interval_sec`; the
+    last compaction time lives in a `<file>.meta.json` sidecar.
+    """
+
+    def __init__(
+        self, path: Path, compact_interval_sec: int = COMPACT_INTERVAL_SEC
+    ) -> None:
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.name + ".meta.json")
+        self.compact_interval_sec = int(compact_interval_sec)
+        self._lock = _lock_for(self.path)
+
+    # ---- helpers ----
+
+    def _header(self) -> list[str] | None:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            first = f.readline()
+        if not first.endswith("\n"):
+            return None
+        return next(csv.reader([first]))
+
+    def _repair_tail(self) -> None:
+        """Truncate a partial last line left behind by an interrupted append."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                nl = f.read(step).rfind(b"\n")
+                if nl >= 0:
+                    f.truncate(pos + nl + 1)
+                    break
+            else:
+                f.truncate(0)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _render(columns: list[str], rows: Iterable[dict], header: bool) -> bytes:
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        if header:
+            w.writerow(columns)
+        for r in rows:
+            w.writerow([_cell(r.get(c)) for c in columns])
+        return buf.getvalue().encode("utf-8")
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    # ---- public API ----
+
+    def append(self, rows: list[dict]) -> int:
+        """Append `rows` (dicts keyed by column); returns the number written."""
+        if not rows:
+            return 0
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._repair_tail()
+            header = self._header()
+            if header is None:
+                columns: list[str] = []
+                for r in rows:
+                    columns.extend(k for k in r if k not in columns)
+                payload = self._render(columns, rows, header=True)
+                mode = "wb"
+            else:
+                extra = [k for r in rows for k in r if k not in header]
+                if extra:
+                    header = self._rewrite(header + list(dict.fromkeys(extra)))
+                payload = self._render(header, rows, header=False)
+                mode = "ab"
+            with open(self.path, mode) as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        self.maybe_compact()
+        return len(rows)
+
+    def read_rows(self) -> list[dict]:
+        """All well-formed rows (a torn last line is ignored)."""
+        if not self.path.exists():
+            return []
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            data = f.read()
+        if data and not data.endswith("\n"):
+            data = data[: data.rfind("\n") + 1]
+        reader = csv.reader(io.StringIO(data))
+        header = next(reader, None)
+        if not header:
+            return []
+        return [dict(zip(header, r)) for r in reader if len(r) == len(header)]
+
+    def last_row(self, block: int = 4096) -> dict | None:
+        """The last well-formed row, reading only the end of the file."""
+        header = self._header()
+        if header is None:
+            return None
+        with open(self.path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            pos, data = size, b""
+            while pos > 0 and data[:-1].count(b"\n") < 2:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        data = data[: data.rfind(b"\n") + 1]  # drop a torn last line
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        if pos == 0:
+            lines = lines[1:]  # header
+        for r in csv.reader(reversed(lines[-2:])):
+            if len(r) == len(header):
+                return dict(zip(header, r))
+        return None
+
+    def _rewrite(self, columns: list[str] | None = None) -> list[str]:
+        """Atomically rewrite the file with `columns` (default: current header)."""
+        rows = self.read_rows()
+        cols = columns or self._header() or []
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self._render(cols, rows, header=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return cols
+
+    def compact(self) -> None:
+        with self._lock:
+            if self.path.exists():
+                self._rewrite()
+            self.meta_path.write_text(
+                json.dumps({"last_compact": time.time()}), encoding="utf-8"
+            )
+
+    def maybe_compact(self) -> bool:
+        """Compact if the last compaction is older than the interval."""
+        if self.compact_interval_sec <= 0:
+            return False
+        last = float(self._read_meta().get("last_compact", 0.0))
+        if last == 0.0:
+            # first sight of this ledger: start the clock without rewriting
+            self.meta_path.write_text(
+                json.dumps({"last_compact": time.time()}), encoding="utf-8"
+            )
+            return False
+        if time.time() - last < self.compact_interval_sec:
+            return False
+        self.compact()
+        return True
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `acquire` blocks until a token is available,
+    so callers sharing one bucket never exceed `rate_per_sec` on average
+    (with bursts of up to `burst` requests).
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
+        self.rate = max(1e-6, float(rate_per_sec))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RetryBudget:
+    """A fixed number of retries shared by every request in a batch."""
+
+    def __init__(self, retries: int) -> None:
+        self.left = max(0, int(retries))
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.left <= 0:
+                return False
+            self.left -= 1
+            return True
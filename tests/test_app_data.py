@@ -0,0 +1,29 @@
+# tests/test_app_data.py
+# Purpose: dashboard tail readers return the header once and only the
+# requested rows, for LF and CRLF files alike.
+from ctrader.app_data import load_csv_tail, tail_lines
+
+
+def _write(fp, rows: list[str], eol: str) -> None:
+    fp.write_bytes(eol.join(["ts,equity"] + rows + [""]).encode())
+
+
+def test_tail_lines_strips_crlf(tmp_path):
+    fp = tmp_path / "eq.csv"
+    _write(fp, ["1,100", "2,101"], "\r\n")
+    assert tail_lines(fp, 2) == [b"1,100", b"2,101"]
+
+
+def test_csv_tail_short_crlf_file_has_header_once(tmp_path):
+    fp = tmp_path / "eq.csv"
+    _write(fp, ["1,100", "2,101"], "\r\n")
+    df = load_csv_tail(fp, 200)
+    assert list(df.columns) == ["ts", "equity"]
+    assert df["equity"].tolist() == [100, 101]
+
+
+def test_csv_tail_keeps_last_rows(tmp_path):
+    fp = tmp_path / "eq.csv"
+    _write(fp, [f"{i},{100 + i}" for i in range(50)], "\n")
+    df = load_csv_tail(fp, 3)
+    assert df["ts"].tolist() == [47, 48, 49]
@@ -0,0 +1,44 @@
+# tests/test_cache.py
+# Purpose: the SQLite series cache honours its TTL and size cap.
+import time
+
+import numpy as np
+import pytest
+
+from ctrader.utils.cache import SeriesCache
+
+T0 = 1_750_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [T0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_roundtrip_and_ttl_expiry(tmp_path, clock):
+    cache = SeriesCache(tmp_path / "c.sqlite3", ttl_sec=60)
+    arr = np.arange(6, dtype=np.float64).reshape(3, 2)
+    cache.set("a", arr)
+    cache.set("j", {"complete": True})
+    np.testing.assert_array_equal(cache.get("a"), arr)
+    assert cache.get("j") == {"complete": True}
+    clock[0] += 61
+    assert cache.get("a") is None
+    data, stored_at = cache.get_entry("a")  # stale entries stay readable
+    np.testing.assert_array_equal(data, arr)
+    assert stored_at == T0
+    assert cache.evict_expired() == 2
+    assert cache.get_entry("a") is None
+    cache.close()
+
+
+def test_max_bytes_evicts_oldest(tmp_path, clock):
+    cache = SeriesCache(tmp_path / "c.sqlite3", max_bytes=3 * 800)
+    for i, key in enumerate("abcd"):
+        clock[0] = T0 + i
+        cache.set(key, np.full(100, float(i)))  # 800 bytes each
+    assert cache.get_entry("a") is None
+    assert [float(cache.get(k)[0]) for k in "bcd"] == [1.0, 2.0, 3.0]
+    cache.close()
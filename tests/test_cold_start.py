@@ -0,0 +1,33 @@
+# tests/test_cold_start.py
+# Purpose: keep CLI startup cheap; heavy deps load only on the paths that use them.
+import subprocess
+import sys
+import time
+
+HEAVY = ("pandas", "numpy", "requests", "tenacity", "streamlit")
+# generous: importing the CLI modules measures ~0.05s over a bare interpreter
+STARTUP_BUDGET_SEC = 0.5
+
+
+def _python(code: str) -> tuple[str, float]:
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return out.strip(), time.perf_counter() - t0
+
+
+def test_cli_import_does_not_load_heavy_deps():
+    code = (
+        "import sys\n"
+        "import ctrader.cli.trade, ctrader.cli.healthcheck, ctrader.cli.schedule\n"
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+    loaded, _ = _python(code)
+    assert loaded == ""
+
+
+def test_cli_cold_start_budget():
+    _, bare = _python("pass")
+    _, cli = _python("import ctrader.cli.trade, ctrader.cli.healthcheck")
+    assert cli - bare < STARTUP_BUDGET_SEC
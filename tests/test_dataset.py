@@ -0,0 +1,67 @@
+# tests/test_dataset.py
+# Purpose: runs land in one part file per pool/date partition; the manifest
+# points at each pool's latest run and forgets deleted partitions.
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from ctrader.utils.dataset import PartitionedDataset
+
+
+def _ts(day: int, hour: int) -> datetime:
+    return datetime(2025, 3, day, hour, tzinfo=timezone.utc)
+
+
+def _runs(ds: PartitionedDataset) -> None:
+    ds.write(
+        "a", pd.DataFrame({"ticker": ["BTC", "ETH"], "qty": [1.0, 2.0]}), _ts(1, 9)
+    )
+    ds.write("a", pd.DataFrame({"ticker": ["BTC"], "qty": [3.0]}), _ts(1, 10))
+    ds.write("a", pd.DataFrame({"ticker": ["SOL"], "qty": [4.0]}), _ts(2, 9))
+    ds.write("b", pd.DataFrame({"ticker": ["XRP"], "qty": [5.0]}), _ts(2, 9))
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def ds(request, tmp_path):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    return PartitionedDataset(tmp_path, use_parquet=request.param == "parquet")
+
+
+def test_write_keeps_one_part_per_partition(ds):
+    _runs(ds)
+    part = ds.partition("a", "2025-03-01")
+    day1 = [p.name for p in part.glob("part*") if p.suffix in (".csv", ".parquet")]
+    assert day1 == ["part.parquet" if ds.use_parquet else "part.csv"]
+
+
+def test_read_filters_by_pool_and_date(ds):
+    _runs(ds)
+    df = ds.read("a")
+    assert df["qty"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    df = ds.read("a", start="2025-03-02")
+    assert df["ticker"].tolist() == ["SOL"]
+    assert df["date"].astype(str).unique().tolist() == ["2025-03-02"]
+    assert ds.read("a", end="2025-03-01")["run_ts"].nunique() == 2
+    assert ds.read("missing").empty
+
+
+def test_latest_returns_only_the_last_run(ds):
+    ds.write(
+        "a", pd.DataFrame({"ticker": ["BTC", "ETH"], "qty": [1.0, 2.0]}), _ts(1, 9)
+    )
+    ds.write("a", pd.DataFrame({"ticker": ["BTC"], "qty": [3.0]}), _ts(1, 10))
+    latest = ds.latest("a")
+    assert latest.to_dict("records") == [{"ticker": "BTC", "qty": 3.0}]
+    assert ds.manifest()["a"]["run_ts"] == "20250301T100000Z"
+    assert ds.latest("b") is None
+
+
+def test_manifest_prunes_deleted_partitions(ds):
+    _runs(ds)
+    shutil.rmtree(ds.root / "pool=b")
+    assert ds.latest("b") is None
+    ds.write("a", pd.DataFrame({"ticker": ["BTC"], "qty": [6.0]}), _ts(3, 9))
+    assert set(ds.manifest()) == {"a"}
@@ -0,0 +1,102 @@
+# tests/test_execution.py
+# Purpose: live plans sell first; BUYs are only submitted once the SELLs that
+# fund them have filled.
+import asyncio
+import threading
+import time
+
+from ctrader.execution.coinspot_execution import place_plan_coinspot_async
+from ctrader.risk.rebalancer import create_rebalance_plan
+
+OPEN_POLLS = 2  # open-order polls an order stays on the book
+
+
+class FakeClient:
+    """CoinSpotV2 stand-in: orders fill after a few polls and land in history."""
+
+    def __init__(self) -> None:
+        self.log: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._open: dict[str, list] = {}  # order id -> [coin, side, polls left]
+        self._done: list[dict] = []
+        self._n = 0
+
+    def ro_balances(self) -> dict:
+        return {"balances": {"BTC": 1.0, "ETH": 10.0, "AUD": 0.0}}
+
+    def _place(self, side: str, sym: str, amount: float) -> dict:
+        with self._lock:
+            self._n += 1
+            oid = str(self._n)
+            self._open[oid] = [sym, side, OPEN_POLLS]
+            self._done.append({"id": oid, "coin": sym, "side": side, "amount": amount})
+            self.log.append(("submit", f"{side} {sym}"))
+        return {"status": "ok", "id": oid}
+
+    def place_market_buy(self, sym, amount, rate, markettype):
+        return self._place("BUY", sym, amount)
+
+    def place_market_sell(self, sym, amount, rate, markettype):
+        return self._place("SELL", sym, amount)
+
+    def ro_open_market_orders(self, cointype=None, markettype=None):
+        with self._lock:
+            out = {"buyorders": [], "sellorders": []}
+            for oid, o in list(self._open.items()):
+                o[2] -= 1
+                if o[2] < 0:
+                    del self._open[oid]
+                    continue
+                key = "buyorders" if o[1] == "BUY" else "sellorders"
+                out[key].append({"id": oid, "coin": o[0]})
+            return out
+
+    def ro_market_order_history(self, cointype=None, markettype=None):
+        ms = int(time.time() * 1000)
+        with self._lock:
+            done = [o for o in self._done if o["id"] not in self._open]
+        return {
+            key: [dict(o, solddate=ms) for o in done if o["side"] == side]
+            for side, key in (("BUY", "buyorders"), ("SELL", "sellorders"))
+        }
+
+
+def test_sells_fill_before_any_buy_is_submitted():
+    plan = create_rebalance_plan(
+        {"BTC": 1.0, "ETH": 10.0},
+        {"BTC": 0.5, "ETH": 4.0, "SOL": 3.0, "XRP": 100.0},
+        {"BTC": 100.0, "ETH": 10.0, "SOL": 5.0, "XRP": 0.5},
+    )
+    client = FakeClient()
+
+    def notify(evt: dict) -> None:
+        client.log.append(("filled", f"{evt['side']} {evt['ticker']}"))
+
+    res = asyncio.run(
+        place_plan_coinspot_async(
+            client,
+            plan,
+            {},
+            "AUD",
+            False,
+            None,
+            None,
+            "both",
+            None,
+            notify=notify,
+            order_timeout_sec=10,
+            poll_interval_sec=0.1,
+        )
+    )
+
+    assert [(r["side"], r["ticker"]) for r in res] == [
+        ("SELL", "BTC"),
+        ("SELL", "ETH"),
+        ("BUY", "SOL"),
+        ("BUY", "XRP"),
+    ]
+    assert all(r["fill_status"]["filled"] for r in res)
+    first_buy = client.log.index(("submit", "BUY SOL"))
+    sell_fills = [i for i, e in enumerate(client.log) if e[1].startswith("SELL")]
+    assert len(sell_fills) == 4  # submit + fill per SELL
+    assert max(sell_fills) < first_buy
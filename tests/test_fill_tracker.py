@@ -0,0 +1,92 @@
+# tests/test_fill_tracker.py
+# Purpose: an order counts as filled only when order history has a matching
+# entry; each entry fills one order; polling backs off to max_interval.
+import asyncio
+import time
+
+from ctrader.execution.fill_tracker import FillTracker
+
+
+class FakeClient:
+    def __init__(self, open_orders=(), history=()) -> None:
+        self.open_orders = list(open_orders)
+        self.history = list(history)
+
+    def ro_open_market_orders(self, cointype=None, markettype=None):
+        return {"buyorders": self.open_orders, "sellorders": []}
+
+    def ro_market_order_history(self, cointype=None, markettype=None):
+        return {"buyorders": self.history, "sellorders": []}
+
+
+def _sold(coin: str, amount: float, **extra) -> dict:
+    return dict(coin=coin, amount=amount, solddate=int(time.time() * 1000), **extra)
+
+
+def _track(client, *orders, **kw) -> list[dict]:
+    async def main():
+        tracker = FillTracker(client, "AUD", **kw)
+        try:
+            return await asyncio.gather(*(tracker.track(*o) for o in orders))
+        finally:
+            await tracker.close()
+
+    return asyncio.run(main())
+
+
+def test_instant_fill():
+    client = FakeClient(history=[_sold("BTC", 0.5)])
+    t0 = time.monotonic()
+    (res,) = _track(client, ("BTC", "BUY", 5, 0.5))
+    assert res["filled"] is True and res["confirmed"] is True
+    assert time.monotonic() - t0 < 1.0
+    assert 0 <= res["latency_sec"] < 1.0
+
+
+def test_fill_matched_by_order_id():
+    client = FakeClient(history=[_sold("BTC", 9.0, id="abc")])
+    (res,) = _track(client, ("BTC", "BUY", 5, 0.5, "abc"))
+    assert res["filled"] is True
+
+
+def test_closed_without_history_match_is_not_filled():
+    week_ago = int((time.time() - 7 * 86400) * 1000)
+    client = FakeClient(
+        history=[
+            _sold("BTC", 0.4),  # different amount
+            dict(coin="BTC", amount=0.5, solddate=week_ago),  # stale fill
+        ]
+    )
+    (res,) = _track(client, ("BTC", "BUY", 1, 0.5), max_interval=0.2)
+    assert res["filled"] is False
+    assert res["confirmed"] is False
+
+
+def test_identical_orders_claim_one_history_entry_each():
+    client = FakeClient(history=[_sold("ETH", 2.0)])
+    res = _track(
+        client, ("ETH", "BUY", 1, 2.0), ("ETH", "BUY", 1, 2.0), max_interval=0.2
+    )
+    assert sorted(r["filled"] for r in res) == [False, True]
+
+
+def test_open_order_times_out_and_backoff_reaches_max_interval(monkeypatch):
+    client = FakeClient(open_orders=[{"coin": "SOL"}])
+    sleeps: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *a, **kw):
+        sleeps.append(delay)
+        await real_sleep(delay, *a, **kw)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    (res,) = _track(
+        client,
+        ("SOL", "BUY", 1, 3.0),
+        initial_interval=0.05,
+        max_interval=0.2,
+        backoff=2.0,
+    )
+    assert res == {"filled": False, "open": 1, "latency_sec": None}
+    assert sleeps[:3] == [0.05, 0.1, 0.2]
+    assert max(sleeps) == 0.2 and sleeps[-1] == 0.2
@@ -0,0 +1,38 @@
+# tests/test_healthcheck.py
+# Purpose: the public probe retries transient failures like the provider client.
+import io
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ctrader.cli import healthcheck
+
+
+def _flaky(failures: int, calls: list):
+    def urlopen(req, timeout=None):
+        calls.append(req.full_url)
+        if len(calls) <= failures:
+            raise urllib.error.URLError("temporary failure")
+        return io.BytesIO(json.dumps({"status": "ok"}).encode())
+
+    return urlopen
+
+
+def test_pub_probe_retries_transient_errors(monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(time, "sleep", lambda s: None)
+    monkeypatch.setattr(urllib.request, "urlopen", _flaky(2, calls))
+    assert healthcheck._pub_latest() == {"status": "ok"}
+    assert len(calls) == 3
+
+
+def test_pub_probe_gives_up_after_three_attempts(monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(time, "sleep", lambda s: None)
+    monkeypatch.setattr(urllib.request, "urlopen", _flaky(5, calls))
+    with pytest.raises(Exception):
+        healthcheck._pub_latest()
+    assert len(calls) == 3
@@ -10,7 +10,16 @@ def test_imports_smoke():
         "ctrader.strategies.trend_filter",
         "ctrader.strategies.momentum",
         "ctrader.strategies.inverse_vol",
+        "ctrader.strategies.panel",
+        "ctrader.strategies.pipeline",
+        "ctrader.strategies.risk_parity",
+        "ctrader.indicators",
         "ctrader.backtest",
+        "ctrader.sweep",
+        "ctrader.app_data",
+        "ctrader.runlog",
+        "ctrader.utils.dataset",
+        "ctrader.utils.ledger",
         "ctrader.cli.trade",
     ]
     for m in modules:
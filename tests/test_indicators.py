@@ -0,0 +1,62 @@
+# tests/test_indicators.py
+# Purpose: the rolling kernels agree with pandas' rolling windows, including
+# across NaN gaps.
+import numpy as np
+import pandas as pd
+import pytest
+
+from ctrader import indicators as ind
+
+W = 5
+
+
+@pytest.fixture
+def prices() -> np.ndarray:
+    rng = np.random.default_rng(11)
+    p = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.03, size=(80, 3)), axis=0)
+    p[10:13, 0] = np.nan  # gap inside the series
+    p[:20, 1] = np.nan  # late listing
+    p[40, 2] = np.nan  # single missing day
+    return p
+
+
+def _eq(a: np.ndarray, b: pd.DataFrame) -> None:
+    np.testing.assert_allclose(a, b.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_sma_matches_pandas(prices):
+    _eq(ind.sma(prices, W), pd.DataFrame(prices).rolling(W).mean())
+
+
+def test_rolling_std_matches_pandas(prices):
+    df = pd.DataFrame(prices)
+    _eq(ind.rolling_std(prices, W), df.rolling(W).std())
+    _eq(ind.rolling_std(prices, W, ddof=0), df.rolling(W).std(ddof=0))
+    _eq(ind.rolling_std(prices, W, min_periods=3), df.rolling(W, min_periods=3).std())
+
+
+def test_rolling_moments_match_pandas(prices):
+    df = pd.DataFrame(prices)
+    n, mean, var = ind.rolling_moments(prices, W)
+    _eq(n, df.rolling(W, min_periods=0).count())
+    _eq(mean, df.rolling(W, min_periods=1).mean())
+    _eq(var, df.rolling(W, min_periods=2).var())
+
+
+def test_returns_and_log_vol_match_pandas(prices):
+    df = pd.DataFrame(prices)
+    _eq(ind.simple_returns(prices), df / df.shift(1) - 1.0)
+    logret = np.log(df / df.shift(1))
+    _eq(ind.log_returns(prices), logret)
+    _eq(ind.log_vol(prices, W), logret.rolling(W).std(ddof=0))
+
+
+def test_momentum_matches_pandas(prices):
+    df = pd.DataFrame(prices)
+    _eq(ind.momentum(prices, 10, skip=2), df.shift(2) / df.shift(12) - 1.0)
+
+
+def test_kernels_on_1d_series(prices):
+    s = pd.Series(prices[:, 0])
+    _eq(ind.sma(prices[:, 0], W), s.rolling(W).mean())
+    _eq(ind.rolling_std(prices[:, 0], W), s.rolling(W).std())
@@ -0,0 +1,92 @@
+# tests/test_ledger.py
+# Purpose: the append-only ledger survives torn writes, widens its header
+# when rows gain columns, and compacts on its interval.
+import json
+import time
+from datetime import datetime
+
+from ctrader.analytics import append_trades, load_last_trade_times
+from ctrader.risk.rebalancer import create_rebalance_plan
+from ctrader.utils.ledger import CsvLedger
+
+
+def test_append_writes_header_once(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv")
+    led.append([{"ts": "1", "equity": 10.0}])
+    led.append([{"ts": "2", "equity": 11.0}, {"ts": "3", "equity": 12.0}])
+    assert led.path.read_text().splitlines() == [
+        "ts,equity",
+        "1,10.0",
+        "2,11.0",
+        "3,12.0",
+    ]
+    assert led.last_row() == {"ts": "3", "equity": "12.0"}
+
+
+def test_torn_last_line_is_repaired_before_append(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv")
+    led.append([{"ts": "1", "equity": 10.0}])
+    with open(led.path, "a") as f:
+        f.write("2,11")  # crash mid-append
+    assert led.read_rows() == [{"ts": "1", "equity": "10.0"}]
+    assert led.last_row() == {"ts": "1", "equity": "10.0"}
+    led.append([{"ts": "3", "equity": 12.0}])
+    assert led.path.read_text().splitlines() == ["ts,equity", "1,10.0", "3,12.0"]
+
+
+def test_torn_header_starts_over(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv")
+    led.path.write_text("ts,equ")
+    led.append([{"ts": "1", "equity": 10.0}])
+    assert led.path.read_text().splitlines() == ["ts,equity", "1,10.0"]
+
+
+def test_new_columns_widen_the_header(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv")
+    led.append([{"ts": "1", "equity": 10.0}])
+    led.append([{"ts": "2", "equity": 11.0, "cash": 5.0}])
+    assert led.path.read_text().splitlines() == [
+        "ts,equity,cash",
+        "1,10.0,",
+        "2,11.0,5.0",
+    ]
+
+
+def test_compact_drops_malformed_rows(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv")
+    led.append([{"ts": "1", "equity": 10.0}])
+    with open(led.path, "a") as f:
+        f.write("garbage\n")
+    led.append([{"ts": "2", "equity": 11.0}])
+    led.compact()
+    assert led.path.read_text().splitlines() == ["ts,equity", "1,10.0", "2,11.0"]
+    assert json.loads(led.meta_path.read_text())["last_compact"] > 0
+
+
+def test_maybe_compact_runs_once_per_interval(tmp_path):
+    led = CsvLedger(tmp_path / "t.csv", compact_interval_sec=3600)
+    led.append([{"ts": "1", "equity": 10.0}])  # starts the clock
+    assert led.maybe_compact() is False
+    led.meta_path.write_text(json.dumps({"last_compact": time.time() - 7200}))
+    assert led.maybe_compact() is True
+    assert led.maybe_compact() is False
+    assert (
+        CsvLedger(tmp_path / "u.csv", compact_interval_sec=0).maybe_compact() is False
+    )
+
+
+def test_last_trade_times_follow_appends_and_rebuild(tmp_path):
+    plan = create_rebalance_plan({"BTC": 1.0}, {"BTC": 0.5, "ETH": 2.0}, {})
+    append_trades("p", plan, tmp_path)
+    first = load_last_trade_times("p", tmp_path)
+    assert set(first) == {"BTC", "ETH"}
+    assert all(isinstance(d, datetime) and d.tzinfo for d in first.values())
+
+    append_trades("p", create_rebalance_plan({}, {"SOL": 1.0}, {}), tmp_path)
+    second = load_last_trade_times("p", tmp_path)
+    assert second["SOL"] >= second["BTC"] == first["BTC"]
+
+    # sidecar lost: rebuilt from the ledger
+    (tmp_path / "state" / "last_trades_p.json").unlink()
+    assert load_last_trade_times("p", tmp_path) == second
+    assert load_last_trade_times("missing", tmp_path) == {}
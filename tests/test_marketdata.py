@@ -0,0 +1,62 @@
+# tests/test_marketdata.py
+# Purpose: history refreshes splice only the missing days onto the cached
+# series.
+import time
+
+import numpy as np
+import pytest
+
+from ctrader.data_providers import marketdata as md
+from ctrader.utils.cache import SeriesCache
+
+DAY_MS = 86_400_000
+T0 = 1_750_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [T0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def _rows(days, prices) -> np.ndarray:
+    return np.column_stack([np.asarray(days, dtype=np.float64) * DAY_MS, prices])
+
+
+def test_merge_history_overlap_and_changed_final_day():
+    old = _rows([0, 1, 2, 3, 4], [10, 11, 12, 13, 14.0])
+    new = _rows([4, 4.5, 5, 6], [14.2, 14.5, 15, 16])  # day 4 revised, then closed
+    merged = md._merge_history(old, new)
+    assert (merged[:, 0] // DAY_MS).tolist() == [0, 1, 2, 3, 4, 5, 6]
+    assert merged[:, 1].tolist() == [10, 11, 12, 13, 14.5, 15, 16]
+    assert md._merge_history(None, new[:1]).tolist() == new[:1].tolist()
+    assert md._merge_history(old, new[:0]).tolist() == old.tolist()
+
+
+def test_fetch_history_array_fetches_only_missing_days(tmp_path, clock, monkeypatch):
+    cache = SeriesCache(tmp_path / "c.sqlite3", ttl_sec=3600)
+    calls: list[int] = []
+
+    def market_chart(cid, vs, days):
+        calls.append(days)
+        now_ms = time.time() * 1000.0
+        ts = now_ms - np.arange(days, -1, -1) * DAY_MS
+        return np.column_stack([ts, 100.0 + ts / DAY_MS])
+
+    monkeypatch.setattr(md, "_cache", lambda: cache)
+    monkeypatch.setattr(md, "_market_chart", market_chart)
+    monkeypatch.setenv("OFFLINE_MODE", "false")
+
+    ts, px = md.fetch_history_array("BTC", days=100)
+    assert calls == [130] and len(ts) == 101  # head over-fetched by a month
+    md.fetch_history_array("BTC", days=100)
+    assert calls == [130]  # fresh: served from the cache
+
+    clock[0] += 3 * 86400
+    ts, px = md.fetch_history_array("BTC", days=100)
+    assert calls == [130, 4]  # only the three new days (+ the last cached one)
+    assert len(ts) == 101 and ts[-1] == int(clock[0] * 1000)
+    assert (np.diff(ts) == DAY_MS).all()
+    np.testing.assert_allclose(px, 100.0 + ts / DAY_MS)
+    cache.close()
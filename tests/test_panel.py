@@ -0,0 +1,66 @@
+# tests/test_panel.py
+# Purpose: live weights read every asset at its latest price, even when the
+# cached series end on different days.
+import numpy as np
+import pytest
+
+from ctrader.strategies.panel import PricePanel
+from ctrader.strategies.pipeline import Pipeline
+from ctrader.strategies.trend_filter import apply_trend_filter
+
+N = 60
+SMA = 20
+
+
+def _panels() -> tuple[PricePanel, PricePanel]:
+    days = np.arange(19000, 19000 + N, dtype=np.int64)
+    a = np.linspace(200.0, 100.0, N)  # falling: below its SMA
+    b = np.linspace(100.0, 200.0, N)  # rising: above its SMA
+    aligned = PricePanel(["A", "B"], days, np.column_stack([a, b]))
+    # A's series ends a day early, so the union panel's last row has no A
+    lagged = np.column_stack([np.append(a[:-1], np.nan), b])
+    return aligned, PricePanel(["A", "B"], days, lagged)
+
+
+def _trend(base: dict, panel: PricePanel) -> dict:
+    return apply_trend_filter(
+        base, quote="AUD", sma_days=SMA, min_weight=0.0, panel=panel
+    )
+
+
+def test_trend_filter_uses_each_assets_last_price():
+    aligned, misaligned = _panels()
+    base = {"A": 0.5, "B": 0.5}
+    want = _trend(base, aligned)
+    got = _trend(base, misaligned)
+    assert want["A"] < 0.5
+    assert got == want
+
+
+def test_pipeline_last_uses_each_assets_last_price():
+    aligned, misaligned = _panels()
+    cfg = {
+        "pipeline": [{"stage": "trend_filter", "sma_days": SMA, "min_weight": 0.0}],
+        "pools": {"p": {"assets": {"A": 0.5, "B": 0.5}}},
+    }
+    pipe = Pipeline.from_config(cfg, "p")
+    want = pipe.last(aligned)
+    assert want["A"] < 0.5
+    assert pipe.last(misaligned) == want
+
+
+def test_stale_positional_exchange_fails_loudly():
+    aligned, _ = _panels()
+    base = {"A": 0.5, "B": 0.5}
+    with pytest.raises(TypeError):
+        apply_trend_filter(base, "binance", "AUD", SMA, 0.0, panel=aligned)
+    with pytest.deprecated_call():
+        got = apply_trend_filter(
+            base,
+            exchange="binance",
+            quote="AUD",
+            sma_days=SMA,
+            min_weight=0.0,
+            panel=aligned,
+        )
+    assert got == _trend(base, aligned)
@@ -0,0 +1,70 @@
+# tests/test_pipeline.py
+# Purpose: pipeline entries are validated, `enabled: false` drops a stage, and
+# stage outputs are reused when only downstream parameters change.
+import numpy as np
+import pytest
+
+from ctrader.strategies import pipeline as pl
+from ctrader.strategies.panel import PricePanel
+
+
+def _cfg(spec: list) -> dict:
+    return {
+        "pipeline": spec,
+        "pools": {"p": {"assets": {"A": 0.5, "B": 0.3, "C": 0.2}}},
+    }
+
+
+def _panel(seed: int) -> PricePanel:
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.02, size=(260, 3)), axis=0)
+    return PricePanel(["A", "B", "C"], np.arange(19000, 19260), prices)
+
+
+def test_unknown_override_key_is_rejected():
+    with pytest.raises(ValueError, match="'sma_day'.*trend_filter"):
+        pl.Pipeline.from_config(_cfg([{"stage": "trend_filter", "sma_day": 150}]), "p")
+    with pytest.raises(ValueError, match="Unknown pipeline stage 'trend'"):
+        pl.Pipeline.from_config(_cfg(["trend"]), "p")
+
+
+def test_overrides_and_enabled_false():
+    pipe = pl.Pipeline.from_config(
+        _cfg(
+            [
+                {"stage": "trend_filter", "sma_days": 150},
+                {"stage": "risk_parity", "enabled": False},
+                "caps",
+            ]
+        ),
+        "p",
+    )
+    assert pipe.names == ["trend_filter", "caps"]
+    assert pipe.steps[0][1]["sma_days"] == 150
+    assert pipe.steps[0][1]["min_weight"] == 0.25  # from config defaults
+
+
+def test_upstream_stages_are_reused_across_downstream_overrides(monkeypatch):
+    calls: list[dict] = []
+
+    def apply(w, p, ctx):
+        calls.append(p)
+        return pl.normalize_rows(w * np.array([1.0, p["k"], 1.0]))
+
+    monkeypatch.setitem(
+        pl.STAGES, "scale_b", pl.Stage("scale_b", lambda cfg, pool: {"k": 2.0}, apply)
+    )
+    panel = _panel(seed=5)
+
+    def run(*spec) -> np.ndarray:
+        return pl.Pipeline.from_config(_cfg(list(spec)), "p").run(panel)
+
+    base = run("scale_b", "caps")
+    capped = run("scale_b", {"stage": "caps", "max_per_asset_pct": 40})
+    assert len(calls) == 1  # scale_b computed once, caps twice
+    assert not np.allclose(capped, base)
+
+    run({"stage": "scale_b", "k": 3.0}, "caps")
+    assert calls == [{"k": 2.0}, {"k": 3.0}]
+    np.testing.assert_array_equal(run("scale_b", "caps"), base)
+    assert len(calls) == 2
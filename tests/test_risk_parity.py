@@ -0,0 +1,74 @@
+# tests/test_risk_parity.py
+# Purpose: the covariance sizing solvers land on their optimality conditions,
+# and warm starts do not change the answer.
+import numpy as np
+
+from ctrader.strategies import risk_parity as rp
+
+
+def _cov(p: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=(p, p))
+    vol = rng.uniform(0.01, 0.08, size=p)
+    c = a @ a.T + p * np.eye(p)
+    c /= np.sqrt(np.outer(np.diag(c), np.diag(c)))
+    return c * np.outer(vol, vol)
+
+
+def _prices(days: int, p: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.02, size=(days, 1))
+    rets = common + rng.normal(0, 0.01, size=(days, p)) * np.arange(1, p + 1)
+    return 100.0 * np.cumprod(1.0 + rets, axis=0)
+
+
+def test_erc_weights_equalise_risk_contributions():
+    covs = np.stack([_cov(5, seed) for seed in range(4)])
+    w = rp.erc_weights(covs)
+    assert np.allclose(w.sum(axis=1), 1.0)
+    assert (w > 0).all()
+    rc = w * np.einsum("mij,mj->mi", covs, w)
+    share = rc / rc.sum(axis=1, keepdims=True)
+    assert np.allclose(share, 1.0 / 5, atol=1e-8)
+
+
+def test_min_variance_weights_on_simplex_and_below_inverse_vol():
+    covs = np.stack([_cov(6, seed) for seed in range(4)])
+    w = rp.min_variance_weights(covs)
+    assert np.allclose(w.sum(axis=1), 1.0)
+    assert (w >= 0).all()
+    d = np.arange(6)
+    iv = 1.0 / np.sqrt(covs[:, d, d])
+    iv /= iv.sum(axis=1, keepdims=True)
+    var = np.einsum("mi,mij,mj->m", w, covs, w)
+    var_iv = np.einsum("mi,mij,mj->m", iv, covs, iv)
+    assert (var <= var_iv + 1e-15).all()
+
+
+def test_ledoit_wolf_matches_reference_formula():
+    x = np.random.default_rng(7).normal(size=(40, 4)) * [0.01, 0.02, 0.03, 0.05]
+    n, p = x.shape
+    xc = x - x.mean(axis=0)
+    s = xc.T @ xc / n
+    mu = np.trace(s) / p
+    d2 = np.sum((s - mu * np.eye(p)) ** 2) / p
+    b2 = sum(np.sum((np.outer(r, r) - s) ** 2) for r in xc) / p / n**2
+    shrink = min(b2, d2) / d2
+    want = (1 - shrink) * s + shrink * mu * np.eye(p)
+
+    cov, got = rp.ledoit_wolf(x)
+    assert np.isclose(got, shrink)
+    assert np.allclose(cov, want)
+
+
+def test_warm_started_covariance_target_matches_cold_run():
+    prices = _prices(160, 4, seed=3)
+    days = np.arange(19000, 19160)
+    key = ("test", "warm")
+    rp._WARM.pop(key, None)
+    for mode in ("erc", "min_variance"):
+        cold = rp.covariance_target(prices, 30, 0.0005, mode)
+        rp.covariance_target(prices[:-10], 30, 0.0005, mode, days[:-10], key)
+        warm = rp.covariance_target(prices, 30, 0.0005, mode, days, key)
+        rp._WARM.pop(key, None)
+        assert np.allclose(warm, cold, atol=1e-6)
@@ -0,0 +1,88 @@
+# tests/test_runlog.py
+# Purpose: the run log rotates by size and day, tail/between read through the
+# offset index, and readers never write to the log directory.
+import json
+
+from ctrader.runlog import RunLog
+
+
+def _rec(pool: str, day: int, minute: int, **extra) -> dict:
+    return dict(pool=pool, ts=f"2025-03-{day:02d}T10:{minute:02d}:00Z", **extra)
+
+
+def _fill(log: RunLog) -> list[dict]:
+    recs = [_rec(p, d, m) for d in (1, 2) for m in range(3) for p in ("a", "b")]
+    for r in recs:
+        log.append(r)
+    return recs
+
+
+def test_rotates_on_new_day_and_size(tmp_path):
+    log = RunLog(tmp_path, max_bytes=10_000)
+    _fill(log)
+    assert [p.name for p in log._segments()] == ["runs-20250301T100000.jsonl"]
+
+    small = RunLog(tmp_path / "small", max_bytes=150)
+    for m in range(4):
+        small.append(_rec("a", 1, m, pad="x" * 40))
+    assert len(small._segments()) == 3
+    assert [r["ts"][-6:-4] for r in small.tail("a", 4)] == ["00", "01", "02", "03"]
+
+
+def test_index_points_at_each_record(tmp_path):
+    log = RunLog(tmp_path, max_bytes=10_000)
+    recs = _fill(log)
+    idx = json.loads(log.index_path.read_text())
+    assert idx["active"]["size"] == log.active.stat().st_size
+    assert [s["file"] for s in idx["segments"]] == ["runs-20250301T100000.jsonl"]
+    for fname, off, length, _ in idx["pools"]["b"]:
+        with open(tmp_path / fname, "rb") as f:
+            f.seek(off)
+            assert json.loads(f.read(length))["pool"] == "b"
+    assert len(idx["pools"]["a"]) == len([r for r in recs if r["pool"] == "a"])
+
+
+def test_index_keeps_last_n_per_pool(tmp_path):
+    log = RunLog(tmp_path, index_keep=2)
+    recs = _fill(log)
+    idx = json.loads(log.index_path.read_text())
+    assert {p: len(e) for p, e in idx["pools"].items()} == {"a": 2, "b": 2}
+    # beyond the index: falls back to scanning the segments
+    assert log.tail("a", 5) == [r for r in recs if r["pool"] == "a"][-5:]
+
+
+def test_tail_by_pool_and_overall(tmp_path):
+    log = RunLog(tmp_path, max_bytes=10_000)
+    recs = _fill(log)
+    assert log.tail("a", 4) == [r for r in recs if r["pool"] == "a"][-4:]
+    assert log.tail(None, 3) == recs[-3:]
+    assert log.latest("b") == recs[-1]
+    assert log.tail("missing", 2) == []
+
+
+def test_tail_reindexes_after_external_append(tmp_path):
+    log = RunLog(tmp_path)
+    _fill(log)
+    extra = _rec("a", 2, 30)
+    with open(log.active, "a") as f:
+        f.write(json.dumps(extra) + "\n")
+    assert log.latest("a") == extra
+
+
+def test_between_filters_time_and_pool(tmp_path):
+    log = RunLog(tmp_path, max_bytes=10_000)
+    recs = _fill(log)
+    got = log.between("2025-03-01T10:01:00Z", "2025-03-02T10:00:00Z", pool="a")
+    assert [r["ts"] for r in got] == [
+        "2025-03-01T10:01:00Z",
+        "2025-03-01T10:02:00Z",
+        "2025-03-02T10:00:00Z",
+    ]
+    assert log.between() == recs
+
+
+def test_readers_do_not_create_files(tmp_path):
+    log = RunLog(tmp_path / "logs")
+    assert log.tail("a", 3) == []
+    assert log.between() == []
+    assert not (tmp_path / "logs").exists()
@@ -0,0 +1,84 @@
+# tests/test_sweep.py
+# Purpose: --param specs parse with their aliases, and a parallel sweep gives
+# the same rows as a serial one without inheriting open cache connections.
+import numpy as np
+import pandas as pd
+import pytest
+
+from ctrader import sweep
+from ctrader.data_providers import marketdata
+from ctrader.strategies.panel import PricePanel
+
+CFG = {
+    "global": {"fee_bps": 10, "slippage_bps": 5, "trend_filter_sma_days": 50},
+    "sizing": {"risk_parity": True, "mode": "inverse_vol", "vol_lookback_days": 30},
+    "momentum": {"enabled": True, "lookback_months": 3, "top_k": 2},
+    "rebalance": {"threshold_pct": 1.0},
+    "pools": {"p": {"initial_equity": 10000, "assets": {"A": 0.4, "B": 0.3, "C": 0.3}}},
+}
+
+
+def _panel() -> PricePanel:
+    rng = np.random.default_rng(21)
+    prices = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.03, size=(300, 3)), axis=0)
+    return PricePanel(["A", "B", "C"], np.arange(19000, 19300), prices)
+
+
+def test_parse_param_specs_and_aliases():
+    axes = sweep.parse_param_specs(
+        [
+            "top_k=3,6",
+            "sizing_mode=erc,min_variance",
+            "global.flag=true",
+            "vol_floor=0.001",
+        ]
+    )
+    assert axes == {
+        "momentum.top_k": [3, 6],
+        "sizing.mode": ["erc", "min_variance"],
+        "global.flag": [True],
+        "sizing.vol_floor": [0.001],
+    }
+    for bad in ("top_k", "top_k=", "=1"):
+        with pytest.raises(ValueError):
+            sweep.parse_param_specs([bad])
+
+
+def test_grid_and_random_configs():
+    axes = {"a": [1, 2], "b": ["x", "y", "z"]}
+    grid = sweep.grid_configs(axes)
+    assert len(grid) == 6 and {"a": 2, "b": "z"} in grid
+    r1 = sweep.random_configs(axes, 5, seed=3)
+    assert r1 == sweep.random_configs(axes, 5, seed=3)
+    assert all(c["a"] in axes["a"] and c["b"] in axes["b"] for c in r1)
+
+
+def test_apply_overrides_does_not_touch_base():
+    out = sweep.apply_overrides(
+        CFG, {"momentum.top_k": 1, "backtest.turnover_cap_pct": 5}
+    )
+    assert out["momentum"]["top_k"] == 1 and out["backtest"] == {"turnover_cap_pct": 5}
+    assert CFG["momentum"]["top_k"] == 2 and "backtest" not in CFG
+
+
+def test_parallel_sweep_matches_serial(monkeypatch):
+    closed = []
+
+    class _Cache:
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setitem(marketdata._CACHES, ("test", 0), _Cache())
+    configs = sweep.grid_configs(
+        sweep.parse_param_specs(["top_k=1,2", "threshold_pct=0.5,5"])
+    )
+    panel = _panel()
+    serial = sweep.run_sweep(CFG, "p", panel, 200, configs, workers=1)
+    parallel = sweep.run_sweep(CFG, "p", panel, 200, configs, workers=2)
+    assert closed == [True] and ("test", 0) not in marketdata._CACHES
+    keys = ["momentum.top_k", "rebalance.threshold_pct"]
+    pd.testing.assert_frame_equal(
+        serial.sort_values(keys, ignore_index=True),
+        parallel.sort_values(keys, ignore_index=True),
+    )
+    assert len(serial) == 4 and serial["final_equity"].nunique() > 1
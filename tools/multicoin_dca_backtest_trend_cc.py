@@ -2,11 +2,21 @@ import csv
 import datetime as dt
 import math
 import os
+import sys
 from collections import defaultdict
-from statistics import mean, pstdev
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 BASE_DIR = os.path.dirname(__file__)
+
+# make repo/src importable when run as "python tools/<this file>"
+_SRC_DIR = os.path.join(BASE_DIR, "..", "src")
+if os.path.isdir(_SRC_DIR) and _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from ctrader.indicators import log_vol, sma  # noqa: E402
+
 LOGS_DIR = os.path.join(BASE_DIR, "..", "logs")
 CC_DIR = os.path.join(LOGS_DIR, "cc_history")
 
@@ -106,17 +116,35 @@ def compute_ma(
     ma_map: Dict[str, Dict[dt.date, float]] = {}
     for sym, series in per_symbol.items():
         dates = [d for d, _ in series]
-        prices = [p for _, p in series]
-        ma_for_sym: Dict[dt.date, float] = {}
+        ma = sma(np.array([p for _, p in series], dtype=float), window)
+        ma_map[sym] = {dates[i]: float(ma[i]) for i in range(window - 1, len(series))}
+    return ma_map
 
-        for i in range(len(series)):
-            if i + 1 < window:
-                continue
-            w = prices[i + 1 - window : i + 1]
-            ma_for_sym[dates[i]] = mean(w)
 
-        ma_map[sym] = ma_for_sym
-    return ma_map
+def compute_vol(
+    per_symbol: Dict[str, List[Tuple[dt.date, float]]], lookback: int
+) -> Dict[str, Dict[dt.date, float]]:
+    """
+    Per-day volatility proxy: population std dev of the last `lookback` daily
+    log returns. Days without `lookback` + 1 consecutive positive closes get
+    no entry.
+    """
+    vol_map: Dict[str, Dict[dt.date, float]] = {}
+    for sym, series in per_symbol.items():
+        if not series:
+            vol_map[sym] = {}
+            continue
+        # calendar-day grid so a missing day breaks the window
+        d0 = series[0][0]
+        closes = np.full((series[-1][0] - d0).days + 1, np.nan)
+        for d, p in series:
+            closes[(d - d0).days] = p
+        vol = log_vol(closes, lookback, ddof=0)
+        vol_map[sym] = {
+            d0 + dt.timedelta(days=int(i)): float(vol[i])
+            for i in np.flatnonzero(np.isfinite(vol))
+        }
+    return vol_map
 
 
 def _weekday_monday(d: dt.date) -> dt.date:
@@ -176,31 +204,12 @@ def _has_confirmed_trend(
     return True
 
 
-def _volatility(sym: str, d: dt.date, price_map) -> float:
+def _volatility(sym: str, d: dt.date, vol_map) -> float:
     """
-    30d volatility proxy: std dev of daily log returns over last VOL_LOOKBACK_DAYS.
-    Returns INF if insufficient data.
+    30d volatility proxy at `d` from compute_vol (std dev of daily log returns
+    over the last VOL_LOOKBACK_DAYS). Returns INF if insufficient data.
     """
-    closes = []
-    for i in range(VOL_LOOKBACK_DAYS + 1):
-        dd = d - dt.timedelta(days=i)
-        p = price_map.get(sym, {}).get(dd)
-        if p is None:
-            return float("inf")
-        closes.append(p)
-    closes = list(reversed(closes))
-
-    rets = []
-    for i in range(1, len(closes)):
-        if closes[i - 1] <= 0 or closes[i] <= 0:
-            return float("inf")
-        rets.append(math.log(closes[i] / closes[i - 1]))
-
-    if not rets:
-        return float("inf")
-
-    # population std dev is fine for a simple proxy
-    return pstdev(rets)
+    return vol_map.get(sym, {}).get(d, float("inf"))
 
 
 def _apply_costs(invested: float, buy_price: float) -> Tuple[float, float]:
@@ -247,9 +256,13 @@ def _allocate_with_caps(
     return alloc, cash
 
 
-def run_backtest(per_symbol, ma_fast_map, ma_slow_map, price_map, windows):
+def run_backtest(
+    per_symbol, ma_fast_map, ma_slow_map, price_map, windows, vol_map=None
+):
     rows_coins: List[dict] = []
     rows_portfolio: List[dict] = []
+    if vol_map is None:
+        vol_map = compute_vol(per_symbol, VOL_LOOKBACK_DAYS)
 
     symbols = sorted(WEIGHTS.keys())
 
@@ -272,7 +285,7 @@ def run_backtest(per_symbol, ma_fast_map, ma_slow_map, price_map, windows):
             raw = {}
             for sym in in_trend:
                 base = WEIGHTS.get(sym, 0.0)
-                vol = _volatility(sym, w_start, price_map)
+                vol = _volatility(sym, w_start, vol_map)
                 if base <= 0 or not math.isfinite(vol) or vol <= 0:
                     continue
                 raw[sym] = base * (1.0 / vol)
@@ -407,6 +420,7 @@ def main():
     price_map, all_dates = build_date_index(per_symbol)
     ma_fast_map = compute_ma(per_symbol, MA_FAST)
     ma_slow_map = compute_ma(per_symbol, MA_SLOW)
+    vol_map = compute_vol(per_symbol, VOL_LOOKBACK_DAYS)
     windows = build_weekly_windows(all_dates)
     print(
         f"[INFO] Built {len(windows)} Monday->Sunday weekly windows for CC trend backtest"
@@ -418,6 +432,7 @@ def main():
         ma_slow_map,
         price_map,
         windows,
+        vol_map,
     )
 
     os.makedirs(LOGS_DIR, exist_ok=True)